@@ -0,0 +1,51 @@
+"""
+Microbenchmark of the CAM encoding.
+
+Measures the throughput (CAMs per second) of the full asn1tools UPER encoding and of the CAMFastEncoder, for CAMs
+that only differ in their dynamic fields, as the ones sent by the CA Basic Service.
+
+Usage:
+    python benchmarks/cam_encoder.py [--number N]
+"""
+import argparse
+import itertools
+import timeit
+
+from flexstack.facilities.ca_basic_service.cam_coder import CAMCoder
+from flexstack.facilities.ca_basic_service.cam_fast_encoder import CAMFastEncoder
+from flexstack.facilities.ca_basic_service.cam_transmission_management import CooperativeAwarenessMessage
+
+
+def main() -> None:
+    """
+    Runs the benchmark and prints the results.
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--number", type=int, default=10000, help="Iterations per measurement")
+    args = arg_parser.parse_args()
+    cam_coder = CAMCoder()
+    fast_encoder = CAMFastEncoder(cam_coder)
+    cam = CooperativeAwarenessMessage().cam
+    counter = itertools.count()
+
+    def next_cam() -> dict:
+        # Moves the station: new generationDeltaTime, position, heading and speed
+        step = next(counter)
+        cam["cam"]["generationDeltaTime"] = (step * 100) % 65536
+        reference_position = cam["cam"]["camParameters"]["basicContainer"]["referencePosition"]
+        reference_position["latitude"] = 413872756 + step % 1000
+        reference_position["longitude"] = 21122668 + step % 1000
+        high_frequency_container = cam["cam"]["camParameters"]["highFrequencyContainer"][1]
+        high_frequency_container["heading"]["headingValue"] = step % 3600
+        high_frequency_container["speed"]["speedValue"] = step % 16000
+        return cam
+
+    assert fast_encoder.encode(next_cam()) == cam_coder.encode(cam)
+    print(f"{'Encoder':<20}{'encode [CAMs/s]':>18}")
+    for name, encode in (("asn1tools", cam_coder.encode), ("CAMFastEncoder", fast_encoder.encode)):
+        encode_time = min(timeit.repeat(lambda: encode(next_cam()), number=args.number, repeat=5))
+        print(f"{name:<20}{args.number / encode_time:>18,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Microbenchmarks of the GeoNetworking and BTP header codecs.
+
+Measures the encode and decode throughput (operations per second) of every header.
+
+Usage:
+    python benchmarks/header_codecs.py [--number N]
+"""
+import argparse
+import timeit
+
+from flexstack.btp.btp_header import BTPBHeader
+from flexstack.geonet.basic_header import BasicHeader
+from flexstack.geonet.common_header import CommonHeader
+from flexstack.geonet.gbc_extended_header import GBCExtendedHeader
+from flexstack.geonet.gn_address import GNAddress, MID
+from flexstack.geonet.position_vector import LongPositionVector
+from flexstack.geonet.service_access_point import HeaderType, TopoBroadcastHST
+
+
+def build_headers() -> dict:
+    """
+    Builds one filled instance of every header.
+    """
+    gn_address = GNAddress()
+    gn_address.set_mid(MID(b"\xaa\xbb\xcc\xdd\xee\xff"))
+    long_position_vector = LongPositionVector()
+    long_position_vector.set_gn_addr(gn_address)
+    long_position_vector.set_tst_in_normal_timestamp_seconds(1675071608)
+    long_position_vector.set_latitude(41.387275688863674)
+    long_position_vector.set_longitude(2.112266864991681)
+    long_position_vector.set_speed(13.4)
+    long_position_vector.set_heading(270.5)
+    basic_header = BasicHeader()
+    basic_header.set_rhl(10)
+    common_header = CommonHeader()
+    common_header.ht = HeaderType.TSB
+    common_header.hst = TopoBroadcastHST.SINGLE_HOP
+    common_header.pl = 120
+    gbc_extended_header = GBCExtendedHeader()
+    gbc_extended_header.sn = 1234
+    gbc_extended_header.so_pv = long_position_vector
+    gbc_extended_header.latitude = 413872756
+    gbc_extended_header.longitude = 21122668
+    gbc_extended_header.a = 100
+    gbc_extended_header.b = 50
+    btp_b_header = BTPBHeader()
+    btp_b_header.destination_port = 2001
+    return {
+        "BasicHeader": (basic_header, basic_header.encode_to_bytes, BasicHeader().decode_from_bytes),
+        "CommonHeader": (common_header, common_header.encode_to_bytes, CommonHeader().decode_from_bytes),
+        "LongPositionVector": (long_position_vector, long_position_vector.encode, LongPositionVector().decode),
+        "GBCExtendedHeader": (gbc_extended_header, gbc_extended_header.encode, GBCExtendedHeader().decode),
+        "BTPBHeader": (btp_b_header, btp_b_header.encode, BTPBHeader().decode),
+    }
+
+
+def main() -> None:
+    """
+    Runs the benchmarks and prints the results.
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--number", type=int, default=100000, help="Iterations per measurement")
+    args = arg_parser.parse_args()
+    print(f"{'Header':<20}{'encode [ops/s]':>18}{'decode [ops/s]':>18}")
+    for name, (_, encode, decode) in build_headers().items():
+        encoded = encode()
+        encode_time = min(timeit.repeat(encode, number=args.number, repeat=5))
+        decode_time = min(timeit.repeat(lambda: decode(encoded), number=args.number, repeat=5))
+        print(f"{name:<20}{args.number / encode_time:>18,.0f}{args.number / decode_time:>18,.0f}")
+
+
+if __name__ == "__main__":
+    main()
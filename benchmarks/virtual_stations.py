@@ -0,0 +1,91 @@
+"""
+Scaling benchmark of the GeoNetworking router with many simulated stations in one process.
+
+Every station is a GN router attached to a shared VirtualChannel. The stations are placed on a square grid and,
+in every round, each of them broadcasts a SHB packet. Measures the SHB packets delivered to the upper layer
+per second.
+
+Usage:
+    python benchmarks/virtual_stations.py [--stations N] [--rounds R] [--range METERS] [--spacing METERS]
+"""
+import argparse
+import math
+import time
+
+from flexstack.geonet.geometry import NORTH_SCALE
+from flexstack.geonet.gn_address import GNAddress, MID
+from flexstack.geonet.mib import MIB
+from flexstack.geonet.position_vector import LongPositionVector
+from flexstack.geonet.router import Router
+from flexstack.geonet.service_access_point import CommonNH, GNDataIndication, GNDataRequest
+from flexstack.linklayer.virtual_link_layer import VirtualChannel, VirtualLinkLayer
+
+ORIGIN_LATITUDE = 413872756
+ORIGIN_LONGITUDE = 21122668
+
+
+def build_stations(channel: VirtualChannel, count: int, spacing: float, delivered: list) -> list:
+    """
+    Builds the GN routers of the stations, placed on a square grid with the given spacing in meters.
+    """
+    def indication_callback(indication: GNDataIndication) -> None:
+        # Dropped packets (e.g. duplicates) produce empty indications
+        if indication.upper_protocol_entity != CommonNH.ANY:
+            delivered.append(indication)
+
+    routers = []
+    side = math.ceil(math.sqrt(count))
+    east_scale = NORTH_SCALE * math.cos(math.radians(ORIGIN_LATITUDE / 10000000))
+    for index in range(count):
+        mib = MIB()
+        gn_address = GNAddress()
+        gn_address.set_mid(MID(index.to_bytes(6, "big")))
+        mib.itsGnLocalGnAddr = gn_address
+        router = Router(mib)
+        position_vector = LongPositionVector()
+        position_vector.set_gn_addr(gn_address)
+        position_vector.latitude = ORIGIN_LATITUDE + round(index // side * spacing / NORTH_SCALE)
+        position_vector.longitude = ORIGIN_LONGITUDE + round(index % side * spacing / east_scale)
+        router.set_ego_position_vector(position_vector)
+        router.register_indication_callback(indication_callback)
+        router.link_layer = VirtualLinkLayer(
+            channel, router.gn_data_indicate, lambda router=router: router.ego_position_vector, gn_address.mid.mid
+        )
+        routers.append(router)
+    return routers
+
+
+def main() -> None:
+    """
+    Runs the benchmark and prints the results.
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--stations", type=int, default=100, help="Number of stations")
+    arg_parser.add_argument("--rounds", type=int, default=10, help="SHB packets sent by every station")
+    arg_parser.add_argument("--range", type=float, default=None, help="Communication range in meters")
+    arg_parser.add_argument("--spacing", type=float, default=50, help="Distance between stations in meters")
+    args = arg_parser.parse_args()
+    channel = VirtualChannel(range=args.range)
+    delivered: list = []
+    routers = build_stations(channel, args.stations, args.spacing, delivered)
+    request = GNDataRequest()
+    request.upper_protocol_entity = CommonNH.BTP_B
+    request.data = bytes(200)
+    request.length = len(request.data)
+    start = time.perf_counter()
+    for round_number in range(args.rounds):
+        for router in routers:
+            # Every round is sent with a new position fix of the station
+            position_vector = LongPositionVector()
+            position_vector.decode(router.ego_position_vector.encode())
+            position_vector.tst.msec = (round_number + 1) * 100
+            router.set_ego_position_vector(position_vector)
+            router.gn_data_request(request)
+    channel.wait_idle()
+    elapsed = time.perf_counter() - start
+    print(f"Stations: {args.stations}, transmitted frames: {channel.statistics.get_counter('transmitted_frames')}")
+    print(f"Delivered indications: {len(delivered)} in {elapsed:.2f} s ({len(delivered) / elapsed:,.0f} per second)")
+
+
+if __name__ == "__main__":
+    main()
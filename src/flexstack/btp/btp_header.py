@@ -1,5 +1,10 @@
+import struct
+
 from .service_access_point import BTPDataRequest
 
+# Destination Port (16 bits), Source Port / Destination Port Info (16 bits)
+BTP_HEADER_STRUCT = struct.Struct(">HH")
+
 
 class BTPAHeader:
     """
@@ -51,7 +56,20 @@ class BTPAHeader:
         bytes
             Encoded BTP-A Header
         """
-        return self.encode_to_int().to_bytes(4, byteorder='big')
+        return BTP_HEADER_STRUCT.pack(self.destination_port, self.source_port)
+
+    def encode_into(self, buffer: bytearray, offset: int = 0) -> None:
+        """
+        Encodes the BTP-A Header into a buffer at the given offset.
+
+        Parameters
+        ----------
+        buffer : bytearray
+            Buffer to write to. At least offset + 4 bytes long.
+        offset : int
+            Offset of the BTP-A Header in the buffer.
+        """
+        BTP_HEADER_STRUCT.pack_into(buffer, offset, self.destination_port, self.source_port)
 
     def decode(self, data: bytes) -> None:
         """
@@ -62,8 +80,20 @@ class BTPAHeader:
         data : bytes
             Bytes to decode.
         """
-        self.destination_port = int.from_bytes(data[0:2], byteorder='big')
-        self.source_port = int.from_bytes(data[2:4], byteorder='big')
+        self.decode_from(data, 0)
+
+    def decode_from(self, buffer: bytes, offset: int = 0) -> None:
+        """
+        Decodes the BTP-A Header from a buffer at the given offset.
+
+        Parameters
+        ----------
+        buffer : bytes
+            Buffer to read from. At least offset + 4 bytes long.
+        offset : int
+            Offset of the BTP-A Header in the buffer.
+        """
+        self.destination_port, self.source_port = BTP_HEADER_STRUCT.unpack_from(buffer, offset)
 
 
 class BTPBHeader:
@@ -116,7 +146,20 @@ class BTPBHeader:
         bytes
             Encoded BTP-B Header
         """
-        return self.encode_to_int().to_bytes(4, byteorder='big')
+        return BTP_HEADER_STRUCT.pack(self.destination_port, self.destination_port_info)
+
+    def encode_into(self, buffer: bytearray, offset: int = 0) -> None:
+        """
+        Encodes the BTP-B Header into a buffer at the given offset.
+
+        Parameters
+        ----------
+        buffer : bytearray
+            Buffer to write to. At least offset + 4 bytes long.
+        offset : int
+            Offset of the BTP-B Header in the buffer.
+        """
+        BTP_HEADER_STRUCT.pack_into(buffer, offset, self.destination_port, self.destination_port_info)
 
     def decode(self, data: bytes) -> None:
         """
@@ -127,5 +170,17 @@ class BTPBHeader:
         data : bytes
             Bytes to decode.
         """
-        self.destination_port = int.from_bytes(data[0:2], byteorder='big')
-        self.destination_port_info = int.from_bytes(data[2:4], byteorder='big')
+        self.decode_from(data, 0)
+
+    def decode_from(self, buffer: bytes, offset: int = 0) -> None:
+        """
+        Decodes the BTP-B Header from a buffer at the given offset.
+
+        Parameters
+        ----------
+        buffer : bytes
+            Buffer to read from. At least offset + 4 bytes long.
+        offset : int
+            Offset of the BTP-B Header in the buffer.
+        """
+        self.destination_port, self.destination_port_info = BTP_HEADER_STRUCT.unpack_from(buffer, offset)
@@ -1,12 +1,65 @@
 from __future__ import annotations
 from collections.abc import Callable
+from concurrent.futures import Executor
 import logging
+import struct
+import time
 
 from .btp_header import BTPAHeader, BTPBHeader
 from .service_access_point import BTPDataIndication, BTPDataRequest
 from ..geonet.common_header import CommonNH
 from ..geonet.service_access_point import GNDataIndication, GNDataRequest
 from ..geonet.router import Router as GNRouter
+from ..metrics.stack_statistics import StackStatistics
+from ..utils.rate_limited_logger import RateLimitedLogger
+
+# Destination port of the BTP-B header
+BTP_PORT_STRUCT = struct.Struct(">H")
+BTP_HEADER_LENGTH = 4
+
+
+class IndicationSubscriber:
+    """
+    Subscriber of the indications of a BTP port.
+
+    Attributes
+    ----------
+    callback : Callable
+        Callback of the subscriber. Receives a BTPDataIndication, or the payload only if payload_only is set.
+    executor : concurrent.futures.Executor
+        Executor the callback is submitted to, None to call it in the receiving thread.
+    payload_only : bool
+        Pass only the BTP payload to the callback: a memoryview of the received packet (bytes if there is an
+        executor), without building a BTPDataIndication.
+    """
+
+    def __init__(
+        self, callback: Callable, executor: Executor = None, payload_only: bool = False
+    ) -> None:
+        self.callback = callback
+        self.executor = executor
+        self.payload_only = payload_only
+
+    def deliver(self, argument: BTPDataIndication | list[BTPDataIndication] | memoryview) -> None:
+        """
+        Passes an indication, a list of indications or a payload to the callback.
+
+        Parameters
+        ----------
+        argument : BTPDataIndication | List[BTPDataIndication] | memoryview
+            Indication, indications of a burst for batch subscribers, or payload for payload only subscribers.
+        """
+        if self.executor is None:
+            self.callback(argument)
+            return
+        # The payload may be a view of a buffer of the link layer, only valid until the dispatch returns, so it
+        # is copied before the callback is deferred
+        if isinstance(argument, memoryview):
+            argument = bytes(argument)
+        else:
+            for indication in argument if isinstance(argument, list) else [argument]:
+                indication.data = indication.data
+        self.executor.submit(self.callback, argument)
 
 
 class Router:
@@ -15,27 +68,41 @@ class Router:
 
     Handles the routing of BTP packets. As specified in ETSI EN 302 636-5-1 V2.1.0 (2017-05).
 
+    Several subscribers can be registered for the same port, every packet received on the port is passed to
+    all of them.
+
     Attributes
     ----------
-    indication_callbacks : Dict[int, Callable[[BTPDataIndication], None]]
-        Dictionary of indication callbacks. The key is the port and the value is the callback.
+    indication_callbacks : Dict[int, List[IndicationSubscriber]]
+        Subscribers of the indications of each port. The key is the port.
+    indication_batch_callbacks : Dict[int, List[IndicationSubscriber]]
+        Subscribers that take all the indications of a burst for the port at once.
     gn_router : GNRouter
         Geonetworking Router.
+    statistics : StackStatistics
+        Counters (received packets, drops per reason) and latencies of the dispatch and facility callback stages.
     """
 
     def __init__(self, gn_router: GNRouter) -> None:
         self.logging = logging.getLogger("btp")
 
-        self.indication_callbacks: dict[int, Callable[[BTPDataIndication], None]] = {}
+        self.indication_callbacks: dict[int, list[IndicationSubscriber]] = {}
+        self.indication_batch_callbacks: dict[int, list[IndicationSubscriber]] = {}
         self.gn_router = gn_router
+        self.statistics = StackStatistics("btp")
+        self.drop_logging = RateLimitedLogger(self.logging)
 
         self.logging.info("BTP Router Initialized!")
 
     def register_indication_callback_btp(
-        self, port: int, callback: Callable[[BTPDataIndication], None]
+        self,
+        port: int,
+        callback: Callable[[BTPDataIndication], None],
+        executor: Executor = None,
+        payload_only: bool = False,
     ) -> None:
         """
-        Registers a callback for a given port.
+        Registers a callback for a given port. Callbacks registered before for the port are kept.
 
         Parameters
         ----------
@@ -43,10 +110,79 @@ class Router:
             Port to register the callback for.
         callback : Callable[[BTPDataIndication], None]
             Callback to register.
+        executor : concurrent.futures.Executor
+            Executor the callback is submitted to. By default it is called in the receiving thread.
+        payload_only : bool
+            Pass only the BTP payload to the callback, as a memoryview only valid during the call (as bytes if
+            there is an executor). Avoids building a BTPDataIndication, e.g. for consumers that only decode
+            the message.
         """
-        self.indication_callbacks[port] = callback
+        # The list is replaced, not modified, so a dispatch in progress is not affected
+        self.indication_callbacks[port] = self.indication_callbacks.get(port, []) + [
+            IndicationSubscriber(callback, executor, payload_only)
+        ]
         self.logging.info("Indication callback registered")
 
+    def unregister_indication_callback_btp(self, port: int, callback: Callable) -> None:
+        """
+        Unregisters a callback registered with register_indication_callback_btp.
+
+        Parameters
+        ----------
+        port : int
+            Port the callback is registered for.
+        callback : Callable
+            Callback to unregister.
+        """
+        self._unregister(self.indication_callbacks, port, callback)
+
+    def register_indication_batch_callback_btp(
+        self,
+        port: int,
+        callback: Callable[[list[BTPDataIndication]], None],
+        executor: Executor = None,
+    ) -> None:
+        """
+        Registers a callback that receives, in a single call, all the indications of a burst of packets
+        (see btp_data_indication_batch) for a given port.
+
+        Parameters
+        ----------
+        port : int
+            Port to register the callback for.
+        callback : Callable[[List[BTPDataIndication]], None]
+            Callback to register.
+        executor : concurrent.futures.Executor
+            Executor the callback is submitted to. By default it is called in the receiving thread.
+        """
+        self.indication_batch_callbacks[port] = self.indication_batch_callbacks.get(port, []) + [
+            IndicationSubscriber(callback, executor)
+        ]
+        self.logging.info("Indication batch callback registered")
+
+    def unregister_indication_batch_callback_btp(self, port: int, callback: Callable) -> None:
+        """
+        Unregisters a callback registered with register_indication_batch_callback_btp.
+
+        Parameters
+        ----------
+        port : int
+            Port the callback is registered for.
+        callback : Callable
+            Callback to unregister.
+        """
+        self._unregister(self.indication_batch_callbacks, port, callback)
+
+    @staticmethod
+    def _unregister(subscribers_by_port: dict[int, list[IndicationSubscriber]], port: int, callback) -> None:
+        subscribers = [
+            subscriber for subscriber in subscribers_by_port.get(port, []) if subscriber.callback != callback
+        ]
+        if subscribers:
+            subscribers_by_port[port] = subscribers
+        else:
+            subscribers_by_port.pop(port, None)
+
     def btp_data_request(self, request: BTPDataRequest) -> None:
         """
         Handles a BTPDataRequest.
@@ -80,21 +216,68 @@ class Router:
         """
         Handles a BTPBDataIndication.
 
+        The packet is passed to every subscriber of its destination port, and as a single indication list to
+        every batch subscriber of the port. The BTPDataIndication is only built if a subscriber needs it.
+
         Parameters
         ----------
         gn_data_indication : GNDataIndication
             GNDataIndication to handle.
         """
+        start = time.perf_counter()
+        data = gn_data_indication.data_view
+        if len(data) < BTP_HEADER_LENGTH:
+            self.drop("decode_error", "BTP-B packet too short (%d bytes)", len(data))
+            return
+        (port,) = BTP_PORT_STRUCT.unpack_from(data)
+        subscribers = self.indication_callbacks.get(port, [])
+        batch_subscribers = self.indication_batch_callbacks.get(port, [])
+        self.statistics.count("rx_packets")
+        self.statistics.observe("dispatch", time.perf_counter() - start)
+        if not subscribers and not batch_subscribers:
+            self.drop("no_subscriber", "No indication callback registered for port %d", port)
+            return
+        self.logging.debug(
+            "Sending BTP B Data Indication to port %d (%d bytes)", port, len(data) - BTP_HEADER_LENGTH
+        )
+        start = time.perf_counter()
+        indication = None
+        for subscriber in subscribers:
+            if subscriber.payload_only:
+                subscriber.deliver(data[BTP_HEADER_LENGTH:])
+                continue
+            if indication is None:
+                indication = self.decap_btp_b(gn_data_indication)
+            subscriber.deliver(indication)
+        if batch_subscribers:
+            if indication is None:
+                indication = self.decap_btp_b(gn_data_indication)
+            for subscriber in batch_subscribers:
+                subscriber.deliver([indication])
+        self.statistics.observe("facility_callback", time.perf_counter() - start)
+
+    @staticmethod
+    def decap_btp_b(gn_data_indication: GNDataIndication) -> BTPDataIndication:
+        """
+        Decodes the BTP-B header of a GNDataIndication.
+
+        Parameters
+        ----------
+        gn_data_indication : GNDataIndication
+            GNDataIndication to decode.
+
+        Returns
+        -------
+        BTPDataIndication
+            BTPDataIndication of the packet.
+        """
         indication = BTPDataIndication()
         indication.initialize_with_gn_data_indication(gn_data_indication)
         header = BTPBHeader()
-        header.decode(gn_data_indication.data)
+        header.decode(gn_data_indication.data_view)
         indication.destination_port = header.destination_port
         indication.destinaion_port_info = header.destination_port_info
-        for port, callback in self.indication_callbacks.items():
-            if port == indication.destination_port:
-                self.logging.debug("Sending BTP B Data Indication: %s", indication.data)
-                callback(indication)
+        return indication
 
     def btp_a_data_indication(self, gn_data_indication: GNDataIndication) -> None:
         """
@@ -106,7 +289,7 @@ class Router:
             GNDataIndication to handle.
         """
         header = BTPAHeader()
-        header.decode(gn_data_indication.data)
+        header.decode(gn_data_indication.data_view)
         raise NotImplementedError("BTPADataIndication not implemented")
 
     def btp_data_indication(self, gn_data_indication: GNDataIndication) -> None:
@@ -123,4 +306,68 @@ class Router:
         elif gn_data_indication.upper_protocol_entity == CommonNH.BTP_A:
             self.btp_a_data_indication(gn_data_indication)
         else:
+            self.drop("unknown_header_type", "Unknown BTP Header Type")
             raise ValueError("Unknown BTP Header Type")
+
+    def drop(self, reason: str, msg: str, *args) -> None:
+        """
+        Accounts a dropped packet: increments the counter of the drop reason and logs the message, rate limited
+        per reason.
+
+        Parameters
+        ----------
+        reason : str
+            Drop reason. The counter is named "drop_" + reason.
+        msg : str
+            Message to log, with %-style placeholders for args.
+        """
+        self.statistics.count("drop_" + reason)
+        self.drop_logging.warning(reason, msg, *args)
+
+    def btp_data_indication_batch(self, gn_data_indications: list[GNDataIndication]) -> None:
+        """
+        Handles the GNDataIndications of a burst of packets.
+
+        BTP-B indications are grouped by destination port. The group of each port is passed in a single call
+        to each batch subscriber of the port, and one by one to each of its indication subscribers.
+        Other indications are handled one by one as in btp_data_indication.
+
+        Parameters
+        ----------
+        gn_data_indications : List[GNDataIndication]
+            GNDataIndications to handle.
+        """
+        start = time.perf_counter()
+        indications_by_port: dict[int, list[BTPDataIndication]] = {}
+        for gn_data_indication in gn_data_indications:
+            if gn_data_indication.upper_protocol_entity == CommonNH.BTP_B:
+                try:
+                    indication = self.decap_btp_b(gn_data_indication)
+                except (ValueError, struct.error) as e:
+                    self.drop("decode_error", "Error decoding BTP-B header: %s", e)
+                    continue
+                indications_by_port.setdefault(indication.destination_port, []).append(indication)
+            else:
+                try:
+                    self.btp_data_indication(gn_data_indication)
+                except (NotImplementedError, ValueError, struct.error) as e:
+                    self.drop_logging.error("batch_error", "Error handling BTP packet: %s", e)
+        self.statistics.count("rx_packets", sum(len(indications) for indications in indications_by_port.values()))
+        self.statistics.observe("dispatch", time.perf_counter() - start)
+        for port, indications in indications_by_port.items():
+            batch_subscribers = self.indication_batch_callbacks.get(port, [])
+            subscribers = self.indication_callbacks.get(port, [])
+            if not batch_subscribers and not subscribers:
+                self.statistics.count("drop_no_subscriber", len(indications))
+                self.drop_logging.warning(
+                    "no_subscriber", "No indication callback registered for port %d", port
+                )
+                continue
+            self.logging.debug("Sending %d BTP B Data Indications to port %d", len(indications), port)
+            start = time.perf_counter()
+            for subscriber in batch_subscribers:
+                subscriber.deliver(indications)
+            for subscriber in subscribers:
+                for indication in indications:
+                    subscriber.deliver(indication.data_view if subscriber.payload_only else indication)
+            self.statistics.observe("facility_callback", time.perf_counter() - start)
@@ -1,3 +1,4 @@
+from __future__ import annotations
 from base64 import b64encode, b64decode
 from ..geonet.gn_address import GNAddress
 from ..geonet.service_access_point import (
@@ -129,7 +130,10 @@ class BTPDataIndication:
     length : int
         Length of the payload.
     data : bytes
-        Payload.
+        Payload. It can be set to a memoryview of the received frame, it is only copied into
+        bytes the first time it is read.
+    data_view : memoryview
+        Payload as a memoryview, without copying it.
     """
 
     def __init__(self) -> None:
@@ -143,6 +147,26 @@ class BTPDataIndication:
         self.length = 0
         self.data = b""
 
+    @property
+    def data(self) -> bytes:
+        """
+        Payload as bytes. Converted (once) from the memoryview if needed.
+        """
+        if not isinstance(self._data, bytes):
+            self._data = bytes(self._data)
+        return self._data
+
+    @data.setter
+    def data(self, data: bytes | memoryview) -> None:
+        self._data = data
+
+    @property
+    def data_view(self) -> memoryview:
+        """
+        Payload as a memoryview, without copying it.
+        """
+        return memoryview(self._data)
+
     def initialize_with_gn_data_indication(
         self, gn_data_indication: GNDataIndication
     ) -> None:
@@ -157,8 +181,8 @@ class BTPDataIndication:
         self.gn_packet_transport_type = gn_data_indication.packet_transport_type
         self.gn_source_position_vector = gn_data_indication.source_position_vector
         self.gn_traffic_class = gn_data_indication.traffic_class
-        self.data = gn_data_indication.data[4:]
-        self.length = len(self.data)
+        self.data = gn_data_indication.data_view[4:]
+        self.length = len(self._data)
 
     def to_dict(self) -> dict:
         """
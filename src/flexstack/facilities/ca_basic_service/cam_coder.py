@@ -3,8 +3,7 @@ CAM Coder.
 
 This file contains the class for the CAM Coder.
 """
-import asn1tools
-from .cam_asn1 import CAM_ASN1_DESCRIPTIONS
+from ...utils.asn1_coder_cache import get_coder
 
 
 class CAMCoder:
@@ -21,7 +20,9 @@ class CAMCoder:
         """
         Initialize the CAM Coder.
         """
-        self.asn_coder = asn1tools.compile_string(CAM_ASN1_DESCRIPTIONS, codec="uper")
+        # Imported here so the CDD is not loaded until a CAM coder is needed
+        from .cam_asn1 import CAM_ASN1_DESCRIPTIONS  # pylint: disable=import-outside-toplevel
+        self.asn_coder = get_coder(CAM_ASN1_DESCRIPTIONS, "uper")
 
     def encode(self, cam: dict) -> bytes:
         """
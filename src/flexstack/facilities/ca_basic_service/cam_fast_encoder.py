@@ -0,0 +1,318 @@
+"""
+CAM Fast Encoder.
+
+This file contains the class for the CAM Fast Encoder.
+"""
+from __future__ import annotations
+import copy
+from typing import TYPE_CHECKING
+
+from .cam_coder import CAMCoder
+
+if TYPE_CHECKING:
+    from asn1tools.codecs import per
+
+# Fields of the CAM that change from one CAM to the next, as paths in the CAM dict. The high frequency container
+# is a CHOICE, given as a (name, value) tuple.
+REFERENCE_POSITION_PATH = ("cam", "camParameters", "basicContainer", "referencePosition")
+HIGH_FREQUENCY_CONTAINER_PATH = ("cam", "camParameters", "highFrequencyContainer", 1)
+DYNAMIC_FIELDS = (
+    ("cam", "generationDeltaTime"),
+    REFERENCE_POSITION_PATH + ("latitude",),
+    REFERENCE_POSITION_PATH + ("longitude",),
+    REFERENCE_POSITION_PATH + ("positionConfidenceEllipse", "semiMajorAxisLength"),
+    REFERENCE_POSITION_PATH + ("positionConfidenceEllipse", "semiMinorAxisLength"),
+    REFERENCE_POSITION_PATH + ("positionConfidenceEllipse", "semiMajorAxisOrientation"),
+    REFERENCE_POSITION_PATH + ("altitude", "altitudeValue"),
+    REFERENCE_POSITION_PATH + ("altitude", "altitudeConfidence"),
+    HIGH_FREQUENCY_CONTAINER_PATH + ("heading", "headingValue"),
+    HIGH_FREQUENCY_CONTAINER_PATH + ("heading", "headingConfidence"),
+    HIGH_FREQUENCY_CONTAINER_PATH + ("speed", "speedValue"),
+    HIGH_FREQUENCY_CONTAINER_PATH + ("speed", "speedConfidence"),
+)
+
+
+class LayoutError(Exception):
+    """
+    The encoding of a CAM has no fixed bit layout for its dynamic fields.
+    """
+
+
+class DynamicField:
+    """
+    Bit field of a dynamic field in the UPER encoding of a CAM.
+
+    Attributes
+    ----------
+    path : tuple
+        Path of the field in the CAM dict.
+    shift : int
+        Position of the least significant bit of the field, counted from the end of the encoding.
+    mask : int
+        Mask of the bits of the field, in position.
+    minimum : int
+        Minimum value of an INTEGER field.
+    maximum : int
+        Maximum value of an INTEGER field.
+    indexes : Dict[str, int]
+        Index of each root value of an ENUMERATED field, None for an INTEGER field.
+    """
+
+    def __init__(self, path: tuple, offset: int, width: int, length: int, asn1_type: per.Type) -> None:
+        self.path = path
+        self.shift = length - offset - width
+        self.mask = ((1 << width) - 1) << self.shift
+        self.minimum: int = getattr(asn1_type, "minimum", None)
+        self.maximum: int = getattr(asn1_type, "maximum", None)
+        self.indexes: dict[str, int] = getattr(asn1_type, "root_data_to_index", None)
+
+    def encode(self, value) -> int | None:
+        """
+        Encodes a value of the field.
+
+        Parameters
+        ----------
+        value : int | str
+            Value of the field.
+
+        Returns
+        -------
+        int | None
+            Bits of the field, in position. None if the value does not fit in the field (e.g. it is out of the
+            range of the type), so the CAM must be encoded by the CAMCoder.
+        """
+        if self.indexes is not None:
+            index = self.indexes.get(value)
+            return None if index is None else index << self.shift
+        if not isinstance(value, int) or not self.minimum <= value <= self.maximum:
+            return None
+        # The extension bit of an extensible type is 0 for the root values
+        return (value - self.minimum) << self.shift
+
+
+def get_path(cam: dict, path: tuple):
+    """
+    Returns the value of a field of a CAM dict.
+    """
+    value = cam
+    for key in path:
+        value = value[key]
+    return value
+
+
+def static_part_equal(value, template, dynamic: dict) -> bool:
+    """
+    Compares two CAM dicts (or parts of them) except for their dynamic fields.
+
+    Parameters
+    ----------
+    value : dict | tuple
+        CAM dict or part of it.
+    template : dict | tuple
+        CAM dict or part of it to compare with.
+    dynamic : dict
+        Tree of the dynamic fields, as nested dicts whose leaves are None.
+    """
+    if type(value) is not type(template) or len(value) != len(template):
+        return False
+    if isinstance(value, dict):
+        if value.keys() != template.keys():
+            return False
+        keys = value.keys()
+    else:
+        keys = range(len(value))
+    for key in keys:
+        if key not in dynamic:
+            if value[key] != template[key]:
+                return False
+        elif dynamic[key] is not None and not static_part_equal(value[key], template[key], dynamic[key]):
+            return False
+    return True
+
+
+class CAMFastEncoder:
+    """
+    UPER encoder of CAMs that only encodes the fields that change between CAMs.
+
+    The encoding of a CAM is cached, with the bit layout of its dynamic fields (generationDeltaTime, reference
+    position, heading and speed) computed from the compiled ASN.1 schema of the CAMCoder. The next CAMs that
+    only differ in those fields (the static part, e.g. the header or the vehicle data, is the same) are encoded
+    by writing the dynamic fields into the cached encoding, which gives the same bytes as asn1tools. Other
+    CAMs, or CAMs with values that do not fit in the cached layout, are encoded by the CAMCoder, and their
+    static part is cached for the next ones.
+
+    Attributes
+    ----------
+    cam_coder : CAMCoder
+        CAM Coder, used to encode the CAMs that cannot be encoded from the cache.
+    template : dict
+        CAM whose encoding is cached.
+    template_bits : int
+        Encoding of the template, as an integer.
+    length : int
+        Length of the encoding in bytes.
+    fields : List[DynamicField]
+        Bit fields of the dynamic fields in the encoding. None if the template has no fixed layout.
+    """
+
+    def __init__(self, cam_coder: CAMCoder) -> None:
+        self.cam_coder = cam_coder
+        self.template: dict = None
+        self.template_bits = 0
+        self.length = 0
+        self.fields: list[DynamicField] = None
+        self.dynamic_tree: dict = {}
+        for path in DYNAMIC_FIELDS:
+            node = self.dynamic_tree
+            for key in path[:-1]:
+                node = node.setdefault(key, {})
+            node[path[-1]] = None
+
+    def encode(self, cam: dict) -> bytes:
+        """
+        Encodes a CAM message.
+
+        Parameters
+        ----------
+        cam : dict
+            CAM message.
+
+        Returns
+        -------
+        bytes
+            Encoded CAM message.
+        """
+        if self.template is None or not static_part_equal(cam, self.template, self.dynamic_tree):
+            return self.update_template(cam)
+        if self.fields is None:
+            return self.cam_coder.encode(cam)
+        bits = self.template_bits
+        for field in self.fields:
+            field_bits = field.encode(get_path(cam, field.path))
+            if field_bits is None:
+                return self.cam_coder.encode(cam)
+            bits = (bits & ~field.mask) | field_bits
+        return bits.to_bytes(self.length, "big")
+
+    def update_template(self, cam: dict) -> bytes:
+        """
+        Encodes a CAM with the CAMCoder and caches it as the template for the next CAMs.
+
+        Parameters
+        ----------
+        cam : dict
+            CAM message.
+
+        Returns
+        -------
+        bytes
+            Encoded CAM message.
+        """
+        encoded = self.cam_coder.encode(cam)
+        self.template = copy.deepcopy(cam)
+        self.fields = None
+        try:
+            offsets = self.layout(cam)
+        except (LayoutError, KeyError, IndexError, TypeError, AttributeError):
+            return encoded
+        self.length = len(encoded)
+        self.template_bits = int.from_bytes(encoded, "big")
+        self.fields = [
+            DynamicField(path, offset, width, self.length * 8, asn1_type)
+            for path, (offset, width, asn1_type) in offsets.items()
+        ]
+        return encoded
+
+    def layout(self, cam: dict) -> dict[tuple, tuple[int, int, per.Type]]:
+        """
+        Computes the bit layout of the dynamic fields of a CAM from the compiled ASN.1 schema.
+
+        Parameters
+        ----------
+        cam : dict
+            CAM message.
+
+        Returns
+        -------
+        Dict[tuple, Tuple[int, int, per.Type]]
+            Offset and width in bits, and ASN.1 type, of each dynamic field.
+
+        Raises
+        ------
+        LayoutError
+            If a dynamic field has no fixed-width encoding.
+        """
+        offsets: dict[tuple, tuple[int, int, per.Type]] = {}
+        walk(self.cam_coder.asn_coder.types["CAM"].type, cam, (), self.dynamic_tree, 0, offsets)
+        if len(offsets) != len(DYNAMIC_FIELDS):
+            raise LayoutError("Dynamic fields missing in the CAM")
+        return offsets
+
+
+def walk(asn1_type: per.Type, value, path: tuple, dynamic: dict | None, offset: int, offsets: dict) -> int:
+    """
+    Follows the UPER encoding of a value that contains dynamic fields, recording their offsets and widths.
+
+    Parameters
+    ----------
+    asn1_type : per.Type
+        Compiled ASN.1 type of the value.
+    value : dict | tuple | int | str
+        Value.
+    path : tuple
+        Path of the value in the CAM dict.
+    dynamic : dict | None
+        Tree of the dynamic fields in the value, None if the value is a dynamic field.
+    offset : int
+        Offset of the value in bits.
+    offsets : dict
+        Offset, width and ASN.1 type of the dynamic fields found, by path.
+
+    Returns
+    -------
+    int
+        Offset of the end of the value in bits.
+
+    Raises
+    ------
+    LayoutError
+        If a dynamic field has no fixed-width encoding.
+    """
+    # asn1tools is already loaded by the CAMCoder, this only looks its modules up
+    from asn1tools.codecs import per, uper  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    if dynamic is None:
+        if isinstance(asn1_type, uper.Integer) and asn1_type.number_of_bits is not None:
+            width = asn1_type.number_of_bits + bool(asn1_type.has_extension_marker)
+        elif isinstance(asn1_type, per.Enumerated):
+            width = asn1_type.root_number_of_bits + (asn1_type.additions_index_to_data is not None)
+        else:
+            raise LayoutError(f"Dynamic field {asn1_type.name} has no fixed-width encoding")
+        offsets[path] = (offset, width, asn1_type)
+        return offset + width
+    if isinstance(asn1_type, per.Sequence):
+        # Extension bit and presence bitmap. Extension additions are encoded after the root members, so they do
+        # not move the dynamic fields.
+        offset += (asn1_type.additions is not None) + len(asn1_type.optionals)
+        for member in asn1_type.root_members:
+            if member.name not in value:
+                continue
+            if member.name in dynamic:
+                if member.default is not None:
+                    raise LayoutError(f"Dynamic field {member.name} has a default value")
+                offset = walk(member, value[member.name], path + (member.name,), dynamic[member.name], offset, offsets)
+            elif member.default is None or not member.is_default(value[member.name]):
+                encoder = uper.Encoder()
+                member.encode(value[member.name], encoder)
+                offset += encoder.chunks_number_of_bits + encoder.number_of_bits
+        return offset
+    if isinstance(asn1_type, per.Choice):
+        name, choice_value = value
+        if name not in asn1_type.root_name_to_index or 1 not in dynamic:
+            raise LayoutError(f"Choice {name} of {asn1_type.name} not supported")
+        offset += asn1_type.additions_index_to_member is not None
+        if len(asn1_type.root_index_to_member) > 1:
+            offset += asn1_type.root_number_of_bits
+        member = asn1_type.root_index_to_member[asn1_type.root_name_to_index[name]]
+        return walk(member, choice_value, path + (1,), dynamic[1], offset, offsets)
+    raise LayoutError(f"Type {asn1_type.type_name} of {asn1_type.name} not supported")
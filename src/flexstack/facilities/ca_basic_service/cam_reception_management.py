@@ -4,12 +4,15 @@ CA Reception Management.
 This file contains the class for the CA Reception Management.
 """
 
+from __future__ import annotations
+from collections.abc import Callable
 import logging
 
 from .cam_ldm_adaptation import CABasicServiceLDM
 from .cam_coder import CAMCoder
 from ...btp.service_access_point import BTPDataIndication
 from ...btp.router import Router as BTPRouter
+from ..its_pdu_summary import ItsPduSummary
 
 
 class CAMReceptionManagement:
@@ -51,8 +54,22 @@ class CAMReceptionManagement:
         self.btp_router.register_indication_callback_btp(
             port=2001, callback=self.reception_callback
         )
+        self.message_filter: Callable[[ItsPduSummary], bool] = None
         self.ca_basic_service_ldm = ca_basic_service_ldm
 
+    def set_message_filter(self, message_filter: Callable[[ItsPduSummary], bool]) -> None:
+        """
+        Sets a filter of the received CAMs, e.g. to discard duplicates (see DuplicateFilter) or CAMs of far away
+        stations. It is called with the summary of every CAM, decoded without the ASN.1 coder, and the CAMs for
+        which it returns False are discarded before being fully decoded.
+
+        Parameters
+        ----------
+        message_filter : Callable[[ItsPduSummary], bool]
+            Filter, None to accept every CAM.
+        """
+        self.message_filter = message_filter
+
     def reception_callback(self, btp_indication: BTPDataIndication) -> None:
         """
         Callback for the reception of a CAM.
@@ -62,6 +79,14 @@ class CAMReceptionManagement:
         btp_indication : BTPDataIndication
             BTP Data Indication.
         """
+        if self.message_filter is not None:
+            try:
+                summary = ItsPduSummary.decode_cam(btp_indication.data_view)
+            except ValueError as e:
+                self.logging.debug("Discarded malformed CAM: %s", e)
+                return
+            if not self.message_filter(summary):
+                return
         cam = self.cam_coder.decode(btp_indication.data)
         if self.ca_basic_service_ldm is not None:
             self.ca_basic_service_ldm.add_provider_data_to_ldm(cam)
@@ -8,6 +8,7 @@ from math import trunc
 import logging
 from dateutil import parser
 from .cam_coder import CAMCoder
+from .cam_fast_encoder import CAMFastEncoder
 from ...btp.router import Router as BTPRouter
 from ...btp.service_access_point import (
     BTPDataRequest,
@@ -534,6 +535,8 @@ class CAMTransmissionManagement:
         Vehicle Data.
     cam_coder : CAMCoder
         CAM Coder.
+    cam_encoder : CAMFastEncoder
+        Encoder of the CAMs sent, that only re-encodes the fields that change from one CAM to the next.
     ca_basic_service_ldm : CABasicServiceLDM
         CA Basic Service LDM.
     t_gen_cam : int
@@ -559,6 +562,7 @@ class CAMTransmissionManagement:
         self.btp_router: BTPRouter = btp_router
         self.vehicle_data = vehicle_data
         self.cam_coder = cam_coder
+        self.cam_encoder = CAMFastEncoder(cam_coder)
         self.ca_basic_service_ldm = ca_basic_service_ldm
         # self.T_GenCam_DCC = T_GenCamMin We don't have a DCC yet.
         self.t_gen_cam = T_GEN_CAM_MIN
@@ -627,7 +631,7 @@ class CAMTransmissionManagement:
         request.gn_packet_transport_type = PacketTransportType()
         request.communication_profile = CommunicationProfile.UNSPECIFIED
         request.traffic_class = TrafficClass()
-        request.data = self.cam_coder.encode(self.current_cam_to_send.cam)
+        request.data = self.cam_encoder.encode(self.current_cam_to_send.cam)
         request.length = len(request.data)
 
         self.btp_router.btp_data_request(request)
@@ -1,5 +1,4 @@
-import asn1tools
-from .asn1.denm_asn1 import DENM_ASN1_DESCRIPTIONS
+from ...utils.asn1_coder_cache import get_coder
 
 
 class DENMCoder:
@@ -16,8 +15,9 @@ class DENMCoder:
         """
         Initialize the DENM Coder.
         """
-        self.asn_coder = asn1tools.compile_string(
-            DENM_ASN1_DESCRIPTIONS, codec='uper')
+        # Loaded on first use rather than at import time
+        from .asn1.denm_asn1 import DENM_ASN1_DESCRIPTIONS  # pylint: disable=import-outside-toplevel
+        self.asn_coder = get_coder(DENM_ASN1_DESCRIPTIONS, 'uper')
 
     def encode(self, denm: dict) -> bytes:
         """
@@ -1,7 +1,10 @@
+from __future__ import annotations
+from collections.abc import Callable
 import logging
 from .denm_coder import DENMCoder
 from ...btp.service_access_point import BTPDataIndication
 from ...btp.router import Router as BTPRouter
+from ..its_pdu_summary import ItsPduSummary
 
 from ..local_dynamic_map.ldm_facility import LDMFacility
 from ..local_dynamic_map.ldm_classes import (
@@ -44,6 +47,7 @@ class DENMReceptionManagement:
         self.btp_router.register_indication_callback_btp(
             port=2002, callback=self.reception_callback
         )
+        self.message_filter: Callable[[ItsPduSummary], bool] = None
         self.ldm_facility = ldm
         if self.ldm_facility is not None:
             self.ldm_facility.if_ldm_3.register_data_provider(
@@ -87,6 +91,19 @@ class DENMReceptionManagement:
             #     raise response.dataObjectID
             self.logging.debug("Added DENM data to the LDM. Data: %s", data)
 
+    def set_message_filter(self, message_filter: Callable[[ItsPduSummary], bool]) -> None:
+        """
+        Sets a filter of the received DENMs, e.g. to discard duplicates (see DuplicateFilter) or DENMs of far away
+        stations. It is called with the summary of every DENM, decoded without the ASN.1 coder, and the DENMs for
+        which it returns False are discarded before being fully decoded.
+
+        Parameters
+        ----------
+        message_filter : Callable[[ItsPduSummary], bool]
+            Filter, None to accept every DENM.
+        """
+        self.message_filter = message_filter
+
     def reception_callback(self, btp_indication: BTPDataIndication) -> None:
         """
         Callback for the reception of a DENM.
@@ -96,6 +113,14 @@ class DENMReceptionManagement:
         btp_indication : BTPDataIndication
             BTP Data Indication.
         """
+        if self.message_filter is not None:
+            try:
+                summary = ItsPduSummary.decode_denm(btp_indication.data_view)
+            except ValueError as e:
+                self.logging.debug("Discarded malformed DENM: %s", e)
+                return
+            if not self.message_filter(summary):
+                return
         denm = self.denm_coder.decode(btp_indication.data)
         self.feed_ldm(denm)
         self.logging.debug(
@@ -0,0 +1,301 @@
+"""
+ITS PDU Summary.
+
+Bit-level decoder of the fixed-layout start of the CAM, VAM and DENM UPER encodings: the ItsPduHeader, the
+generation time and the reference position. Lets the receivers discard, deduplicate or rate limit messages
+by station, time or position before paying for a full ASN.1 decode.
+"""
+from __future__ import annotations
+import time
+
+# messageId values (ETSI TS 102 894-2 V2.1.1, MessageId)
+MESSAGE_ID_DENM = 1
+MESSAGE_ID_CAM = 2
+MESSAGE_ID_VAM = 16
+
+# UPER offsets (in bits) of the fields, as given by the ASN.1 modules of the messages:
+# ItsPduHeader: protocolVersion (8 bits), messageId (8 bits), stationId (32 bits)
+HEADER_LENGTH = 48
+# CAM: generationDeltaTime (16 bits), CamParameters preamble (extension bit and 2 optional fields), BasicContainer
+# preamble (extension bit), stationType (8 bits), then the reference position.
+CAM_STATION_TYPE_OFFSET = 68
+CAM_REFERENCE_POSITION_OFFSET = 76
+# VAM: generationDeltaTime (16 bits), VamParameters preamble (extension bit and 4 optional fields), BasicContainer
+# preamble (extension bit), stationType (8 bits), then the reference position.
+VAM_STATION_TYPE_OFFSET = 70
+VAM_REFERENCE_POSITION_OFFSET = 78
+# DENM: DenmPayload preamble (3 optional fields), ManagementContainer preamble (extension bit and 5 optional
+# fields, the first one termination), actionId (32 + 16 bits), detectionTime and referenceTime (42 bits each),
+# termination (1 bit, if present), then the event position.
+DENM_TERMINATION_PRESENT_OFFSET = 52
+DENM_ACTION_ID_OFFSET = 57
+DENM_DETECTION_TIME_OFFSET = 105
+DENM_REFERENCE_TIME_OFFSET = 147
+DENM_EVENT_POSITION_OFFSET = 189
+TIMESTAMP_ITS_LENGTH = 42
+
+# Latitude (-900000000..900000001) and Longitude (-1800000000..1800000001)
+LATITUDE_LENGTH = 31
+LATITUDE_MINIMUM = -900000000
+LONGITUDE_LENGTH = 32
+LONGITUDE_MINIMUM = -1800000000
+
+
+def read_bits(data: bytes, offset: int, length: int) -> int:
+    """
+    Reads an unsigned integer from a bit field of a buffer, most significant bit first.
+
+    Parameters
+    ----------
+    data : bytes | memoryview
+        Buffer.
+    offset : int
+        Offset of the field in bits.
+    length : int
+        Length of the field in bits.
+
+    Returns
+    -------
+    int
+        Value of the field.
+
+    Raises
+    ------
+    ValueError
+        If the buffer is too short.
+    """
+    start = offset >> 3
+    end = (offset + length + 7) >> 3
+    if end > len(data):
+        raise ValueError("Message too short")
+    value = int.from_bytes(data[start:end], "big")
+    return (value >> (end * 8 - offset - length)) & ((1 << length) - 1)
+
+
+class ItsPduSummary:
+    """
+    Fields of the fixed-layout start of an ITS PDU (CAM, VAM or DENM).
+
+    Attributes
+    ----------
+    protocol_version : int
+        protocolVersion of the ItsPduHeader.
+    message_id : int
+        messageId of the ItsPduHeader.
+    station_id : int
+        stationId of the ItsPduHeader.
+    generation_delta_time : int
+        generationDeltaTime of the CAM or VAM. None for a DENM.
+    station_type : int
+        stationType of the basic container of the CAM or VAM. None for a DENM.
+    action_id : Tuple[int, int]
+        originatingStationId and sequenceNumber of the DENM. None for a CAM or VAM.
+    detection_time : int
+        detectionTime of the DENM (TimestampIts). None for a CAM or VAM.
+    reference_time : int
+        referenceTime of the DENM (TimestampIts). None for a CAM or VAM.
+    latitude : int
+        Latitude of the reference position (event position of a DENM) in 1/10 micro degree.
+    longitude : int
+        Longitude of the reference position (event position of a DENM) in 1/10 micro degree.
+    """
+
+    def __init__(self) -> None:
+        self.protocol_version = 0
+        self.message_id = 0
+        self.station_id = 0
+        self.generation_delta_time: int = None
+        self.station_type: int = None
+        self.action_id: tuple[int, int] = None
+        self.detection_time: int = None
+        self.reference_time: int = None
+        self.latitude = 0
+        self.longitude = 0
+
+    def decode_header(self, data: bytes) -> None:
+        """
+        Decodes the ItsPduHeader.
+
+        Parameters
+        ----------
+        data : bytes | memoryview
+            UPER encoded message.
+
+        Raises
+        ------
+        ValueError
+            If the message is too short.
+        """
+        if len(data) < HEADER_LENGTH // 8:
+            raise ValueError("Message too short")
+        self.protocol_version = data[0]
+        self.message_id = data[1]
+        self.station_id = int.from_bytes(data[2:6], "big")
+
+    def decode_reference_position(self, data: bytes, offset: int) -> None:
+        """
+        Decodes the latitude and longitude of a reference position.
+
+        Parameters
+        ----------
+        data : bytes | memoryview
+            UPER encoded message.
+        offset : int
+            Offset of the reference position in bits.
+        """
+        self.latitude = read_bits(data, offset, LATITUDE_LENGTH) + LATITUDE_MINIMUM
+        self.longitude = read_bits(data, offset + LATITUDE_LENGTH, LONGITUDE_LENGTH) + LONGITUDE_MINIMUM
+
+    def _check_message_id(self, message_id: int) -> None:
+        if self.message_id != message_id:
+            raise ValueError(f"Unexpected messageId {self.message_id}, expected {message_id}")
+
+    @classmethod
+    def decode_cam(cls, data: bytes) -> ItsPduSummary:
+        """
+        Decodes the summary of a CAM. As specified in ETSI EN 302 637-2 V1.4.1 (2019-04). Annex B.
+
+        Parameters
+        ----------
+        data : bytes | memoryview
+            UPER encoded CAM.
+
+        Returns
+        -------
+        ItsPduSummary
+            Summary of the CAM.
+
+        Raises
+        ------
+        ValueError
+            If the message is not a CAM or it is too short.
+        """
+        summary = cls()
+        summary.decode_header(data)
+        summary._check_message_id(MESSAGE_ID_CAM)
+        summary.generation_delta_time = read_bits(data, HEADER_LENGTH, 16)
+        summary.station_type = read_bits(data, CAM_STATION_TYPE_OFFSET, 8)
+        summary.decode_reference_position(data, CAM_REFERENCE_POSITION_OFFSET)
+        return summary
+
+    @classmethod
+    def decode_vam(cls, data: bytes) -> ItsPduSummary:
+        """
+        Decodes the summary of a VAM. As specified in ETSI TS 103 300-3 V2.1.1 (2021-11). Annex A.
+
+        Parameters
+        ----------
+        data : bytes | memoryview
+            UPER encoded VAM.
+
+        Returns
+        -------
+        ItsPduSummary
+            Summary of the VAM.
+
+        Raises
+        ------
+        ValueError
+            If the message is not a VAM or it is too short.
+        """
+        summary = cls()
+        summary.decode_header(data)
+        summary._check_message_id(MESSAGE_ID_VAM)
+        summary.generation_delta_time = read_bits(data, HEADER_LENGTH, 16)
+        summary.station_type = read_bits(data, VAM_STATION_TYPE_OFFSET, 8)
+        summary.decode_reference_position(data, VAM_REFERENCE_POSITION_OFFSET)
+        return summary
+
+    @classmethod
+    def decode_denm(cls, data: bytes) -> ItsPduSummary:
+        """
+        Decodes the summary of a DENM. As specified in ETSI EN 302 637-3 V1.3.1 (2019-04). Annex A.
+
+        Parameters
+        ----------
+        data : bytes | memoryview
+            UPER encoded DENM.
+
+        Returns
+        -------
+        ItsPduSummary
+            Summary of the DENM.
+
+        Raises
+        ------
+        ValueError
+            If the message is not a DENM or it is too short.
+        """
+        summary = cls()
+        summary.decode_header(data)
+        summary._check_message_id(MESSAGE_ID_DENM)
+        summary.action_id = (
+            read_bits(data, DENM_ACTION_ID_OFFSET, 32),
+            read_bits(data, DENM_ACTION_ID_OFFSET + 32, 16),
+        )
+        summary.detection_time = read_bits(data, DENM_DETECTION_TIME_OFFSET, TIMESTAMP_ITS_LENGTH)
+        summary.reference_time = read_bits(data, DENM_REFERENCE_TIME_OFFSET, TIMESTAMP_ITS_LENGTH)
+        offset = DENM_EVENT_POSITION_OFFSET
+        if read_bits(data, DENM_TERMINATION_PRESENT_OFFSET, 1):
+            offset += 1
+        summary.decode_reference_position(data, offset)
+        return summary
+
+
+class DuplicateFilter:
+    """
+    Message filter (see the set_message_filter method of the reception managements) that discards the messages
+    already received: CAMs and VAMs with the same station and generationDeltaTime, DENMs with the same actionId
+    and referenceTime. Remembers the messages received during the last max_age seconds, up to a maximum.
+
+    generationDeltaTime wraps around every 65.536 s, so max_age must be shorter than that: otherwise a new CAM or
+    VAM with the same generationDeltaTime as an old one would be taken for a duplicate.
+
+    Attributes
+    ----------
+    max_entries : int
+        Maximum number of messages remembered.
+    max_age : float
+        Time a message is remembered, in seconds.
+    seen : Dict[tuple, float]
+        Reception time (time.monotonic) of the messages remembered, by key, in order of reception.
+    """
+
+    def __init__(self, max_entries: int = 4096, max_age: float = 5.0) -> None:
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.seen: dict[tuple, float] = {}
+
+    def __call__(self, summary: ItsPduSummary) -> bool:
+        """
+        Checks whether a message has not been received before.
+
+        Parameters
+        ----------
+        summary : ItsPduSummary
+            Summary of the message.
+
+        Returns
+        -------
+        bool
+            False if the message is a duplicate.
+        """
+        now = time.monotonic()
+        seen = self.seen
+        # The entries are in order of reception, so the expired ones are at the start
+        expiry = now - self.max_age
+        while seen:
+            oldest = next(iter(seen))
+            if seen[oldest] > expiry:
+                break
+            del seen[oldest]
+        if summary.action_id is not None:
+            key = (summary.message_id, summary.action_id, summary.reference_time)
+        else:
+            key = (summary.message_id, summary.station_id, summary.generation_delta_time)
+        if key in seen:
+            return False
+        seen[key] = now
+        if len(seen) > self.max_entries:
+            del seen[next(iter(seen))]
+        return True
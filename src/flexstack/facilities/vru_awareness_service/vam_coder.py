@@ -1,6 +1,4 @@
-import asn1tools
-
-from .vam_asn1 import VAM_ASN1_DESCRIPTIONS
+from ...utils.asn1_coder_cache import get_coder
 
 
 class VAMCoder:
@@ -17,8 +15,9 @@ class VAMCoder:
         """
         Initialize the VAM Coder.
         """
-        self.asn_coder = asn1tools.compile_string(
-            VAM_ASN1_DESCRIPTIONS, codec='uper')
+        # The ASN.1 descriptions are only loaded when the first coder is created
+        from .vam_asn1 import VAM_ASN1_DESCRIPTIONS  # pylint: disable=import-outside-toplevel
+        self.asn_coder = get_coder(VAM_ASN1_DESCRIPTIONS, 'uper')
 
     def encode(self, vam: dict) -> bytes:
         """
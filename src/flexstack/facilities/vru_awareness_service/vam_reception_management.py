@@ -1,9 +1,12 @@
+from __future__ import annotations
+from collections.abc import Callable
 import logging
 from time import time
 
 from .vam_coder import VAMCoder
 from ...btp.service_access_point import BTPDataIndication
 from ...btp.router import Router as BTPRouter
+from ..its_pdu_summary import ItsPduSummary
 from ..ca_basic_service.cam_transmission_management import GenerationDeltaTime
 
 from .vam_ldm_adaptation import VRUBasicServiceLDM
@@ -42,6 +45,7 @@ class VAMReceptionManagement:
         self.vam_coder = vam_coder
         self.btp_router = btp_router
         self.btp_router.register_indication_callback_btp(port=2018, callback=self.reception_callback)
+        self.message_filter: Callable[[ItsPduSummary], bool] = None
         self.vru_basic_service_ldm = vru_basic_service_ldm
         self.metrics_callback = None
 
@@ -55,6 +59,19 @@ class VAMReceptionManagement:
         """
         self.metrics_callback = metrics_callback
 
+    def set_message_filter(self, message_filter: Callable[[ItsPduSummary], bool]) -> None:
+        """
+        Sets a filter of the received VAMs, e.g. to discard duplicates (see DuplicateFilter) or VAMs of far away
+        stations. It is called with the summary of every VAM, decoded without the ASN.1 coder, and the VAMs for
+        which it returns False are discarded before being fully decoded.
+
+        Parameters
+        ----------
+        message_filter : Callable[[ItsPduSummary], bool]
+            Filter, None to accept every VAM.
+        """
+        self.message_filter = message_filter
+
     def reception_callback(self, btp_indication: BTPDataIndication) -> None:
         """
         Callback for the reception of a vam. Connected to LDM Facility in order to feed data.
@@ -64,6 +81,14 @@ class VAMReceptionManagement:
         btp_indication : BTPDataIndication
             BTP Data Indication.
         """
+        if self.message_filter is not None:
+            try:
+                summary = ItsPduSummary.decode_vam(btp_indication.data_view)
+            except ValueError as e:
+                self.logging.debug("Discarded malformed VAM: %s", e)
+                return
+            if not self.message_filter(summary):
+                return
         vam = self.vam_coder.decode(btp_indication.data)
         if self.vru_basic_service_ldm is not None:
             self.vru_basic_service_ldm.add_provider_data_to_ldm(vam)
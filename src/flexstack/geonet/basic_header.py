@@ -1,9 +1,14 @@
 from enum import Enum
+import struct
 
 from .exceptions import DecodeError
 from .mib import MIB
 
 
+# Version (4 bits) | NH (4 bits), Reserved (8 bits), LT (8 bits), RHL (8 bits)
+BASIC_HEADER_STRUCT = struct.Struct(">BBBB")
+
+
 class BasicNH(Enum):
     """
     Next Header field class. As specified in ETSI EN 302 636-4-1 V1.4.1 (2020-01). Section 9.6.3
@@ -82,12 +87,9 @@ class LT:
         elif value < 100:
             self.multiplier = 1
             self.base = LTbase.FIFTY_MILLISECONDS
-        elif value < 500:
+        elif value < 1000:
             self.multiplier = int(value / 50 % 64)
             self.base = LTbase.FIFTY_MILLISECONDS
-        elif value < 1000:
-            self.multiplier = 0
-            self.base = LTbase.ONE_SECOND
         elif value < 10000:
             self.multiplier = int(value / 1000 % 64)
             self.base = LTbase.ONE_SECOND
@@ -261,7 +263,24 @@ class BasicHeader:
         bytes
             Encoded Basic Header.
         """
-        return self.encode_to_int().to_bytes(4, "big")
+        return BASIC_HEADER_STRUCT.pack(
+            self.version << 4 | self.nh.value, self.reserved, self.lt.encode_to_int(), self.rhl
+        )
+
+    def encode_into(self, buffer: bytearray, offset: int = 0) -> None:
+        """
+        Encode the Basic Header into a buffer at the given offset.
+
+        Parameters
+        ----------
+        buffer : bytearray
+            Buffer to write to. At least offset + 4 bytes long.
+        offset : int
+            Offset of the Basic Header in the buffer.
+        """
+        BASIC_HEADER_STRUCT.pack_into(
+            buffer, offset, self.version << 4 | self.nh.value, self.reserved, self.lt.encode_to_int(), self.rhl
+        )
 
     def decode_from_int(self, value: int) -> None:
         """
@@ -290,7 +309,24 @@ class BasicHeader:
         """
         if len(value) < 4:
             raise DecodeError("Basic Header must be 4 bytes long")
-        self.decode_from_int(int.from_bytes(value[0:4], "big"))
+        self.decode_from(value, 0)
+
+    def decode_from(self, buffer: bytes, offset: int = 0) -> None:
+        """
+        Decode the Basic Header from a buffer at the given offset.
+
+        Parameters
+        ----------
+        buffer : bytes
+            Buffer to read from. At least offset + 4 bytes long.
+        offset : int
+            Offset of the Basic Header in the buffer.
+        """
+        version_nh, self.reserved, lt, self.rhl = BASIC_HEADER_STRUCT.unpack_from(buffer, offset)
+        self.version = version_nh >> 4
+        self.nh = BasicNH(version_nh & 0xF)
+        self.lt.multiplier = lt >> 2
+        self.lt.base = LTbase(lt & 0x03)
 
     def initialize_with_mib(self, mib: MIB) -> None:
         """
@@ -1,3 +1,5 @@
+import struct
+
 from .service_access_point import (
     CommonNH,
     HeaderType,
@@ -10,6 +12,11 @@ from .service_access_point import (
     LocationServiceHST,
 )
 from .exceptions import DecodeError
+from .mib import MIB
+
+# NH (4 bits) | Reserved (4 bits), HT (4 bits) | HST (4 bits), TC (8 bits), Flags (8 bits), PL (16 bits),
+# MHL (8 bits), Reserved (8 bits)
+COMMON_HEADER_STRUCT = struct.Struct(">BBBBHBB")
 
 
 class CommonHeader:
@@ -51,7 +58,7 @@ class CommonHeader:
         self.mhl = 0
         self.reserved = 0
 
-    def initialize_with_request(self, request: GNDataRequest) -> None:
+    def initialize_with_request(self, request: GNDataRequest, mib: MIB = None) -> None:
         """
         Initializes the Common Header with a GNDataRequest.
 
@@ -59,6 +66,9 @@ class CommonHeader:
         ----------
         request : GNDataRequest
             GNDataRequest to use.
+        mib : MIB
+            MIB to use. The MHL of multi-hop packets is itsGnDefaultHopLimit (Section 10.3.4 Table 20), the same
+            value as the RHL set by BasicHeader.initialize_with_mib. If None, the MHL is 1.
         """
         self.nh = request.upper_protocol_entity
         self.ht = request.packet_transport_type.header_type
@@ -67,8 +77,10 @@ class CommonHeader:
         self.pl = request.length
         if self.ht == HeaderType.TSB and self.hst == TopoBroadcastHST.SINGLE_HOP:
             self.mhl = 1
+        elif mib is not None:
+            # GN-DATA.request has no Maximum hop limit parameter, so the default one is always used
+            self.mhl = mib.itsGnDefaultHopLimit
         else:
-            # TODO: Set the maximum hop limit on other cases than SHB As specified in: Section 10.3.4 Table 20
             self.mhl = 1
 
     def encode_to_int(self) -> int:
@@ -99,9 +111,40 @@ class CommonHeader:
         Returns
         -------
         bytes :
-            Encoded Common Header. 4 bytes.
+            Encoded Common Header. 8 bytes.
+        """
+        return COMMON_HEADER_STRUCT.pack(
+            self.nh.value << 4 | self.reserved,
+            self.ht.value << 4 | self.hst.value,
+            self.tc.encode_to_int(),
+            self.flags,
+            self.pl,
+            self.mhl,
+            self.reserved,
+        )
+
+    def encode_into(self, buffer: bytearray, offset: int = 0) -> None:
         """
-        return self.encode_to_int().to_bytes(8, "big")
+        Encodes the Common Header into a buffer at the given offset.
+
+        Parameters
+        ----------
+        buffer : bytearray
+            Buffer to write to. At least offset + 8 bytes long.
+        offset : int
+            Offset of the Common Header in the buffer.
+        """
+        COMMON_HEADER_STRUCT.pack_into(
+            buffer,
+            offset,
+            self.nh.value << 4 | self.reserved,
+            self.ht.value << 4 | self.hst.value,
+            self.tc.encode_to_int(),
+            self.flags,
+            self.pl,
+            self.mhl,
+            self.reserved,
+        )
 
     def decode_from_int(self, header: int) -> None:
         """
@@ -110,25 +153,9 @@ class CommonHeader:
         Parameters
         ----------
         header : int
-            Encoded Common Header. 4 bytes.
+            Encoded Common Header. 8 bytes.
         """
-        self.nh = CommonNH((header >> (4 + 8 * 7)) & 15)
-        self.ht = HeaderType((header >> (4 + 8 * 6)) & 15)
-        if self.ht == HeaderType.GEOBROADCAST:
-            self.hst = GeoBroadcastHST((header >> (8 * 6)) & 15)
-        elif self.ht == HeaderType.TSB:
-            self.hst = TopoBroadcastHST((header >> (8 * 6)) & 15)
-        elif self.ht == HeaderType.GEOANYCAST:
-            self.hst = GeoAnycastHST((header >> (8 * 6)) & 15)
-        elif self.ht == HeaderType.LS:
-            self.hst = LocationServiceHST((header >> (8 * 6)) & 15)
-        else:
-            self.hst = HeaderSubType((header >> (8 * 6)) & 15)
-        self.tc = TrafficClass()
-        self.tc.decode_from_int((header >> 8 * 5) & 255)
-        self.flags = (header >> 8 * 4) & 128
-        self.pl = (header >> 8 * 2) & 65535
-        self.mhl = (header >> 8) & 255
+        self.decode_from(header.to_bytes(8, "big"), 0)
 
     def decode_from_bytes(self, header: bytes) -> None:
         """
@@ -141,7 +168,36 @@ class CommonHeader:
         """
         if len(header) < 8:
             raise DecodeError("Common Header must be 8 bytes long")
-        self.decode_from_int(int.from_bytes(header[0:8], "big"))
+        self.decode_from(header, 0)
+
+    def decode_from(self, buffer: bytes, offset: int = 0) -> None:
+        """
+        Decodes a Common Header from a buffer at the given offset.
+
+        Parameters
+        ----------
+        buffer : bytes
+            Buffer to read from. At least offset + 8 bytes long.
+        offset : int
+            Offset of the Common Header in the buffer.
+        """
+        nh, ht_hst, tc, flags, self.pl, self.mhl, _ = COMMON_HEADER_STRUCT.unpack_from(buffer, offset)
+        self.nh = CommonNH(nh >> 4)
+        self.ht = HeaderType(ht_hst >> 4)
+        hst = ht_hst & 15
+        if self.ht == HeaderType.GEOBROADCAST:
+            self.hst = GeoBroadcastHST(hst)
+        elif self.ht == HeaderType.TSB:
+            self.hst = TopoBroadcastHST(hst)
+        elif self.ht == HeaderType.GEOANYCAST:
+            self.hst = GeoAnycastHST(hst)
+        elif self.ht == HeaderType.LS:
+            self.hst = LocationServiceHST(hst)
+        else:
+            self.hst = HeaderSubType(hst)
+        self.tc = TrafficClass()
+        self.tc.decode_from_int(tc)
+        self.flags = flags & 128
 
     def __eq__(self, __value: object) -> bool:
         """
@@ -1,7 +1,15 @@
+import struct
+
 from .exceptions import DecodeError
 from .position_vector import LongPositionVector
 from .service_access_point import GNDataRequest
 
+# SN (16 bits), Reserved (16 bits). Followed by the SO PV (24 bytes)
+GBC_EXTENDED_HEADER_PREFIX_STRUCT = struct.Struct(">HH")
+# Latitude (32 bits), Longitude (32 bits), Distance a (16 bits), Distance b (16 bits), Angle (16 bits),
+# Reserved (16 bits)
+GBC_EXTENDED_HEADER_AREA_STRUCT = struct.Struct(">iiHHHH")
+
 
 class GBCExtendedHeader:
     """
@@ -64,16 +72,32 @@ class GBCExtendedHeader:
         bytes
             The encoded bytes.
         """
-        return (
-            self.sn.to_bytes(2, "big")
-            + self.reserved.to_bytes(2, "big")
-            + self.so_pv.encode()
-            + self.latitude.to_bytes(4, "big")
-            + self.longitude.to_bytes(4, "big")
-            + self.a.to_bytes(2, "big")
-            + self.b.to_bytes(2, "big")
-            + self.angle.to_bytes(2, "big")
-            + self.reserved2.to_bytes(2, "big")
+        buffer = bytearray(44)
+        self.encode_into(buffer, 0)
+        return bytes(buffer)
+
+    def encode_into(self, buffer: bytearray, offset: int = 0) -> None:
+        """
+        Encode the GBC Extended Header into a buffer at the given offset.
+
+        Parameters
+        ----------
+        buffer : bytearray
+            Buffer to write to. At least offset + 44 bytes long.
+        offset : int
+            Offset of the GBC Extended Header in the buffer.
+        """
+        GBC_EXTENDED_HEADER_PREFIX_STRUCT.pack_into(buffer, offset, self.sn, self.reserved)
+        self.so_pv.encode_into(buffer, offset + 4)
+        GBC_EXTENDED_HEADER_AREA_STRUCT.pack_into(
+            buffer,
+            offset + 28,
+            self.latitude,
+            self.longitude,
+            self.a,
+            self.b,
+            self.angle,
+            self.reserved2,
         )
 
     def decode(self, header: bytes) -> None:
@@ -92,15 +116,29 @@ class GBCExtendedHeader:
         """
         if len(header) < 44:
             raise DecodeError("GBC Extended Header must be 44 bytes long")
-        self.sn = int.from_bytes(header[0:2], "big")
-        self.reserved = int.from_bytes(header[2:4], "big")
-        self.so_pv.decode(header[4:28])
-        self.latitude = int.from_bytes(header[28:32], "big")
-        self.longitude = int.from_bytes(header[32:36], "big")
-        self.a = int.from_bytes(header[36:38], "big")
-        self.b = int.from_bytes(header[38:40], "big")
-        self.angle = int.from_bytes(header[40:42], "big")
-        self.reserved2 = int.from_bytes(header[42:44], "big")
+        self.decode_from(header, 0)
+
+    def decode_from(self, buffer: bytes, offset: int = 0) -> None:
+        """
+        Decode the GBC Extended Header from a buffer at the given offset.
+
+        Parameters
+        ----------
+        buffer : bytes
+            Buffer to read from. At least offset + 44 bytes long.
+        offset : int
+            Offset of the GBC Extended Header in the buffer.
+        """
+        self.sn, self.reserved = GBC_EXTENDED_HEADER_PREFIX_STRUCT.unpack_from(buffer, offset)
+        self.so_pv.decode_from(buffer, offset + 4)
+        (
+            self.latitude,
+            self.longitude,
+            self.a,
+            self.b,
+            self.angle,
+            self.reserved2,
+        ) = GBC_EXTENDED_HEADER_AREA_STRUCT.unpack_from(buffer, offset + 28)
 
     def __str__(self) -> str:
         return (
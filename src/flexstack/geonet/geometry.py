@@ -0,0 +1,191 @@
+from __future__ import annotations
+from collections.abc import Sequence
+import math
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from .service_access_point import Area, GeoBroadcastHST
+
+EARTH_RADIUS = 6371000  # Radius of the Earth in meters
+NORTH_SCALE = EARTH_RADIUS * math.pi / 180 / 10000000  # Meters per 1/10 micro degree of latitude
+
+# Values of GeoBroadcastHST
+AREA_CIRCLE = 0
+AREA_RECT = 1
+AREA_ELIP = 2
+
+
+class AreaGeometry:
+    """
+    Precomputed terms of a geographical area used by the geometric function F. As specified in
+    ETSI EN 302 931 V1.1.1 (2011-07). Section 5.
+
+    Points are projected on a local plane tangent at the centre of the area (equirectangular projection),
+    and then rotated so that the x axis is the long side (a) of the area, whose azimuth is given by the angle
+    of the area (degrees clockwise from North).
+
+    Attributes
+    ----------
+    latitude : int
+        Latitude of the centre of the area. In 1/10 micro degree.
+    longitude : int
+        Longitude of the centre of the area. In 1/10 micro degree.
+    east_scale : float
+        Meters per 1/10 micro degree of longitude at the latitude of the centre.
+    sin_angle : float
+        Sine of the azimuth angle of the area.
+    cos_angle : float
+        Cosine of the azimuth angle of the area.
+    """
+
+    def __init__(self, latitude: int, longitude: int, angle: int) -> None:
+        """
+        Parameters
+        ----------
+        latitude : int
+            Latitude of the centre of the area. In 1/10 micro degree.
+        longitude : int
+            Longitude of the centre of the area. In 1/10 micro degree.
+        angle : int
+            Azimuth angle of the long side of the area. In degrees from North.
+        """
+        self.latitude = latitude
+        self.longitude = longitude
+        self.east_scale = NORTH_SCALE * math.cos(math.radians(latitude / 10000000))
+        angle = math.radians(angle)
+        self.sin_angle = math.sin(angle)
+        self.cos_angle = math.cos(angle)
+
+    def cartesian_coordinates(self, latitude: int, longitude: int) -> tuple[float, float]:
+        """
+        Returns the cartesian coordinates of a point in the reference system of the area.
+
+        Parameters
+        ----------
+        latitude : int
+            Latitude of the point. In 1/10 micro degree.
+        longitude : int
+            Longitude of the point. In 1/10 micro degree.
+
+        Returns
+        -------
+        Tuple[float, float]
+            x (along the long side a) and y (along the short side b) in meters.
+        """
+        north = NORTH_SCALE * (latitude - self.latitude)
+        east = self.east_scale * (longitude - self.longitude)
+        return (
+            north * self.cos_angle + east * self.sin_angle,
+            east * self.cos_angle - north * self.sin_angle,
+        )
+
+
+def rotate(north: float, east: float, sin_angle: float, cos_angle: float) -> tuple[float, float]:
+    """
+    Rotates a (north, east) distance to the reference system of an area with the given azimuth angle.
+
+    Returns
+    -------
+    Tuple[float, float]
+        x (along the azimuth) and y (perpendicular to it, clockwise) in meters.
+    """
+    return (
+        north * cos_angle + east * sin_angle,
+        east * cos_angle - north * sin_angle,
+    )
+
+
+def geometric_function_f(area_type: int, x: float, y: float, a: float, b: float) -> float:
+    """
+    Geometric function F for a point P(x, y) in the reference system of the area.
+    ETSI EN 302 931 V1.1.1 (2011-07). Section 5.
+
+    F is 1 at the centre of the area, positive inside, zero at the border and negative outside.
+
+    Parameters
+    ----------
+    area_type : int
+        Value of the GeoBroadcastHST of the area.
+    x : float
+        Distance along the long side in meters.
+    y : float
+        Distance along the short side in meters.
+    a : float
+        Length of the semi-major axis (or the radius) in meters.
+    b : float
+        Length of the semi-minor axis in meters.
+
+    Raises
+    ------
+    ValueError
+        If the area type is not valid.
+    """
+    if area_type == AREA_CIRCLE:
+        return 1 - (x / a) ** 2 - (y / a) ** 2
+    if area_type == AREA_ELIP:
+        return 1 - (x / a) ** 2 - (y / b) ** 2
+    if area_type == AREA_RECT:
+        return min(1 - (x / a) ** 2, 1 - (y / b) ** 2)
+    raise ValueError("Invalid area type")
+
+
+def geometric_function_f_batch(
+    areas: Sequence[tuple[GeoBroadcastHST, Area]],
+    latitudes: Sequence[int],
+    longitudes: Sequence[int],
+) -> np.ndarray:
+    """
+    Evaluates the geometric function F of several points against several areas at once. Requires NumPy.
+
+    Parameters
+    ----------
+    areas : Sequence[Tuple[GeoBroadcastHST, Area]]
+        Areas, with their type.
+    latitudes : Sequence[int]
+        Latitudes of the points. In 1/10 micro degree.
+    longitudes : Sequence[int]
+        Longitudes of the points. In 1/10 micro degree.
+
+    Returns
+    -------
+    np.ndarray
+        Array of shape (len(areas), len(latitudes)) with F of every point for every area.
+
+    Raises
+    ------
+    ImportError
+        If NumPy is not installed.
+    ValueError
+        If an area type is not valid.
+    """
+    # NumPy takes about 100 ms to import, only the users of the batch function pay for it
+    try:
+        import numpy as np  # pylint: disable=import-outside-toplevel,redefined-outer-name
+    except ImportError as e:
+        raise ImportError("NumPy is required to evaluate the geometric function in batch") from e
+    area_types = np.array([area_type.value for area_type, _ in areas])[:, np.newaxis]
+    if not np.isin(area_types, (AREA_CIRCLE, AREA_RECT, AREA_ELIP)).all():
+        raise ValueError("Invalid area type")
+    geometries = [area.geometry() for _, area in areas]
+    centre_latitudes = np.array([geometry.latitude for geometry in geometries], dtype=float)[:, np.newaxis]
+    centre_longitudes = np.array([geometry.longitude for geometry in geometries], dtype=float)[:, np.newaxis]
+    east_scales = np.array([geometry.east_scale for geometry in geometries])[:, np.newaxis]
+    sin_angles = np.array([geometry.sin_angle for geometry in geometries])[:, np.newaxis]
+    cos_angles = np.array([geometry.cos_angle for geometry in geometries])[:, np.newaxis]
+    a = np.array([area.a for _, area in areas], dtype=float)[:, np.newaxis]
+    b = np.array([area.b for _, area in areas], dtype=float)[:, np.newaxis]
+    b = np.where(area_types == AREA_CIRCLE, a, b)
+
+    latitudes = np.asarray(latitudes, dtype=float)[np.newaxis, :]
+    longitudes = np.asarray(longitudes, dtype=float)[np.newaxis, :]
+    north = NORTH_SCALE * (latitudes - centre_latitudes)
+    east = east_scales * (longitudes - centre_longitudes)
+    x = north * cos_angles + east * sin_angles
+    y = east * cos_angles - north * sin_angles
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_term = 1 - (x / a) ** 2
+        y_term = 1 - (y / b) ** 2
+    return np.where(area_types == AREA_RECT, np.minimum(x_term, y_term), x_term + y_term - 1)
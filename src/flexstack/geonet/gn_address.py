@@ -1,4 +1,6 @@
+from __future__ import annotations
 from enum import Enum
+import struct
 
 from .exceptions import DecodeError
 
@@ -115,6 +117,41 @@ class MID:
             raise InvalidMIDLength("MID must be 6 bytes long")
         self.mid: bytes = mid
 
+    @classmethod
+    def interned(cls, mid: bytes) -> MID:
+        """
+        Returns the shared MID instance for the given LL_ADDR.
+
+        Decoding the same source address from every received packet then yields the same
+        object, so hashing and comparing it (e.g. in the Location Table) is cheap.
+
+        Parameters
+        ----------
+        mid : bytes
+            LL_ADDR (6 bytes).
+
+        Returns
+        -------
+        MID
+            Interned MID.
+        """
+        mid = bytes(mid)
+        instance = _INTERNED_MIDS.get(mid)
+        if instance is None:
+            if len(_INTERNED_MIDS) >= MAX_INTERNED_MIDS:
+                _INTERNED_MIDS.clear()
+            instance = cls(mid)
+            _INTERNED_MIDS[mid] = instance
+        return instance
+
+    def __eq__(self, __o: object) -> bool:
+        if not isinstance(__o, MID):
+            return NotImplemented
+        return self.mid == __o.mid
+
+    def __hash__(self) -> int:
+        return hash(self.mid)
+
     def encode_to_address(self) -> int:
         """
         Encodes MID to int for GN address
@@ -127,6 +164,12 @@ class MID:
         return int.from_bytes(b'\x00\x00'+self.mid, byteorder='big')
 
 
+# M (1 bit) | ST (4 bits) | Reserved (3 bits), Reserved (8 bits), MID (48 bits)
+GN_ADDRESS_STRUCT = struct.Struct(">Bx6s")
+MAX_INTERNED_MIDS = 4096
+_INTERNED_MIDS: dict[bytes, MID] = {}
+
+
 class GNAddress:
     """
     GeoNetworking Address as described in ETSI EN 302 636-4-1 V1.4.1 (2020-01). Section 6.3
@@ -190,8 +233,20 @@ class GNAddress:
         bytes
             Encoded GNAddress
         """
-        return (self.m.encode_to_address() | self.st.encode_to_address() | self.mid.encode_to_address()).to_bytes(
-            8, byteorder='big')
+        return GN_ADDRESS_STRUCT.pack(self.m.value << 7 | self.st.value << 3, self.mid.mid)
+
+    def encode_into(self, buffer: bytearray, offset: int = 0) -> None:
+        """
+        Encodes GNAddress into a buffer at the given offset.
+
+        Parameters
+        ----------
+        buffer : bytearray
+            Buffer to write to. At least offset + 8 bytes long.
+        offset : int
+            Offset of the GNAddress in the buffer.
+        """
+        GN_ADDRESS_STRUCT.pack_into(buffer, offset, self.m.value << 7 | self.st.value << 3, self.mid.mid)
 
     def encode_to_int(self) -> int:
         """
@@ -210,9 +265,23 @@ class GNAddress:
         """
         if len(data) < 8:
             raise DecodeError("GNAddress must be 8 bytes long")
-        self.m = M((data[0] & 0x80) >> 7)
-        self.st = ST((data[0] & 0x78) >> 3)
-        self.mid = MID(data[2:8])
+        self.decode_from(data, 0)
+
+    def decode_from(self, buffer: bytes, offset: int = 0) -> None:
+        """
+        Decodes GNAddress from a buffer at the given offset.
+
+        Parameters
+        ----------
+        buffer : bytes
+            Buffer to read from. At least offset + 8 bytes long.
+        offset : int
+            Offset of the GNAddress in the buffer.
+        """
+        first_byte, mid = GN_ADDRESS_STRUCT.unpack_from(buffer, offset)
+        self.m = M(first_byte >> 7)
+        self.st = ST((first_byte & 0x78) >> 3)
+        self.mid = MID.interned(mid)
 
     def __eq__(self, __o: object) -> bool:
         """
@@ -225,7 +294,18 @@ class GNAddress:
         __o : object
             Object to compare
         """
+        if not isinstance(__o, GNAddress):
+            return NotImplemented
         return self.mid.mid == __o.mid.mid
 
+    def __hash__(self) -> int:
+        """
+        Hash of the GNAddress, consistent with __eq__ (only the MID field is used).
+
+        Allows the GNAddress to be used as key of the Location Table. A GNAddress used as a key
+        must not be modified afterwards.
+        """
+        return hash(self.mid.mid)
+
     def __str__(self) -> str:
         return f"GNAddress(M={self.m}, ST={self.st}, MID={self.mid})"
@@ -0,0 +1,231 @@
+from __future__ import annotations
+import struct
+import threading
+
+from .basic_header import BasicHeader
+from .common_header import CommonHeader
+from .gbc_extended_header import GBCExtendedHeader
+from .mib import MIB
+from .position_vector import LongPositionVector
+from .service_access_point import GNDataRequest, HeaderType
+
+# Payload length (16 bits) of the Common Header, at offset 4 + 4
+PAYLOAD_LENGTH_STRUCT = struct.Struct(">H")
+PAYLOAD_LENGTH_OFFSET = 8
+BASIC_AND_COMMON_HEADER_LENGTH = 12
+SHB_HEADER_LENGTH = BASIC_AND_COMMON_HEADER_LENGTH + 24 + 4
+GBC_HEADER_LENGTH = BASIC_AND_COMMON_HEADER_LENGTH + 44
+PAYLOAD_LENGTH_BUCKET_SIZE = 256
+MAX_TEMPLATES = 64
+
+
+class HeaderTemplate:
+    """
+    Pre-encoded headers of a GN packet.
+
+    Holds a preallocated buffer whose first bytes are the encoded headers of the packet. The fields that
+    change from one packet to the next are patched into the buffer when a packet is built, so the
+    rest of the headers is never encoded again.
+
+    Attributes
+    ----------
+    header_length : int
+        Length of the headers, i.e. offset of the payload in the buffer.
+    buffer : bytearray
+        Preallocated buffer. Big enough for the headers and a payload of the bucket size.
+    lock : threading.Lock
+        Lock protecting the buffer, as requests may come from several facility threads.
+    """
+
+    def __init__(self, prefix: bytes, header_length: int, max_payload_length: int) -> None:
+        self.header_length = header_length
+        self.buffer = bytearray(header_length + max_payload_length)
+        self.buffer[0:len(prefix)] = prefix
+        self.lock = threading.Lock()
+
+    def _finish_packet(self, payload_length: int, data: bytes) -> bytes:
+        """
+        Patches the payload length and copies the payload. Must be called with the lock held.
+
+        Returns
+        -------
+        bytes
+            The complete packet.
+        """
+        PAYLOAD_LENGTH_STRUCT.pack_into(self.buffer, PAYLOAD_LENGTH_OFFSET, payload_length)
+        end = self.header_length + len(data)
+        self.buffer[self.header_length:end] = data
+        return bytes(memoryview(self.buffer)[0:end])
+
+
+class SHBHeaderTemplate(HeaderTemplate):
+    """
+    Pre-encoded Basic Header, Common Header and Media-Dependent Data of a SHB packet.
+    ETSI EN 302 636-4-1 V1.4.1 (2020-01). Section 9.8.4
+
+    The payload length and the SO PV are patched on every packet.
+    """
+
+    def build_packet(self, long_position_vector: LongPositionVector, payload_length: int, data: bytes) -> bytes:
+        """
+        Builds a SHB packet.
+
+        Parameters
+        ----------
+        long_position_vector : LongPositionVector
+            Source position vector.
+        payload_length : int
+            Value of the payload length field of the Common Header.
+        data : bytes
+            Payload.
+
+        Returns
+        -------
+        bytes
+            The SHB packet.
+        """
+        with self.lock:
+            long_position_vector.encode_into(self.buffer, BASIC_AND_COMMON_HEADER_LENGTH)
+            return self._finish_packet(payload_length, data)
+
+
+class GBCHeaderTemplate(HeaderTemplate):
+    """
+    Pre-encoded Basic Header and Common Header of a GBC packet.
+    ETSI EN 302 636-4-1 V1.4.1 (2020-01). Section 9.8.5
+
+    The payload length and the GBC Extended Header (SN, SO PV and area) are patched on every packet.
+    """
+
+    def build_packet(self, gbc_extended_header: GBCExtendedHeader, payload_length: int, data: bytes) -> bytes:
+        """
+        Builds a GBC packet.
+
+        Parameters
+        ----------
+        gbc_extended_header : GBCExtendedHeader
+            GBC Extended Header of the packet.
+        payload_length : int
+            Value of the payload length field of the Common Header.
+        data : bytes
+            Payload.
+
+        Returns
+        -------
+        bytes
+            The GBC packet.
+        """
+        with self.lock:
+            gbc_extended_header.encode_into(self.buffer, BASIC_AND_COMMON_HEADER_LENGTH)
+            return self._finish_packet(payload_length, data)
+
+
+class HeaderTemplateCache:
+    """
+    Cache of header templates for the packets sent by the router.
+
+    Templates are keyed by (traffic class, next header, HT, HST, lifetime, hop limit, payload length bucket),
+    which are the only inputs of the pre-encoded part of the headers.
+
+    Attributes
+    ----------
+    mib : MIB
+        MIB to use.
+    templates : Dict[tuple, HeaderTemplate]
+        Cached templates.
+    """
+
+    def __init__(self, mib: MIB) -> None:
+        self.mib = mib
+        self.templates: dict[tuple, HeaderTemplate] = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def payload_length_bucket(length: int) -> int:
+        """
+        Returns the payload length bucket of a payload, i.e. the payload capacity of the template.
+
+        Parameters
+        ----------
+        length : int
+            Length of the payload.
+        """
+        return (length // PAYLOAD_LENGTH_BUCKET_SIZE + 1) * PAYLOAD_LENGTH_BUCKET_SIZE
+
+    def _get_template(self, key: tuple, factory) -> HeaderTemplate:
+        template = self.templates.get(key)
+        if template is None:
+            with self.lock:
+                template = self.templates.get(key)
+                if template is None:
+                    if len(self.templates) >= MAX_TEMPLATES:
+                        self.templates.clear()
+                    template = factory()
+                    self.templates[key] = template
+        return template
+
+    def get_shb_template(self, request: GNDataRequest) -> SHBHeaderTemplate:
+        """
+        Gets the template for a SHB request.
+
+        Parameters
+        ----------
+        request : GNDataRequest
+            GNDataRequest to send.
+        """
+        bucket = self.payload_length_bucket(len(request.data))
+        key = (
+            request.traffic_class.encode_to_int(),
+            request.upper_protocol_entity,
+            request.packet_transport_type.header_type,
+            request.packet_transport_type.header_subtype,
+            self.mib.itsGnDefaultPacketLifetime,
+            1,
+            bucket,
+        )
+
+        def factory() -> SHBHeaderTemplate:
+            basic_header = BasicHeader()
+            basic_header.initialize_with_mib(self.mib)
+            basic_header.set_rhl(1)
+            common_header = CommonHeader()
+            common_header.initialize_with_request(request)
+            # Media-Dependent Data is left zeroed in the buffer
+            return SHBHeaderTemplate(
+                basic_header.encode_to_bytes() + common_header.encode_to_bytes(), SHB_HEADER_LENGTH, bucket
+            )
+
+        return self._get_template(key, factory)
+
+    def get_gbc_template(self, request: GNDataRequest) -> GBCHeaderTemplate:
+        """
+        Gets the template for a GBC request.
+
+        Parameters
+        ----------
+        request : GNDataRequest
+            GNDataRequest to send.
+        """
+        bucket = self.payload_length_bucket(len(request.data))
+        key = (
+            request.traffic_class.encode_to_int(),
+            request.upper_protocol_entity,
+            HeaderType.GEOBROADCAST,
+            request.packet_transport_type.header_subtype,
+            self.mib.itsGnDefaultPacketLifetime,
+            self.mib.itsGnDefaultHopLimit,
+            bucket,
+        )
+
+        def factory() -> GBCHeaderTemplate:
+            basic_header = BasicHeader()
+            basic_header.initialize_with_mib(self.mib)
+            common_header = CommonHeader()
+            common_header.initialize_with_request(request, self.mib)
+            common_header.ht = HeaderType.GEOBROADCAST
+            common_header.hst = request.packet_transport_type.header_subtype
+            return GBCHeaderTemplate(
+                basic_header.encode_to_bytes() + common_header.encode_to_bytes(), GBC_HEADER_LENGTH, bucket
+            )
+
+        return self._get_template(key, factory)
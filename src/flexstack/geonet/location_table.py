@@ -1,11 +1,65 @@
 from __future__ import annotations
+from collections.abc import Callable
+import heapq
 import time
-import hashlib
 from .gbc_extended_header import GBCExtendedHeader
 from .gn_address import GNAddress
 from .mib import MIB
+from .neighbour_index import NeighbourIndex
 from .position_vector import LongPositionVector, TST
-from .exceptions import DuplicatedPacketException, IncongruentTimestampException
+from .exceptions import DuplicatedPacketException
+
+# Minimum time between two updates of the PDR EMA, in seconds
+PDR_MIN_INTERVAL = 0.01
+
+
+class DuplicatePacketList:
+    """
+    Duplicate Packet List (DPL) of a source. As specified in ETSI EN 302 636-4-1 V1.4.1 (2020-01). Annex A.
+
+    Holds the identifiers (SN, TST) of the last packets received from a source. The identifiers
+    are kept in a set for O(1) membership checks and in a ring buffer that evicts the oldest
+    identifier once the list is full.
+
+    Attributes
+    ----------
+    length : int
+        Maximum number of identifiers (itsGnDPLLength).
+    ring : List[Tuple[int, int]]
+        Ring buffer of identifiers, in arrival order.
+    index : int
+        Position of the ring buffer where the next identifier is written.
+    identifiers : Set[Tuple[int, int]]
+        Identifiers currently in the list.
+    """
+
+    def __init__(self, length: int):
+        self.length = max(length, 1)
+        self.ring: list[tuple[int, int]] = [None] * self.length
+        self.index = 0
+        self.identifiers: set[tuple[int, int]] = set()
+
+    def __contains__(self, identifier: tuple[int, int]) -> bool:
+        return identifier in self.identifiers
+
+    def __len__(self) -> int:
+        return len(self.identifiers)
+
+    def add(self, identifier: tuple[int, int]) -> None:
+        """
+        Adds an identifier, evicting the oldest one if the list is full.
+
+        Parameters
+        ----------
+        identifier : Tuple[int, int]
+            (SN, TST) of the packet.
+        """
+        evicted = self.ring[self.index]
+        if evicted is not None:
+            self.identifiers.discard(evicted)
+        self.ring[self.index] = identifier
+        self.identifiers.add(identifier)
+        self.index = (self.index + 1) % self.length
 
 
 class LocationTableEntry:
@@ -24,13 +78,17 @@ class LocationTableEntry:
     is_neighbour : bool
         Flag indicating that the GeoAdhoc router is in direct communication
         range, i.e. is a neighbour.
-    dpl : List[bytes]
-        Duplicate packet list for source GN_ADDR. (List of hashes of the packets)
+    dpl : DuplicatePacketList
+        Duplicate packet list for source GN_ADDR. (Identifiers (SN, TST) of the last packets)
     tst : TST
         Timestamp TST(GN_ADDR): The timestamp of the last packet from the source GN_ADDR that was identified
         as 'not duplicated'
     pdr : int
         Packet data rate PDR(GN_ADDR) as Exponential Moving Average (EMA) (clause B.2).
+    pdr_time : float
+        Local time (time.monotonic()) of the last update of the PDR, None before the first packet.
+    pdr_bytes : int
+        Bytes received since the last update of the PDR.
     """
 
     def __init__(self, mib: MIB):
@@ -40,9 +98,11 @@ class LocationTableEntry:
         self.position_vector: LongPositionVector = LongPositionVector()
         self.ls_pending: bool = False
         self.is_neighbour: bool = False
-        self.dpl: list[bytes] = []
+        self.dpl: DuplicatePacketList = DuplicatePacketList(mib.itsGnDPLLength)
         self.tst: TST = TST()
         self.pdr: int = 0
+        self.pdr_time: float = None
+        self.pdr_bytes = 0
 
     def get_gn_address(self) -> GNAddress:
         """
@@ -61,42 +121,48 @@ class LocationTableEntry:
         Annex C2 of ETSI EN 302 636-4-1 V1.4.1 (2020-01)
         The algorithm is implemented partially on the TST
 
+        The position vector is only replaced if its TST is newer than the stored one. Otherwise it is kept, and
+        the packet that carried it is still processed: a source sends several packets per position fix, all with
+        the same TST.
+
         Parameters
         ----------
         position_vector : LongPositionVector
             Position vector to update.
-
-        Raises
-        ------
-        IncongruentTimestampException
-            If there has been another packet with posterior timestamp received before.
         """
-        if self.position_vector.tst.msec == 0:
-            self.position_vector = position_vector
-        elif position_vector.tst > self.position_vector.tst:
+        if self.position_vector.tst.msec == 0 or position_vector.tst > self.position_vector.tst:
             self.position_vector = position_vector
-        else:
-            raise IncongruentTimestampException("Position vector not updated")
 
-    def update_pdr(self, position_vector: LongPositionVector, packet_size: int) -> None:
+    def update_pdr(self, packet_size: int, receive_time: float = None) -> None:
         """
         Updates the Packet Data Rate (PDR).
         Annex B2 of ETSI EN 302 636-4-1 V1.4.1 (2020-01)
 
+        The rate is measured with the local time of reception, so a source cannot lower its PDR by the timestamps
+        it sends. The packets received less than PDR_MIN_INTERVAL after the last update are accumulated and
+        accounted in the next one, so a burst of frames processed at once does not give an unbounded rate.
+
         Parameters
         ----------
-        position_vector : LongPositionVector
-            Position vector of the packet.
         packet_size : int
             Size of the packet.
+        receive_time : float
+            Time of reception of the packet in seconds, as given by time.monotonic(). Now if None.
         """
-        time_since_last_update = (position_vector.tst - self.tst) / 1000
-        self.tst = position_vector.tst
-        if time_since_last_update > 0:
-            current_pdr = packet_size / time_since_last_update
+        if receive_time is None:
+            receive_time = time.monotonic()
+        if self.pdr_time is None:
+            self.pdr_time = receive_time
+            return
+        self.pdr_bytes += packet_size
+        time_since_last_update = receive_time - self.pdr_time
+        if time_since_last_update >= PDR_MIN_INTERVAL:
+            current_pdr = self.pdr_bytes / time_since_last_update
             # Equation B1
             beta = self.mib.itsGnMaxPacketDataRateEmaBeta / 100
             self.pdr = beta * self.pdr + (1 - beta) * current_pdr
+            self.pdr_time = receive_time
+            self.pdr_bytes = 0
 
     def update_with_shb_packet(
         self, position_vector: LongPositionVector, packet: bytes
@@ -113,20 +179,14 @@ class LocationTableEntry:
         packet : bytes
             SHB packet (without the basic header, the common header and the position vector).
 
-        Raises
-        ------
-        IncongruentTimestampException
-            If there has been another packet with posterior timestamp received before.
-        DuplicatedPacketException
-            If the packet is duplicated.
+        SHB packets carry no sequence number, so they are not checked against the DPL (Annex A.2 only applies
+        to multi-hop packets).
         """
-        # Own added check (not in the standard)
-        self.check_duplicate_packet(packet)
-        # End own added check
         # step 4
         self.update_position_vector(position_vector)
         # step 5
-        self.update_pdr(position_vector, (len(packet) + 8 + 4))
+        self.tst = position_vector.tst
+        self.update_pdr(len(packet) + 8 + 4)
         # step 6
         self.is_neighbour = True
 
@@ -147,58 +207,73 @@ class LocationTableEntry:
 
         Raises
         ------
-        IncongruentTimestampException
-            If there has been another packet with posterior timestamp received before.
         DuplicatedPacketException
             If the packet is duplicated.
         """
         position_vector = gbc_extended_header.so_pv
-        # Own added check (not in the standard)
-        self.check_duplicate_packet(packet)
-        # End own added check
+        # step 3
+        self.check_duplicate_packet(gbc_extended_header.sn, position_vector.tst)
         # step 4
         self.update_position_vector(position_vector)
         # step 5
-        self.update_pdr(position_vector, (len(packet) + 8 + 4))
+        self.tst = position_vector.tst
+        self.update_pdr(len(packet) + 8 + 4)
         # step 6
         self.is_neighbour = False
 
-    def check_duplicate_packet(self, packet: bytes) -> None:
+    def check_duplicate_packet(self, sn: int, tst: TST) -> None:
         """
-        Checks if the packet is duplicated.
-
-        ETSI EN 302 636-4-1 V1.4.1 (2020-01)
+        Checks if the packet is duplicated, and adds it to the DPL otherwise.
 
-        Temporary implementation. The DPL is not implemented yet.
+        ETSI EN 302 636-4-1 V1.4.1 (2020-01). Annex A.2
 
         Parameters
         ----------
-        packet : bytes
-            Packet to check.
+        sn : int
+            Sequence number of the packet.
+        tst : TST
+            Timestamp of the source position vector of the packet.
 
         Raises
         ------
         DuplicatedPacketException
             If the packet is duplicated.
         """
-        packet_hash = hashlib.sha256(packet).digest()
-        if packet_hash in self.dpl:
+        identifier = (sn, tst.msec)
+        if identifier in self.dpl:
             raise DuplicatedPacketException("Packet is duplicated")
-        self.dpl.append(packet_hash)
-        if len(self.dpl) > 50:
-            self.dpl.pop(0)
+        self.dpl.add(identifier)
 
 
 class LocationTable:
     """
     Location table class.  ETSI EN 302 636-4-1 V1.4.1 (2020-01). Section 8.1.1
 
+    The entries are indexed by GN address, so lookups are O(1). The lifetime of the entries
+    (Section 8.1.3) is kept in a heap ordered by expiry time, and the set of neighbours is
+    maintained incrementally as entries are updated or expire.
+
     Attributes
     ----------
     mib : MIB
         MIB to use.
-    loc_t : List[LocationTableEntry]
-        Location table.
+    loc_t : Dict[GNAddress, LocationTableEntry]
+        Location table indexed by GN address.
+    neighbours : Dict[GNAddress, LocationTableEntry]
+        Entries with the IS_NEIGHBOUR flag set to TRUE.
+    expiry_heap : List[Tuple[float, int, GNAddress]]
+        Heap of (expiry time, insertion counter, GN address). There is a single item per entry,
+        its expiry time may be older than the one in expiry_times if the entry has been refreshed.
+    expiry_times : Dict[GNAddress, float]
+        Current expiry time (in seconds, as given by time.time()) of each entry.
+    neighbour_index : NeighbourIndex
+        Spatial index of the positions of the neighbours, used by the greedy forwarding algorithm.
+    new_neighbour_callback : Callable[[GNAddress], None]
+        Function called when an entry gets the IS_NEIGHBOUR flag set to TRUE, e.g. to flush the
+        BC forwarding packet buffer.
+    pdr_exceeded : Dict[bytes, LocationTableEntry]
+        Entries whose PDR exceeds itsGnMaxPacketDataRate, indexed by the MID field of their GN address
+        so that the packets of these sources can be dropped before decoding them (see check_pdr).
     """
 
     def __init__(self, mib: MIB):
@@ -211,7 +286,14 @@ class LocationTable:
             MIB to use.
         """
         self.mib = mib
-        self.loc_t: list[LocationTableEntry] = []
+        self.loc_t: dict[GNAddress, LocationTableEntry] = {}
+        self.neighbours: dict[GNAddress, LocationTableEntry] = {}
+        self.neighbour_index = NeighbourIndex()
+        self.expiry_heap: list[tuple[float, int, GNAddress]] = []
+        self.expiry_times: dict[GNAddress, float] = {}
+        self._expiry_counter = 0
+        self.new_neighbour_callback: Callable[[GNAddress], None] = None
+        self.pdr_exceeded: dict[bytes, LocationTableEntry] = {}
 
     def get_entry(self, gn_address: GNAddress) -> LocationTableEntry:
         """
@@ -227,22 +309,119 @@ class LocationTable:
         LocationTableEntry
             Location table entry.
         """
-        for entry in self.loc_t:
-            if entry.get_gn_address() == gn_address:
-                return entry
-        return None
+        return self.loc_t.get(gn_address)
 
     def refresh_table(self) -> None:
         """
         Removes the entries that have expired.
 
-        Temporarily solution following ETSI EN 302 636-4-1 V1.4.1 (2020-01). Section 8.1.3
+        ETSI EN 302 636-4-1 V1.4.1 (2020-01). Section 8.1.3. Only the heap items that are due
+        are visited. If the entry has been refreshed since its item was pushed, the item is
+        pushed again with the new expiry time instead of removing the entry.
         """
-        current_time = TST()
-        current_time.set_in_normal_timestamp_seconds(time.time())
-        for entry in self.loc_t:
-            if (current_time - entry.position_vector.tst) > self.mib.itsGnLifetimeLocTE:
-                self.loc_t.remove(entry)
+        current_time = time.time()
+        while self.expiry_heap and self.expiry_heap[0][0] <= current_time:
+            _, _, gn_address = heapq.heappop(self.expiry_heap)
+            expiry_time = self.expiry_times[gn_address]
+            if expiry_time > current_time:
+                self._push_expiry(expiry_time, gn_address)
+            else:
+                del self.expiry_times[gn_address]
+                del self.loc_t[gn_address]
+                self.neighbours.pop(gn_address, None)
+                self.neighbour_index.remove(gn_address)
+                self.pdr_exceeded.pop(gn_address.mid.mid, None)
+
+    def _push_expiry(self, expiry_time: float, gn_address: GNAddress) -> None:
+        self._expiry_counter += 1
+        heapq.heappush(self.expiry_heap, (expiry_time, self._expiry_counter, gn_address))
+
+    def reset_lifetime(self, gn_address: GNAddress) -> None:
+        """
+        Sets the lifetime of the entry to itsGnLifetimeLocTE.
+
+        Only the expiry time is updated if the entry already has an item in the expiry heap,
+        so the heap holds a single item per entry.
+
+        Parameters
+        ----------
+        gn_address : GNAddress
+            GN address of the entry.
+        """
+        expiry_time = time.time() + self.mib.itsGnLifetimeLocTE
+        if gn_address not in self.expiry_times:
+            self._push_expiry(expiry_time, gn_address)
+        self.expiry_times[gn_address] = expiry_time
+
+    def update_neighbour_set(self, gn_address: GNAddress, entry: LocationTableEntry) -> None:
+        """
+        Keeps the neighbour set and the neighbour index in sync with the IS_NEIGHBOUR flag and the
+        position vector of the entry.
+
+        Parameters
+        ----------
+        gn_address : GNAddress
+            GN address of the entry.
+        entry : LocationTableEntry
+            Entry that has been updated.
+        """
+        if entry.is_neighbour:
+            is_new_neighbour = gn_address not in self.neighbours
+            self.neighbours[gn_address] = entry
+            self.neighbour_index.update(
+                gn_address, entry.position_vector.latitude, entry.position_vector.longitude
+            )
+            if is_new_neighbour and self.new_neighbour_callback:
+                self.new_neighbour_callback(gn_address)
+        else:
+            self.neighbours.pop(gn_address, None)
+            self.neighbour_index.remove(gn_address)
+
+    def update_pdr_exceeded(self, gn_address: GNAddress, entry: LocationTableEntry) -> None:
+        """
+        Keeps the entries whose PDR exceeds itsGnMaxPacketDataRate in pdr_exceeded.
+
+        Parameters
+        ----------
+        gn_address : GNAddress
+            GN address of the entry.
+        entry : LocationTableEntry
+            Entry that has been updated.
+        """
+        if entry.pdr > self.mib.itsGnMaxPacketDataRate * 1000:
+            self.pdr_exceeded[gn_address.mid.mid] = entry
+        elif self.pdr_exceeded:
+            self.pdr_exceeded.pop(gn_address.mid.mid, None)
+
+    def check_pdr(self, mid: bytes, packet_size: int) -> bool:
+        """
+        Checks whether a packet has to be dropped because the PDR of its source exceeds itsGnMaxPacketDataRate.
+        ETSI EN 302 636-4-1 V1.4.1 (2020-01). Annex B.2
+
+        Only the MID of the source is needed, so the check is done before decoding the packet. The dropped
+        packets still update the PDR of the source, so the source is accepted again as soon as its PDR falls
+        below the limit.
+
+        Parameters
+        ----------
+        mid : bytes
+            MID field of the GN address of the source.
+        packet_size : int
+            Size of the packet.
+
+        Returns
+        -------
+        bool
+            True if the packet has to be dropped.
+        """
+        entry = self.pdr_exceeded.get(mid)
+        if entry is None:
+            return False
+        entry.update_pdr(packet_size)
+        if entry.pdr > self.mib.itsGnMaxPacketDataRate * 1000:
+            return True
+        del self.pdr_exceeded[mid]
+        return False
 
     def new_shb_packet(
         self, position_vector: LongPositionVector, packet: bytes
@@ -256,22 +435,19 @@ class LocationTable:
             Position vector of the packet.
         packet : bytes
             SHB packet (without the basic header, the common header and the position vector).
-
-        Raises
-        ------
-        IncongruentTimestampException
-            If there has been another packet with posterior timestamp received before.
-        DuplicatedPacketException
-            If the packet is duplicated.
         """
-        entry: LocationTableEntry = self.get_entry(position_vector.gn_addr)
+        self.refresh_table()
+        gn_address = position_vector.gn_addr
+        entry: LocationTableEntry = self.loc_t.get(gn_address)
         if entry:
             entry.update_with_shb_packet(position_vector, packet)
         else:
             entry = LocationTableEntry(self.mib)
             entry.update_with_shb_packet(position_vector, packet)
-            self.loc_t.append(entry)
-        self.refresh_table()
+            self.loc_t[gn_address] = entry
+        self.reset_lifetime(gn_address)
+        self.update_neighbour_set(gn_address, entry)
+        self.update_pdr_exceeded(gn_address, entry)
 
     def new_gbc_packet(
         self, gbc_extended_header: GBCExtendedHeader, packet: bytes
@@ -288,19 +464,21 @@ class LocationTable:
 
         Raises
         ------
-        IncongruentTimestampException
-            If there has been another packet with posterior timestamp received before.
         DuplicatedPacketException
             If the packet is duplicated.
         """
-        entry: LocationTableEntry = self.get_entry(gbc_extended_header.so_pv.gn_addr)
+        self.refresh_table()
+        gn_address = gbc_extended_header.so_pv.gn_addr
+        entry: LocationTableEntry = self.loc_t.get(gn_address)
         if entry:
             entry.update_with_gbc_packet(packet, gbc_extended_header)
         else:
             entry = LocationTableEntry(self.mib)
             entry.update_with_gbc_packet(packet, gbc_extended_header)
-            self.loc_t.append(entry)
-        self.refresh_table()
+            self.loc_t[gn_address] = entry
+        self.reset_lifetime(gn_address)
+        self.update_neighbour_set(gn_address, entry)
+        self.update_pdr_exceeded(gn_address, entry)
 
     def get_neighbours(self) -> list[LocationTableEntry]:
         """
@@ -311,8 +489,36 @@ class LocationTable:
         List[LocationTableEntry]
             List of neighbours.
         """
-        neighbours: list[LocationTableEntry] = []
-        for entry in self.loc_t:
-            if entry.is_neighbour:
-                neighbours.append(entry)
-        return neighbours
+        self.refresh_table()
+        return list(self.neighbours.values())
+
+    def get_neighbour_by_mid(self, mid: bytes) -> LocationTableEntry | None:
+        """
+        Gets the neighbour whose GN address has a given MID field, i.e. the neighbour with a given LL address.
+
+        Parameters
+        ----------
+        mid : bytes
+            MID field (LL address) of the neighbour.
+
+        Returns
+        -------
+        LocationTableEntry | None
+            Entry of the neighbour, None if there is no neighbour with the MID.
+        """
+        for gn_address, entry in self.neighbours.items():
+            if gn_address.mid.mid == mid:
+                return entry
+        return None
+
+    def has_neighbours(self) -> bool:
+        """
+        Checks if there is at least one neighbour, without building the list of neighbours.
+
+        Returns
+        -------
+        bool
+            True if the Location Table contains a LocTE with the IS_NEIGHBOUR flag set to TRUE.
+        """
+        self.refresh_table()
+        return len(self.neighbours) > 0
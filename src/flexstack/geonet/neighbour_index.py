@@ -0,0 +1,178 @@
+from __future__ import annotations
+import math
+
+from .geometry import NORTH_SCALE
+from .gn_address import GNAddress
+
+# Size of the cells of the grid in 1/10 micro degree (about 220 m of latitude)
+GRID_CELL_SIZE = 20000
+
+
+class NeighbourIndex:
+    """
+    Spatial index of the positions of the neighbours of the router.
+
+    The positions are kept in a uniform grid of latitude / longitude cells. The nearest neighbour to a point is
+    found visiting rings of cells outward from the cell of the point, and stopping as soon as the best distance
+    is not above the minimum distance to the next ring, so only the cells around the point are looked up. When
+    the point is far from all the neighbours and the rings grow larger than the number of occupied cells, the
+    occupied cells are scanned instead.
+
+    Attributes
+    ----------
+    cells : Dict[Tuple[int, int], Dict[GNAddress, Tuple[int, int]]]
+        Occupied cells, with the position (latitude, longitude) of the neighbours in each of them.
+    positions : Dict[GNAddress, Tuple[Tuple[int, int], int, int]]
+        Cell and position of each neighbour.
+    """
+
+    def __init__(self) -> None:
+        self.cells: dict[tuple[int, int], dict[GNAddress, tuple[int, int]]] = {}
+        self.positions: dict[GNAddress, tuple[tuple[int, int], int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __contains__(self, gn_address: GNAddress) -> bool:
+        return gn_address in self.positions
+
+    def update(self, gn_address: GNAddress, latitude: int, longitude: int) -> None:
+        """
+        Inserts a neighbour or updates its position.
+
+        Parameters
+        ----------
+        gn_address : GNAddress
+            GN address of the neighbour.
+        latitude : int
+            Latitude of the neighbour. In 1/10 micro degree.
+        longitude : int
+            Longitude of the neighbour. In 1/10 micro degree.
+        """
+        cell = (latitude // GRID_CELL_SIZE, longitude // GRID_CELL_SIZE)
+        previous = self.positions.get(gn_address)
+        if previous is not None:
+            if previous[1] == latitude and previous[2] == longitude:
+                return
+            if previous[0] != cell:
+                self._remove_from_cell(previous[0], gn_address)
+        self.positions[gn_address] = (cell, latitude, longitude)
+        self.cells.setdefault(cell, {})[gn_address] = (latitude, longitude)
+
+    def remove(self, gn_address: GNAddress) -> None:
+        """
+        Removes a neighbour. Does nothing if it is not in the index.
+
+        Parameters
+        ----------
+        gn_address : GNAddress
+            GN address of the neighbour.
+        """
+        previous = self.positions.pop(gn_address, None)
+        if previous is not None:
+            self._remove_from_cell(previous[0], gn_address)
+
+    def _remove_from_cell(self, cell: tuple[int, int], gn_address: GNAddress) -> None:
+        neighbours = self.cells[cell]
+        del neighbours[gn_address]
+        if not neighbours:
+            del self.cells[cell]
+
+    def nearest(self, latitude: int, longitude: int) -> tuple[GNAddress, float]:
+        """
+        Finds the neighbour closest to a point.
+
+        Parameters
+        ----------
+        latitude : int
+            Latitude of the point. In 1/10 micro degree.
+        longitude : int
+            Longitude of the point. In 1/10 micro degree.
+
+        Returns
+        -------
+        Tuple[GNAddress, float]
+            GN address of the closest neighbour and its distance to the point in meters, or None if there are no
+            neighbours.
+        """
+        if not self.cells:
+            return None
+        east_scale = NORTH_SCALE * math.cos(math.radians(latitude / 10000000))
+        cell_latitude = latitude // GRID_CELL_SIZE
+        cell_longitude = longitude // GRID_CELL_SIZE
+        # Distances in meters from the point to the south, north, west and east edges of its cell
+        edges = (
+            NORTH_SCALE * (latitude - cell_latitude * GRID_CELL_SIZE),
+            NORTH_SCALE * ((cell_latitude + 1) * GRID_CELL_SIZE - latitude),
+            east_scale * (longitude - cell_longitude * GRID_CELL_SIZE),
+            east_scale * ((cell_longitude + 1) * GRID_CELL_SIZE - longitude),
+        )
+        best: tuple[GNAddress, float] = None
+        ring = 0
+        # Ring r has 8 * r cells. Once that is more than the occupied cells, scanning them is cheaper.
+        while 8 * ring <= len(self.cells):
+            for cell in ring_cells(cell_latitude, cell_longitude, ring):
+                neighbours = self.cells.get(cell)
+                if neighbours:
+                    best = self._nearest_in_cell(neighbours, latitude, longitude, east_scale, best)
+            # Minimum distance from the point to the cells of the next ring
+            bound = min(
+                edges[0] + NORTH_SCALE * ring * GRID_CELL_SIZE,
+                edges[1] + NORTH_SCALE * ring * GRID_CELL_SIZE,
+                edges[2] + east_scale * ring * GRID_CELL_SIZE,
+                edges[3] + east_scale * ring * GRID_CELL_SIZE,
+            )
+            if best is not None and best[1] <= bound:
+                return best
+            ring += 1
+        for cell, neighbours in list(self.cells.items()):
+            # Closest point of the cell to the point
+            closest_latitude = min(max(latitude, cell[0] * GRID_CELL_SIZE), (cell[0] + 1) * GRID_CELL_SIZE)
+            closest_longitude = min(max(longitude, cell[1] * GRID_CELL_SIZE), (cell[1] + 1) * GRID_CELL_SIZE)
+            cell_bound = math.hypot(
+                NORTH_SCALE * (closest_latitude - latitude), east_scale * (closest_longitude - longitude)
+            )
+            if best is None or cell_bound < best[1]:
+                best = self._nearest_in_cell(neighbours, latitude, longitude, east_scale, best)
+        return best
+
+    @staticmethod
+    def _nearest_in_cell(
+        neighbours: dict[GNAddress, tuple[int, int]],
+        latitude: int,
+        longitude: int,
+        east_scale: float,
+        best: tuple[GNAddress, float],
+    ) -> tuple[GNAddress, float]:
+        for gn_address, (neighbour_latitude, neighbour_longitude) in list(neighbours.items()):
+            distance = math.hypot(
+                NORTH_SCALE * (neighbour_latitude - latitude),
+                east_scale * (neighbour_longitude - longitude),
+            )
+            if best is None or distance < best[1]:
+                best = (gn_address, distance)
+        return best
+
+
+def ring_cells(cell_latitude: int, cell_longitude: int, ring: int):
+    """
+    Yields the cells of the grid at a Chebyshev distance of `ring` cells from a cell.
+
+    Parameters
+    ----------
+    cell_latitude : int
+        Latitude index of the central cell.
+    cell_longitude : int
+        Longitude index of the central cell.
+    ring : int
+        Distance in cells. 0 yields the central cell only.
+    """
+    if ring == 0:
+        yield (cell_latitude, cell_longitude)
+        return
+    for longitude_offset in range(-ring, ring + 1):
+        yield (cell_latitude - ring, cell_longitude + longitude_offset)
+        yield (cell_latitude + ring, cell_longitude + longitude_offset)
+    for latitude_offset in range(-ring + 1, ring):
+        yield (cell_latitude + latitude_offset, cell_longitude - ring)
+        yield (cell_latitude + latitude_offset, cell_longitude + ring)
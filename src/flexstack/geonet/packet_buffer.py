@@ -0,0 +1,311 @@
+from __future__ import annotations
+from collections import OrderedDict, deque
+from collections.abc import Callable, Hashable
+import heapq
+import threading
+import time
+
+from .basic_header import LT
+from .mib import MIB
+
+# Offset of the LT field in a GN-PDU (third byte of the Basic Header)
+LT_OFFSET = 2
+
+
+class CBFPacketBufferEntry:
+    """
+    Packet held in the CBF packet buffer.
+
+    Attributes
+    ----------
+    packet : bytes
+        GN-PDU to broadcast when the timer expires.
+    deadline : float
+        Expiry time of the CBF timer (time.monotonic() seconds).
+    """
+
+    def __init__(self, packet: bytes, deadline: float) -> None:
+        self.packet = packet
+        self.deadline = deadline
+
+
+class CBFPacketBuffer:
+    """
+    Contention-Based Forwarding (CBF) packet buffer. As specified in ETSI EN 302 636-4-1 V1.4.1 (2020-01).
+    Annex F.3.
+
+    Packets to forward inside the target area are held for a timeout that decreases with the distance to the
+    sender. If a duplicate of the packet is heard before the timer expires, another router closer to the edge of
+    the communication range has already forwarded it, and the buffered packet is discarded. Otherwise the packet
+    is broadcast when the timer expires.
+
+    A single timer thread serves all the buffered packets. It is started with the first buffered packet.
+
+    Attributes
+    ----------
+    mib : MIB
+        MIB to use.
+    send_callback : Callable[[bytes], None]
+        Function called with the packets whose timer has expired.
+    capacity : int
+        Size of the buffer in bytes (itsGnCbfPacketBufferSize).
+    size : int
+        Bytes currently buffered.
+    entries : OrderedDict[Hashable, CBFPacketBufferEntry]
+        Buffered packets, in arrival order, keyed by packet identifier (e.g. (SO GN_ADDR, SN)).
+    deadlines : List[Tuple[float, int, Hashable]]
+        Heap of (deadline, counter, packet identifier). Items of cancelled packets are skipped when popped.
+    """
+
+    def __init__(self, mib: MIB, send_callback: Callable[[bytes], None]) -> None:
+        self.mib = mib
+        self.send_callback = send_callback
+        self.capacity = mib.itsGnCbfPacketBufferSize * 1024
+        self.size = 0
+        self.entries: OrderedDict[Hashable, CBFPacketBufferEntry] = OrderedDict()
+        self.deadlines: list[tuple[float, int, Hashable]] = []
+        self._counter = 0
+        self.condition = threading.Condition()
+        self.timer_thread: threading.Thread = None
+
+    def timeout(self, distance: float) -> float:
+        """
+        Returns the CBF timeout for a packet received from a sender at the given distance.
+
+        TO_CBF = TO_CBF_MAX + (TO_CBF_MIN - TO_CBF_MAX) / DIST_MAX * DIST if DIST <= DIST_MAX, TO_CBF_MIN otherwise.
+        If the distance is unknown (None), TO_CBF_MAX is used.
+
+        Parameters
+        ----------
+        distance : float
+            Distance between the sender and the ego position in meters.
+
+        Returns
+        -------
+        float
+            Timeout in milliseconds.
+        """
+        to_cbf_min = self.mib.itsGnCbfMinTime
+        to_cbf_max = self.mib.itsGnCbfMaxTime
+        dist_max = self.mib.itsGnDefaultMaxCommunicationRange
+        if distance is None:
+            return to_cbf_max
+        if distance <= dist_max:
+            return to_cbf_max + (to_cbf_min - to_cbf_max) / dist_max * distance
+        return to_cbf_min
+
+    def add(self, key: Hashable, packet: bytes, timeout: float) -> None:
+        """
+        Buffers a packet and starts its CBF timer.
+
+        If the buffer is full, the oldest packets are dropped (head drop).
+
+        Parameters
+        ----------
+        key : Hashable
+            Identifier of the packet.
+        packet : bytes
+            GN-PDU to broadcast when the timer expires.
+        timeout : float
+            Timeout in milliseconds.
+        """
+        if len(packet) > self.capacity:
+            return
+        deadline = time.monotonic() + timeout / 1000
+        with self.condition:
+            self._remove(key)
+            while self.size + len(packet) > self.capacity:
+                self._remove(next(iter(self.entries)))
+            self.entries[key] = CBFPacketBufferEntry(packet, deadline)
+            self.size += len(packet)
+            self._counter += 1
+            heapq.heappush(self.deadlines, (deadline, self._counter, key))
+            if self.timer_thread is None:
+                self.timer_thread = threading.Thread(target=self._run, daemon=True)
+                self.timer_thread.start()
+            self.condition.notify()
+
+    def cancel(self, key: Hashable) -> bool:
+        """
+        Discards a buffered packet because a duplicate of it has been received.
+
+        Parameters
+        ----------
+        key : Hashable
+            Identifier of the packet.
+
+        Returns
+        -------
+        bool
+            True if the packet was buffered.
+        """
+        with self.condition:
+            return self._remove(key)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _remove(self, key: Hashable) -> bool:
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return False
+        self.size -= len(entry.packet)
+        return True
+
+    def _pop_expired(self, now: float) -> list[bytes]:
+        expired: list[bytes] = []
+        while self.deadlines and self.deadlines[0][0] <= now:
+            deadline, _, key = heapq.heappop(self.deadlines)
+            entry = self.entries.get(key)
+            if entry is not None and entry.deadline == deadline:
+                self._remove(key)
+                expired.append(entry.packet)
+        return expired
+
+    def flush_expired(self, now: float = None) -> None:
+        """
+        Broadcasts the packets whose timer has expired.
+
+        Parameters
+        ----------
+        now : float
+            Current time (time.monotonic() seconds). Defaults to the current time.
+        """
+        with self.condition:
+            expired = self._pop_expired(time.monotonic() if now is None else now)
+        for packet in expired:
+            self.send_callback(packet)
+
+    def _run(self) -> None:
+        """
+        Timer thread loop.
+        """
+        while True:
+            with self.condition:
+                while not self.deadlines:
+                    self.condition.wait()
+                wait_time = self.deadlines[0][0] - time.monotonic()
+                if wait_time > 0:
+                    self.condition.wait(wait_time)
+                    continue
+                expired = self._pop_expired(time.monotonic())
+            for packet in expired:
+                self.send_callback(packet)
+
+
+class BCForwardingPacketBuffer:
+    """
+    Broadcast (BC) forwarding packet buffer. As specified in ETSI EN 302 636-4-1 V1.4.1 (2020-01). Section 7.5.
+
+    Stores the GBC packets that cannot be sent because there is no neighbour and the store-carry-forward (SCF)
+    flag of their traffic class is set. The buffer is a FIFO bounded by itsGnBcForwardingPacketBufferSize,
+    if a new packet does not fit the oldest ones are dropped (head drop). When a new neighbour appears the
+    whole buffer is flushed at once, the packets whose lifetime (LT) has expired are discarded and the LT
+    field of the others is reduced by the time they have been queued.
+
+    Attributes
+    ----------
+    send_callback : Callable[[bytes], None]
+        Function called with every packet flushed from the buffer.
+    capacity : int
+        Size of the buffer in bytes (itsGnBcForwardingPacketBufferSize).
+    size : int
+        Bytes currently buffered.
+    entries : Deque[Tuple[bytes, float, float]]
+        Buffered packets as (packet, buffering time, expiry time), in time.monotonic() seconds.
+    dropped_packets : int
+        Packets dropped because the buffer was full.
+    expired_packets : int
+        Packets discarded because their lifetime expired while buffered.
+    flushed_packets : int
+        Packets sent after being buffered.
+    """
+
+    def __init__(self, mib: MIB, send_callback: Callable[[bytes], None]) -> None:
+        self.send_callback = send_callback
+        self.capacity = mib.itsGnBcForwardingPacketBufferSize * 1024
+        self.size = 0
+        self.entries: deque[tuple[bytes, float, float]] = deque()
+        self.dropped_packets = 0
+        self.expired_packets = 0
+        self.flushed_packets = 0
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, packet: bytes, lifetime: int) -> None:
+        """
+        Buffers a packet.
+
+        Parameters
+        ----------
+        packet : bytes
+            GN-PDU (starting with the Basic Header).
+        lifetime : int
+            Lifetime of the packet in milliseconds (LT field of the Basic Header).
+        """
+        if len(packet) > self.capacity:
+            self.dropped_packets += 1
+            return
+        now = time.monotonic()
+        with self.lock:
+            while self.size + len(packet) > self.capacity:
+                dropped_packet, _, _ = self.entries.popleft()
+                self.size -= len(dropped_packet)
+                self.dropped_packets += 1
+            self.entries.append((packet, now, now + lifetime / 1000))
+            self.size += len(packet)
+
+    def flush(self, now: float = None) -> None:
+        """
+        Sends all the buffered packets whose lifetime has not expired.
+
+        Parameters
+        ----------
+        now : float
+            Current time (time.monotonic() seconds). Defaults to the current time.
+        """
+        with self.lock:
+            if not self.entries:
+                return
+            entries = self.entries
+            self.entries = deque()
+            self.size = 0
+        if now is None:
+            now = time.monotonic()
+        for packet, buffering_time, expiry_time in entries:
+            if expiry_time <= now:
+                self.expired_packets += 1
+                continue
+            if now > buffering_time:
+                # The LT field is reduced by the queuing time (ETSI EN 302 636-4-1 V1.4.1 (2020-01). Section 9.6.4)
+                lifetime = LT()
+                lifetime.set_value_in_millis(int((expiry_time - now) * 1000))
+                packet = bytearray(packet)
+                packet[LT_OFFSET] = lifetime.encode_to_int()
+                packet = bytes(packet)
+            self.flushed_packets += 1
+            self.send_callback(packet)
+
+    def get_metrics(self) -> dict:
+        """
+        Returns the occupancy and drop counters of the buffer.
+
+        Returns
+        -------
+        dict
+            Dictionary with the keys "packets", "bytes", "capacity", "dropped_packets", "expired_packets" and
+            "flushed_packets".
+        """
+        return {
+            "packets": len(self.entries),
+            "bytes": self.size,
+            "capacity": self.capacity,
+            "dropped_packets": self.dropped_packets,
+            "expired_packets": self.expired_packets,
+            "flushed_packets": self.flushed_packets,
+        }
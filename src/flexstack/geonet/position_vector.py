@@ -1,9 +1,17 @@
+import struct
+
 from dateutil import parser
 
 from .exceptions import DecodeError
 from .gn_address import GNAddress
 
 
+# TST (32 bits), Latitude (32 bits), Longitude (32 bits), PAI (1 bit) | S (15 bits), H (16 bits)
+LONG_POSITION_VECTOR_STRUCT = struct.Struct(">IiiHH")
+# TST (32 bits), Latitude (32 bits), Longitude (32 bits)
+SHORT_POSITION_VECTOR_STRUCT = struct.Struct(">Iii")
+
+
 class TST:
     """
     Timestamp class.  ETSI EN 302 636-4-1 V1.4.1 (2020-01). Section 9.5.2
@@ -378,9 +386,25 @@ class LongPositionVector:
         bytes
             Encoded LongPositionVector.
         """
-        return ((self.gn_addr.encode_to_int() << 32*4) | (self.tst.encode() << 32*3) | (
-            self.latitude << 32*2) | (self.longitude << 32) | (
-                self.pai << 31) | (self.s << 16) | self.h).to_bytes(24, byteorder='big')
+        buffer = bytearray(24)
+        self.encode_into(buffer, 0)
+        return bytes(buffer)
+
+    def encode_into(self, buffer: bytearray, offset: int = 0) -> None:
+        """
+        Encode the LongPositionVector into a buffer at the given offset.
+
+        Parameters
+        ----------
+        buffer : bytearray
+            Buffer to write to. At least offset + 24 bytes long.
+        offset : int
+            Offset of the LongPositionVector in the buffer.
+        """
+        self.gn_addr.encode_into(buffer, offset)
+        LONG_POSITION_VECTOR_STRUCT.pack_into(
+            buffer, offset + 8, self.tst.msec % 2**32, self.latitude, self.longitude,
+            self.pai << 15 | (self.s & 0x7FFF), self.h)
 
     def encode_to_int(self) -> int:
         """
@@ -391,8 +415,7 @@ class LongPositionVector:
         int
             Encoded LongPositionVector.
         """
-        return (self.gn_addr.encode_to_int() << 32*4) | (self.tst.encode() << 32*3) | (
-            self.latitude << 32*2) | (self.longitude << 32) | (self.pai << 31) | (self.s << 16) | self.h
+        return int.from_bytes(self.encode(), byteorder='big')
 
     def decode(self, data: bytes) -> None:
         """
@@ -405,14 +428,25 @@ class LongPositionVector:
         """
         if len(data) < 24:
             raise DecodeError("LongPositionVector must be 24 bytes long")
-        data_as_int = int.from_bytes(data[0:24], byteorder='big')
-        self.gn_addr.decode((data_as_int >> 32*4).to_bytes(8, byteorder='big'))
-        self.tst.decode(data_as_int >> 32*3)
-        self.latitude = (data_as_int >> 32*2) & 0xFFFFFFFF
-        self.longitude = (data_as_int >> 32) & 0xFFFFFFFF
-        self.pai = (data_as_int >> 31) & 0x1
-        self.s = (data_as_int >> 16) & 0x7FFF
-        self.h = data_as_int & 0xFFFF
+        self.decode_from(data, 0)
+
+    def decode_from(self, buffer: bytes, offset: int = 0) -> None:
+        """
+        Decode the LongPositionVector from a buffer at the given offset.
+
+        Parameters
+        ----------
+        buffer : bytes
+            Buffer to read from. At least offset + 24 bytes long.
+        offset : int
+            Offset of the LongPositionVector in the buffer.
+        """
+        self.gn_addr.decode_from(buffer, offset)
+        tst, self.latitude, self.longitude, pai_s, self.h = LONG_POSITION_VECTOR_STRUCT.unpack_from(
+            buffer, offset + 8)
+        self.tst.msec = tst
+        self.pai = pai_s >> 15
+        self.s = pai_s & 0x7FFF
 
     def __eq__(self, __o: object) -> bool:
         if isinstance(__o, LongPositionVector):
@@ -431,6 +465,65 @@ class LongPositionVector:
             "    Heading: " + str(self.h) + "\n"
 
 
+class LongPositionVectorSnapshot(LongPositionVector):
+    """
+    Immutable Long Position Vector with its encoding computed once.
+
+    Used for the ego position vector of the router: a new snapshot is built for every position fix and
+    published by replacing the reference, so the threads sending packets always read a consistent
+    position vector and never encode it again between fixes.
+
+    Attributes
+    ----------
+    encoded : bytes
+        Encoded LongPositionVector (24 bytes).
+    """
+
+    def __init__(self, position_vector: LongPositionVector = None) -> None:
+        """
+        Creates the snapshot of a position vector. The snapshot does not share any object with it.
+
+        Parameters
+        ----------
+        position_vector : LongPositionVector
+            Position vector to take the snapshot of.
+        """
+        super().__init__()
+        encoded = (position_vector or LongPositionVector()).encode()
+        self.decode(encoded)
+        self.encoded = encoded
+        self._frozen = True
+
+    def __setattr__(self, name: str, value) -> None:
+        if getattr(self, "_frozen", False):
+            raise AttributeError("LongPositionVectorSnapshot is immutable")
+        super().__setattr__(name, value)
+
+    def encode(self) -> bytes:
+        """
+        Encode the LongPositionVector.
+
+        Returns
+        -------
+        bytes
+            Encoded LongPositionVector.
+        """
+        return self.encoded
+
+    def encode_into(self, buffer: bytearray, offset: int = 0) -> None:
+        """
+        Encode the LongPositionVector into a buffer at the given offset.
+
+        Parameters
+        ----------
+        buffer : bytearray
+            Buffer to write to. At least offset + 24 bytes long.
+        offset : int
+            Offset of the LongPositionVector in the buffer.
+        """
+        buffer[offset:offset + 24] = self.encoded
+
+
 class ShortPositionVector:
     """
     Short Position Vector class.  ETSI EN 302 636-4-1 V1.4.1 (2020-01). Section 9.5.2
@@ -539,8 +632,24 @@ class ShortPositionVector:
         bytes
             Encoded ShortPositionVector.
         """
-        return ((self.gn_addr.encode_to_int() << 32*3) | (self.tst.encode() << 32*2) | (
-            self.latitude << 32*1) | self.longitude).to_bytes(20, byteorder='big')
+        buffer = bytearray(20)
+        self.encode_into(buffer, 0)
+        return bytes(buffer)
+
+    def encode_into(self, buffer: bytearray, offset: int = 0) -> None:
+        """
+        Encode the ShortPositionVector into a buffer at the given offset.
+
+        Parameters
+        ----------
+        buffer : bytearray
+            Buffer to write to. At least offset + 20 bytes long.
+        offset : int
+            Offset of the ShortPositionVector in the buffer.
+        """
+        self.gn_addr.encode_into(buffer, offset)
+        SHORT_POSITION_VECTOR_STRUCT.pack_into(
+            buffer, offset + 8, self.tst.msec % 2**32, self.latitude, self.longitude)
 
     def encode_to_int(self) -> int:
         """
@@ -551,8 +660,7 @@ class ShortPositionVector:
         int
             Encoded ShortPositionVector.
         """
-        return (self.gn_addr.encode_to_int() << 32*3) | (self.tst.encode() << 32*2) | (
-            self.latitude << 32*1) | self.longitude
+        return int.from_bytes(self.encode(), byteorder='big')
 
     def decode(self, data: bytes) -> None:
         """
@@ -563,11 +671,24 @@ class ShortPositionVector:
         data : bytes
             Encoded ShortPositionVector.
         """
-        data = int.from_bytes(data, byteorder='big')
-        self.gn_addr.decode((data >> 32*3).to_bytes(8, byteorder='big'))
-        self.tst.decode(data >> 32*2)
-        self.latitude = (data >> 32 * 1) & 0xFFFFFFFF
-        self.longitude = data & 0xFFFFFFFF
+        if len(data) < 20:
+            raise DecodeError("ShortPositionVector must be 20 bytes long")
+        self.decode_from(data, 0)
+
+    def decode_from(self, buffer: bytes, offset: int = 0) -> None:
+        """
+        Decode the ShortPositionVector from a buffer at the given offset.
+
+        Parameters
+        ----------
+        buffer : bytes
+            Buffer to read from. At least offset + 20 bytes long.
+        offset : int
+            Offset of the ShortPositionVector in the buffer.
+        """
+        self.gn_addr.decode_from(buffer, offset)
+        tst, self.latitude, self.longitude = SHORT_POSITION_VECTOR_STRUCT.unpack_from(buffer, offset + 8)
+        self.tst.msec = tst
 
     def __eq__(self, __o: object) -> bool:
         if isinstance(__o, ShortPositionVector):
@@ -1,9 +1,12 @@
 from __future__ import annotations
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 from enum import Enum
 
+import itertools
+import logging
 import math
-import sys
+import struct
+import time
 
 from ..linklayer.exceptions import (
     SendingException,
@@ -12,11 +15,12 @@ from ..linklayer.exceptions import (
 from .mib import (
     MIB,
     LocalGnAddrConfMethod,
-    NonAreaForwardingAlgorithm,
     AreaForwardingAlgorithm,
+    NonAreaForwardingAlgorithm,
 )
 from .gn_address import GNAddress
 from .service_access_point import (
+    CommonNH,
     HeaderType,
     TopoBroadcastHST,
     GeoBroadcastHST,
@@ -30,8 +34,13 @@ from .service_access_point import (
 from .basic_header import BasicNH, BasicHeader
 from .common_header import CommonHeader
 from .gbc_extended_header import GBCExtendedHeader
-from .position_vector import LongPositionVector
+from .geometry import EARTH_RADIUS, rotate
+from .position_vector import LongPositionVector, LongPositionVectorSnapshot
 from .location_table import LocationTable
+from .header_template import HeaderTemplateCache
+from .packet_buffer import BCForwardingPacketBuffer, CBFPacketBuffer
+from ..metrics.stack_statistics import StackStatistics
+from ..utils.rate_limited_logger import RateLimitedLogger
 from ..security.sign_service import SignService
 from ..security.security_profiles import SecurityProfile
 from ..security.sn_sap import SNSIGNConfirm, SNSIGNRequest
@@ -40,10 +49,10 @@ from .exceptions import (
     DecapError,
     DecodeError,
     DuplicatedPacketException,
-    IncongruentTimestampException,
 )
 
-EARTH_RADIUS = 6371000  # Radius of the Earth in meters
+MAX_CACHED_AREAS = 256
+RHL_OFFSET = 3  # Offset of the RHL field in a GN-PDU (last byte of the Basic Header)
 
 
 class GNForwardingAlgorithmResponse(Enum):
@@ -85,14 +94,23 @@ class Router:
         self.mib = mib
         self.gn_address = GNAddress()
         self.setup_gn_address()
-        self.ego_position_vector = LongPositionVector()
-        self.ego_position_vector.set_gn_addr(self.gn_address)
+        ego_position_vector = LongPositionVector()
+        ego_position_vector.set_gn_addr(self.gn_address)
+        self.ego_position_vector: LongPositionVectorSnapshot = LongPositionVectorSnapshot(ego_position_vector)
         self.link_layer = None
         self.location_table = LocationTable(mib)
+        self.header_templates = HeaderTemplateCache(mib)
+        self.cbf_packet_buffer = CBFPacketBuffer(mib, self.send_buffered_packet)
+        self.bc_forwarding_packet_buffer = BCForwardingPacketBuffer(mib, self.send_buffered_packet)
+        self.area_cache: dict[tuple[int, int, int, int, int], Area] = {}
+        self.location_table.new_neighbour_callback = self.on_new_neighbour
         self.sign_service: SignService = sign_service
         self.indication_callback = None
+        self.indication_batch_callback = None
         self.sequence_number = 0
         self.metrics_callback = None
+        self.statistics = StackStatistics("geonet")
+        self.logging = RateLimitedLogger(logging.getLogger("geonet"))
 
     def get_sequence_number(self) -> int:
         """
@@ -130,6 +148,22 @@ class Router:
         """
         self.indication_callback = callback
 
+    def register_indication_batch_callback(
+        self, callback: Callable[[list[GNDataIndication]], None]
+    ) -> None:
+        """
+        Registers a callback for the GNDataIndications of a burst of frames (see gn_data_indicate_batch).
+
+        If no batch callback is registered, the indications of a burst are passed one by one to the callback
+        registered with register_indication_callback.
+
+        Parameters
+        ----------
+        callback : Callable[[List[GNDataIndication]], None]
+            Callback to register.
+        """
+        self.indication_batch_callback = callback
+
     def setup_gn_address(self) -> None:
         # pylint: disable=no-else-raise
         """
@@ -160,20 +194,13 @@ class Router:
         request : GNDataRequest
             GNDataRequest to handle.
         """
-        if self.metrics_callback:
-            self.metrics_callback(0, sys.getsizeof(request.data))
-
-        basic_header = BasicHeader()
-        basic_header.initialize_with_mib(self.mib)
-        basic_header.set_rhl(1)
-        common_header = CommonHeader()
-        common_header.initialize_with_request(request)
-        long_position_vector = self.ego_position_vector
-        media_dependant_data = b"\x00\x00\x00\x00"
         packet = b""
         if request.security_profile == SecurityProfile.COOPERATIVE_AWARENESS_MESSAGE:
             if self.sign_service is None:
                 raise NotImplementedError("Security profile not implemented")
+            basic_header = BasicHeader()
+            basic_header.initialize_with_mib(self.mib)
+            basic_header.set_rhl(1)
             common_header = CommonHeader()
             common_header.initialize_with_request(request)
             long_position_vector = self.ego_position_vector
@@ -196,13 +223,13 @@ class Router:
             packet = basic_header.encode_to_bytes() + sign_confirm.sec_message
 
         else:
-            packet = (
-                basic_header.encode_to_bytes()
-                + common_header.encode_to_bytes()
-                + long_position_vector.encode()
-                + media_dependant_data
-                + request.data
+            # Basic Header, Common Header and Media-Dependent Data are pre-encoded, only the payload
+            # length and the SO PV are patched.
+            packet = self.header_templates.get_shb_template(request).build_packet(
+                self.ego_position_vector, request.length, request.data
             )
+        if self.metrics_callback:
+            self.metrics_callback(0, len(packet))
         confirm = GNDataConfirm()
 
         try:
@@ -258,7 +285,8 @@ class Router:
         distance: tuple[float, float], angle: int
     ) -> tuple[float, float]:
         """
-        Adapts the X,Y pointed at north to the right angle
+        Rotates the X,Y pointed at north (X north, Y east) to the reference system of an area whose long side
+        has the given azimuth angle.
 
         Returns
         -------
@@ -266,9 +294,7 @@ class Router:
             X and Y distances adapted to the angle
         """
         n_angle = math.radians(angle)
-        new_x_distance = math.cos(n_angle) * distance[0]
-        new_y_distance = math.sin(n_angle) * distance[1]
-        return (new_x_distance, new_y_distance)
+        return rotate(distance[0], distance[1], math.sin(n_angle), math.cos(n_angle))
 
     def gn_geometric_function_f(
         self, area_type: GeoBroadcastHST, area: Area, lat: int, lon: int
@@ -288,38 +314,231 @@ class Router:
         lon : int
             Longitude of the point P. In 1/10 microdegrees.
         """
-        coord1 = (area.latitude / 10000000, area.longitude / 10000000)
-        coord2 = (lat / 10000000, lon / 10000000)
-        x_distance, y_distance = Router.calculate_distance(coord1, coord2)
-        if area_type == GeoBroadcastHST.GEOBROADCAST_CIRCLE:
-            return 1 - (x_distance / area.a) ** 2 - (y_distance / area.a) ** 2
-        if area_type == GeoBroadcastHST.GEOBROADCAST_ELIP:
-            return 1 - (x_distance / area.a) ** 2 - (y_distance / area.b) ** 2
-        if area_type == GeoBroadcastHST.GEOBROADCAST_RECT:
-            return min(1 - (x_distance / area.a) ** 2, (y_distance / area.b) ** 2)
-        raise ValueError("Invalid area type")
+        return area.geometric_function_f(area_type, lat, lon)
+
+    def get_area(self, gbc_extended_header: GBCExtendedHeader) -> Area:
+        """
+        Returns the Area of a GBC Extended Header.
+
+        Areas are cached, so the packets sent to the same area (e.g. repetitions of a DENM, or the same packet
+        received from several forwarders) reuse the precomputed geometry of the area.
+
+        Parameters
+        ----------
+        gbc_extended_header : GBCExtendedHeader
+            GBC Extended Header of the packet.
+        """
+        key = (
+            gbc_extended_header.latitude,
+            gbc_extended_header.longitude,
+            gbc_extended_header.a,
+            gbc_extended_header.b,
+            gbc_extended_header.angle,
+        )
+        area = self.area_cache.get(key)
+        if area is None:
+            if len(self.area_cache) >= MAX_CACHED_AREAS:
+                self.area_cache.clear()
+            area = Area()
+            area.latitude, area.longitude, area.a, area.b, area.angle = key
+            self.area_cache[key] = area
+        return area
 
     def gn_forwarding_algorithm_selection(
-        self, request: GNDataRequest
+        self, request: GNDataRequest, sender_position_vector: LongPositionVector = None
     ) -> GNForwardingAlgorithmResponse:
         """
+        Selects the forwarding algorithm of a GBC packet. As specified in ETSI EN 302 636-4-1 V1.4.1 (2020-01).
+        Annex D.
 
         Parameters
         ----------
         request : GNDataRequest
             GNDataRequest to handle.
+        sender_position_vector : LongPositionVector
+            Position vector of the sender of a received packet. None for packets originated by the router.
         """
+        ego_position_vector = self.ego_position_vector
         result = self.gn_geometric_function_f(
             request.packet_transport_type.header_subtype,
             request.area,
-            self.ego_position_vector.latitude,
-            self.ego_position_vector.longitude,
+            ego_position_vector.latitude,
+            ego_position_vector.longitude,
         )
 
         if result >= 0:
             return GNForwardingAlgorithmResponse.AREA_FORWARDING
-        # TODO: Parts of the forwarding algorithm selection
-        return GNForwardingAlgorithmResponse.DISCARTED
+        # The ego position is outside the area. A packet sent from inside the area is not forwarded out of it.
+        if sender_position_vector is not None and self.gn_geometric_function_f(
+            request.packet_transport_type.header_subtype,
+            request.area,
+            sender_position_vector.latitude,
+            sender_position_vector.longitude,
+        ) >= 0:
+            return GNForwardingAlgorithmResponse.DISCARTED
+        return GNForwardingAlgorithmResponse.NON_AREA_FORWARDING
+
+    def gn_greedy_next_hop(self, area: Area) -> GNAddress:
+        """
+        Greedy forwarding algorithm. As specified in ETSI EN 302 636-4-1 V1.4.1 (2020-01). Annex E.2.
+
+        Selects the neighbour with the most forward progress towards the centre of the area, i.e. the closest
+        to it, as long as it is closer than the ego position. The neighbour is looked up in the spatial index
+        of the location table.
+
+        Parameters
+        ----------
+        area : Area
+            Destination area.
+
+        Returns
+        -------
+        GNAddress
+            GN address of the next hop, or None if no neighbour makes progress (local optimum).
+        """
+        nearest = self.location_table.neighbour_index.nearest(area.latitude, area.longitude)
+        if nearest is None:
+            return None
+        ego_position_vector = self.ego_position_vector
+        most_forward_progress = math.hypot(
+            *area.geometry().cartesian_coordinates(ego_position_vector.latitude, ego_position_vector.longitude)
+        )
+        if nearest[1] < most_forward_progress:
+            return nearest[0]
+        return None
+
+    def gn_non_area_forwarding(self, packet: bytes, area: Area, scf: bool, lifetime: int) -> ResultCode:
+        """
+        Forwards a GBC packet towards an area the ego position is not in, with the non-area forwarding algorithm
+        set in itsGnNonAreaForwardingAlgorithm. ETSI EN 302 636-4-1 V1.4.1 (2020-01). Annex E.
+
+        With GREEDY (Annex E.2), the packet is sent to the LL address of the next hop (LL_ADDR_NH), the MID of
+        its GN address. If no neighbour makes progress towards the area, the packet is stored in the BC
+        forwarding packet buffer if SCF is set, and broadcast otherwise (LL_ADDR_NH = BCAST). With UNSPECIFIED,
+        no next hop is selected and the packet is broadcast.
+
+        Parameters
+        ----------
+        packet : bytes
+            GN-PDU to forward.
+        area : Area
+            Destination area.
+        scf : bool
+            Store-carry-forward flag of the traffic class of the packet.
+        lifetime : int
+            Lifetime of the packet in milliseconds.
+
+        Returns
+        -------
+        ResultCode
+            Result of the forwarding.
+        """
+        next_hop_address = None
+        if self.mib.itsGnNonAreaForwardingAlgorithm == NonAreaForwardingAlgorithm.GREEDY:
+            next_hop = self.gn_greedy_next_hop(area)
+            if next_hop is not None:
+                next_hop_address = next_hop.mid.mid
+            elif scf:
+                self.bc_forwarding_packet_buffer.add(packet, lifetime)
+                return ResultCode.ACCEPTED
+        try:
+            if self.link_layer:
+                self.link_layer.send(packet, next_hop_address)
+        except PacketTooLongException:
+            return ResultCode.MAXIMUM_LENGTH_EXCEEDED
+        except SendingException:
+            return ResultCode.UNSPECIFIED
+        return ResultCode.ACCEPTED
+
+    def distance_to(self, position_vector: LongPositionVector) -> float:
+        """
+        Returns the distance between the ego position and a position vector.
+
+        Parameters
+        ----------
+        position_vector : LongPositionVector
+            Position vector to measure the distance to.
+
+        Returns
+        -------
+        float
+            Distance in meters.
+        """
+        ego_position_vector = self.ego_position_vector
+        x_distance, y_distance = Router.calculate_distance(
+            (ego_position_vector.latitude / 10000000, ego_position_vector.longitude / 10000000),
+            (position_vector.latitude / 10000000, position_vector.longitude / 10000000),
+        )
+        return math.hypot(x_distance, y_distance)
+
+    def send_buffered_packet(self, packet: bytes) -> None:
+        """
+        Sends a packet released by one of the packet buffers.
+
+        Parameters
+        ----------
+        packet : bytes
+            GN-PDU to send.
+        """
+        try:
+            if self.link_layer:
+                self.link_layer.send(packet)
+        except SendingException as e:
+            self.statistics.count("tx_errors")
+            self.logging.error("tx_error", "Error sending buffered packet: %s", e)
+
+    def on_new_neighbour(self, gn_address: GNAddress) -> None:
+        """
+        Function called by the location table when a new neighbour appears. The packets stored in the BC forwarding
+        packet buffer are flushed. ETSI EN 302 636-4-1 V1.4.1 (2020-01). Section 7.5.3
+
+        Parameters
+        ----------
+        gn_address : GNAddress
+            GN address of the new neighbour.
+        """
+        self.bc_forwarding_packet_buffer.flush()
+
+    @staticmethod
+    def build_forwarded_gbc_packet(
+        basic_header: BasicHeader,
+        common_header: CommonHeader,
+        gbc_extended_header: GBCExtendedHeader,
+        packet: bytes,
+        frame: memoryview = None,
+    ) -> bytes:
+        """
+        Builds the GN-PDU of a forwarded GBC packet.
+
+        Only the RHL field changes when forwarding, so if the received frame is available it is copied once with
+        the new RHL byte instead of encoding all the headers again.
+
+        Parameters
+        ----------
+        basic_header : BasicHeader
+            Basic header of the packet, with the RHL already decremented.
+        common_header : CommonHeader
+            Common header of the packet.
+        gbc_extended_header : GBCExtendedHeader
+            Extended header of the packet.
+        packet : bytes
+            Packet to forward. (Without headers)
+        frame : memoryview
+            Received GN-PDU.
+
+        Returns
+        -------
+        bytes
+            GN-PDU to send.
+        """
+        if frame is not None:
+            return b"".join((frame[0:RHL_OFFSET], bytes((basic_header.rhl,)), frame[RHL_OFFSET + 1:]))
+        return (
+            basic_header.encode_to_bytes()
+            + common_header.encode_to_bytes()
+            + gbc_extended_header.encode()
+            + packet
+        )
 
     def gn_data_forward_gbc(
         self,
@@ -327,6 +546,8 @@ class Router:
         common_header: CommonHeader,
         gbc_extended_header: GBCExtendedHeader,
         packet: bytes,
+        frame: memoryview = None,
+        sender_position_vector: LongPositionVector = None,
     ) -> GNDataConfirm:
         """
         Function called when a GBC packet has to be forwarded.
@@ -341,36 +562,52 @@ class Router:
             Extended header of the packet.
         packet : bytes
             Packet to forward. (Without headers)
+        frame : memoryview
+            Received GN-PDU the headers were decoded from. If given, it is forwarded as received with only the RHL
+            field patched, instead of encoding the headers again.
+        sender_position_vector : LongPositionVector
+            Position vector of the sender (the source or the last forwarder) of the packet, None if it is unknown.
         """
         confirm = GNDataConfirm()
         # TODO: Location Service (LS) packet buffers (step 8)
+        # 9) decrement the value of the RHL field by one. If RHL is decremented to zero, discard the GN-PDU and
+        # omit the execution of further steps;
+        if basic_header.rhl <= 1:
+            self.statistics.count("forward_hop_limit_reached")
+            return confirm
         basic_header.set_rhl(basic_header.rhl - 1)
         # 10) if no neighbour exists, i.e. the LocT does not contain a LocTE with the IS_NEIGHBOUR flag set to TRUE,
         # and SCF for the traffic class in the TC field of the Common Header is set, buffer the GBC packet in the BC
         # forwarding packet buffer and omit the execution of further steps;
-        if len(self.location_table.get_neighbours()) > 0 or not common_header.tc.scf:
+        if self.location_table.has_neighbours() or not common_header.tc.scf:
             # 11) execute the forwarding algorithm procedures (starting with annex D);
             request = GNDataRequest()
-            request.area = Area()
-            request.area.latitude = gbc_extended_header.latitude
-            request.area.longitude = gbc_extended_header.longitude
-            request.area.a = gbc_extended_header.a
-            request.area.b = gbc_extended_header.b
-            request.area.angle = gbc_extended_header.angle
+            request.area = self.get_area(gbc_extended_header)
             request.packet_transport_type.header_subtype = common_header.hst
-            algorithm = self.gn_forwarding_algorithm_selection(request)
+            algorithm = self.gn_forwarding_algorithm_selection(request, gbc_extended_header.so_pv)
             # 12) if the return value of the forwarding algorithm is 0 (packet is buffered in a forwarding packet
             # buffer) or -1 (packet is discarded), omit the execution of further steps;
             if algorithm == GNForwardingAlgorithmResponse.AREA_FORWARDING:
                 # TODO: step 13
+                packet = self.build_forwarded_gbc_packet(
+                    basic_header, common_header, gbc_extended_header, packet, frame
+                )
+                if self.mib.itsGnAreaForwardingAlgorithm == AreaForwardingAlgorithm.CBF:
+                    # Annex F.3: the packet is held in the CBF packet buffer and broadcast when the timer
+                    # expires, unless a duplicate is received before. The timer depends on the distance to the
+                    # sender, so the relays farther from it rebroadcast first.
+                    distance = None
+                    if sender_position_vector is not None:
+                        distance = self.distance_to(sender_position_vector)
+                    self.cbf_packet_buffer.add(
+                        (gbc_extended_header.so_pv.gn_addr, gbc_extended_header.sn),
+                        packet,
+                        self.cbf_packet_buffer.timeout(distance),
+                    )
+                    confirm.result_code = ResultCode.ACCEPTED
+                    return confirm
                 # 14) pass the GN-PDU to the LL protocol entity via the IN interface and set the destination
                 # address to the LL address of the next hop LL_ADDR_NH.
-                packet: bytes = (
-                    basic_header.encode_to_bytes()
-                    + common_header.encode_to_bytes()
-                    + gbc_extended_header.encode()
-                    + packet
-                )
                 try:
                     if self.link_layer:
                         self.link_layer.send(packet)
@@ -380,21 +617,18 @@ class Router:
                     confirm.result_code = ResultCode.UNSPECIFIED
 
                 confirm.result_code = ResultCode.ACCEPTED
+            elif algorithm == GNForwardingAlgorithmResponse.NON_AREA_FORWARDING:
+                packet = self.build_forwarded_gbc_packet(
+                    basic_header, common_header, gbc_extended_header, packet, frame
+                )
+                confirm.result_code = self.gn_non_area_forwarding(
+                    packet, request.area, common_header.tc.scf, basic_header.lt.get_value_in_millis()
+                )
         else:
-            packet: bytes = (
-                basic_header.encode_to_bytes()
-                + common_header.encode_to_bytes()
-                + gbc_extended_header.encode()
-                + packet
+            packet = self.build_forwarded_gbc_packet(
+                basic_header, common_header, gbc_extended_header, packet, frame
             )
-            try:
-                if self.link_layer:
-                    self.link_layer.send(packet)
-            except PacketTooLongException:
-                confirm.result_code = ResultCode.MAXIMUM_LENGTH_EXCEEDED
-            except SendingException:
-                confirm.result_code = ResultCode.UNSPECIFIED
-
+            self.bc_forwarding_packet_buffer.add(packet, basic_header.lt.get_value_in_millis())
             confirm.result_code = ResultCode.ACCEPTED
 
         return confirm
@@ -412,13 +646,9 @@ class Router:
 
         # 1) create a GN-PDU with the T/GN6-SDU as payload and a GBC packet header (clause 9.8.5):
         #   a) set the fields of the Basic Header (clause 10.3.2);
-        basic_header = BasicHeader()
-        basic_header.initialize_with_mib(self.mib)
         #   b) set the fields of the Common Header (clause 10.3.4);
-        common_header = CommonHeader()
-        common_header.initialize_with_request(request)
-        common_header.ht = HeaderType.GEOBROADCAST
-        common_header.hst = request.packet_transport_type.header_subtype
+        # Both are taken pre-encoded from the header template of the request.
+        header_template = self.header_templates.get_gbc_template(request)
         #   c) set the fields of the GBC Extended Header (table 36);
         geo_broadcast_extended_header = GBCExtendedHeader()
         geo_broadcast_extended_header.initialize_with_request(request)
@@ -427,10 +657,7 @@ class Router:
         # 2) if no neighbour exists, i.e. the LocT does not contain a LocTE with the IS_NEIGHBOUR flag set to TRUE,
         # and SCF for the traffic class in the service primitive GN-DATA.request parameter Traffic class is enabled,
         # then buffer the GBC packet in the BC forwarding packet buffer and omit the execution of further steps;
-        if (
-            len(self.location_table.get_neighbours()) > 0
-            or not request.traffic_class.scf
-        ):
+        if self.location_table.has_neighbours() or not request.traffic_class.scf:
             # 3) execute the forwarding algorithm procedures (starting with annex D);
             algorithm = self.gn_forwarding_algorithm_selection(request)
             # 4) if the return value of the forwarding algorithm is 0 (packet is buffered in the BC forwarding packet
@@ -439,11 +666,8 @@ class Router:
                 # TODO: steps 5-7
                 # 8) pass the GN-PDU to the LL protocol entity via the IN interface and set the destination address to
                 # the LL address of the next hop LL_ADDR_NH.
-                packet: bytes = (
-                    basic_header.encode_to_bytes()
-                    + common_header.encode_to_bytes()
-                    + geo_broadcast_extended_header.encode()
-                    + request.data
+                packet = header_template.build_packet(
+                    geo_broadcast_extended_header, request.length, request.data
                 )
                 try:
                     if self.link_layer:
@@ -454,21 +678,18 @@ class Router:
                     confirm.result_code = ResultCode.UNSPECIFIED
 
                 confirm.result_code = ResultCode.ACCEPTED
+            elif algorithm == GNForwardingAlgorithmResponse.NON_AREA_FORWARDING:
+                packet = header_template.build_packet(
+                    geo_broadcast_extended_header, request.length, request.data
+                )
+                confirm.result_code = self.gn_non_area_forwarding(
+                    packet, request.area, request.traffic_class.scf, self.mib.itsGnDefaultPacketLifetime * 1000
+                )
         else:
-            packet: bytes = (
-                basic_header.encode_to_bytes()
-                + common_header.encode_to_bytes()
-                + geo_broadcast_extended_header.encode()
-                + request.data
+            packet = header_template.build_packet(
+                geo_broadcast_extended_header, request.length, request.data
             )
-            try:
-                if self.link_layer:
-                    self.link_layer.send(packet)
-            except PacketTooLongException:
-                confirm.result_code = ResultCode.MAXIMUM_LENGTH_EXCEEDED
-            except SendingException:
-                confirm.result_code = ResultCode.UNSPECIFIED
-
+            self.bc_forwarding_packet_buffer.add(packet, self.mib.itsGnDefaultPacketLifetime * 1000)
             confirm.result_code = ResultCode.ACCEPTED
 
         return confirm
@@ -507,80 +728,78 @@ class Router:
 
         Parameters
         ----------
-        packet : bytes
-            GeoNetworking packet to handle.
+        packet : bytes | memoryview
+            GeoNetworking packet to handle (without the basic header and common header).
         common_header : CommonHeader
             CommonHeader of the packet.
         """
         # ETSI EN 302 636-4-1 V1.4.1 (2020-01). Section
         indication = GNDataIndication()
         try:
+            packet = memoryview(packet)
             long_position_vector = LongPositionVector()
             long_position_vector.decode(packet[0:24])
-            packet = packet[24:]
             # Ignore Media Dependant Data
-            packet = packet[4:]
+            packet = packet[24 + 4:]
+            start = time.perf_counter()
             self.location_table.new_shb_packet(long_position_vector, packet)
+            self.statistics.observe("loct_update", time.perf_counter() - start)
             indication.upper_protocol_entity = common_header.nh
             indication.source_position_vector = long_position_vector
             indication.traffic_class = common_header.tc
             indication.length = len(packet)
             indication.data = packet
         except DADException:
-            print("Duplicate Address Detected!")
-        except IncongruentTimestampException:
-            print("Incongruent Timestamp Detected!")
+            self.drop("duplicate_address", "Duplicate Address Detected!")
         except DuplicatedPacketException:
-            print("Packet is duplicated")
+            self.drop("duplicated_packet", "Packet is duplicated")
         except DecodeError as e:
-            print(str(e))
+            self.drop("decode_error", "Error decoding packet: %s", e)
         return indication
 
     def gn_data_indicate_gbc(
-        self, packet: bytes, common_header: CommonHeader
+        self,
+        packet: bytes,
+        common_header: CommonHeader,
+        basic_header: BasicHeader = None,
+        frame: memoryview = None,
+        sender_address: bytes = None,
     ) -> GNDataIndication:
         """
         Handle a GeobroadcastBroadcast GeoNetworking packet.
 
         Parameters
         ----------
-        packet : bytes
+        packet : bytes | memoryview
             GeoNetworking packet to handle (without the basic header and common header)
         common_header : CommonHeader
             CommonHeader of the packet.
+        basic_header : BasicHeader
+            BasicHeader of the packet. If given, the packet is forwarded (ETSI EN 302 636-4-1 V1.4.1 (2020-01).
+            Section 10.3.11.3, steps 8-14).
+        frame : memoryview
+            Whole received GN-PDU, forwarded with only the RHL field patched.
+        sender_address : bytes
+            LL address of the sender of the packet, None if it is unknown.
         """
         indication = GNDataIndication()
+        packet = memoryview(packet)
         gbc_extended_header = GBCExtendedHeader()
         gbc_extended_header.decode(packet[0:44])
         packet = packet[44:]
-        area = Area()
-        area.a = gbc_extended_header.a
-        area.b = gbc_extended_header.b
-        area.latitude = gbc_extended_header.latitude
-        area.longitude = gbc_extended_header.longitude
-        area.angle = gbc_extended_header.angle
+        area = self.get_area(gbc_extended_header)
+        ego_position_vector = self.ego_position_vector
         area_f = self.gn_geometric_function_f(
             common_header.hst,
             area,
-            self.ego_position_vector.latitude,
-            self.ego_position_vector.longitude,
+            ego_position_vector.latitude,
+            ego_position_vector.longitude,
         )
-        if area_f < 0 and (
-            self.mib.itsGnNonAreaForwardingAlgorithm
-            in (
-                NonAreaForwardingAlgorithm.GREEDY,
-                NonAreaForwardingAlgorithm.UNSPECIFIED,
-            )
-        ):
-            pass
-        elif area_f >= 0 and (
-            self.mib.itsGnAreaForwardingAlgorithm
-            in (AreaForwardingAlgorithm.UNSPECIFIED, AreaForwardingAlgorithm.SIMPLE)
-        ):
-            pass
         try:
             self.duplicate_address_detection(gbc_extended_header.so_pv.gn_addr)
+            start = time.perf_counter()
             self.location_table.new_gbc_packet(gbc_extended_header, packet)
+            self.statistics.observe("loct_update", time.perf_counter() - start)
             if area_f >= 0:
                 indication.upper_protocol_entity = common_header.nh
                 indication.packet_transport_type = PacketTransportType()
@@ -593,76 +812,273 @@ class Router:
                 # indication.data = packet[44:]
                 indication.length = len(packet)
                 indication.data = packet
+            if basic_header is not None:
+                sender_position_vector = self.get_sender_position_vector(
+                    basic_header, common_header, gbc_extended_header, sender_address
+                )
+                self.gn_data_forward_gbc(
+                    basic_header, common_header, gbc_extended_header, packet, frame, sender_position_vector
+                )
         except DADException:
-            print("Duplicate Address Detected!")
-        except IncongruentTimestampException:
-            print("Incongruent Timestamp Detected!")
+            self.drop("duplicate_address", "Duplicate Address Detected!")
+        except DuplicatedPacketException:
+            # Annex F.3: a duplicate of a packet held in the CBF packet buffer means that it has already been
+            # forwarded by another router, so the buffered packet is discarded.
+            self.cbf_packet_buffer.cancel(
+                (gbc_extended_header.so_pv.gn_addr, gbc_extended_header.sn)
+            )
+            self.drop("duplicated_packet", "Packet is duplicated")
         except DecodeError as e:
-            print(str(e))
+            self.drop("decode_error", "Error decoding packet: %s", e)
         return indication
 
-    def gn_data_indicate(self, packet: bytes) -> None:
-        # pylint: disable=no-else-raise, too-many-branches
+    def get_sender_position_vector(
+        self,
+        basic_header: BasicHeader,
+        common_header: CommonHeader,
+        gbc_extended_header: GBCExtendedHeader,
+        sender_address: bytes = None,
+    ) -> LongPositionVector | None:
+        """
+        Returns the position vector of the sender of a received GBC packet, used for the CBF timeout (ETSI EN 302
+        636-4-1 V1.4.1 (2020-01). Annex F.3).
+
+        A packet that has not been forwarded yet (RHL equal to MHL) comes from its source, whose position vector is
+        in the GBC header. Otherwise the sender is the last forwarder, looked up in the LocT by its LL address.
+
+        Parameters
+        ----------
+        basic_header : BasicHeader
+            BasicHeader of the packet, as received.
+        common_header : CommonHeader
+            CommonHeader of the packet.
+        gbc_extended_header : GBCExtendedHeader
+            GBC extended header of the packet.
+        sender_address : bytes
+            LL address of the sender, None if it is unknown.
+
+        Returns
+        -------
+        LongPositionVector | None
+            Position vector of the sender, None if it is unknown.
+        """
+        if basic_header.rhl == common_header.mhl:
+            return gbc_extended_header.so_pv
+        if sender_address is not None:
+            entry = self.location_table.get_neighbour_by_mid(bytes(sender_address))
+            if entry is not None:
+                return entry.position_vector
+        return None
+
+    def gn_data_indicate(self, packet: bytes, sender_address: bytes = None) -> None:
         """
         Method to indicate a GeoNetworking packet.
 
         Lower level layers should call this method to indicate a GeoNetworking packet.
 
+        The packet is handled as a single memoryview: every header is decoded in place and the
+        payload handed to the upper layer is a view of the received frame, only copied into bytes
+        if the consumer reads GNDataIndication.data.
+
         Parameters
         ----------
-        packet : bytes
+        packet : bytes | memoryview
             GeoNetworking packet to indicate.
+        sender_address : bytes
+            LL address of the sender of the packet, if the lower layer knows it. Used to find the position of the
+            last forwarder of a GBC packet for contention-based forwarding.
+
+        Raises
+        ------
+        NotImplementedError : Version not implemented
+        """
+        indication = self.gn_data_decap(packet, sender_address)
+        if self.indication_callback:
+            start = time.perf_counter()
+            self.indication_callback(indication)
+            self.statistics.observe("indication_callback", time.perf_counter() - start)
+
+    def gn_data_indicate_batch(self, frames: Iterable[bytes], sender_addresses: Iterable[bytes] = None) -> None:
+        """
+        Method to indicate a burst of GeoNetworking packets.
+
+        Lower level layers that receive several frames at once should call this method instead of
+        gn_data_indicate. Every frame is processed as in gn_data_indicate, and the indications to deliver
+        are passed in a single call to the batch callback, so the per-call overhead of the upper layers is
+        paid once per burst. A frame that cannot be processed is reported and skipped without dropping the
+        rest of the burst. Indications that carry no data for the upper layer (e.g. duplicated packets or
+        packets whose area does not include the ego position) are not delivered.
+
+        Parameters
+        ----------
+        frames : Iterable[bytes | memoryview]
+            GeoNetworking packets to indicate.
+        sender_addresses : Iterable[bytes]
+            LL address of the sender of each packet, if the lower layer knows them.
+        """
+        if sender_addresses is None:
+            sender_addresses = itertools.repeat(None)
+        indications: list[GNDataIndication] = []
+        for frame, sender_address in zip(frames, sender_addresses):
+            try:
+                indication = self.gn_data_decap(frame, sender_address)
+            except (NotImplementedError, DecapError, DecodeError) as e:
+                self.logging.warning("batch_error", "Error processing GN packet: %s", e)
+                continue
+            except (ValueError, struct.error) as e:
+                # Invalid field values (e.g. an unknown Common Header NH) or truncated headers
+                self.drop("decode_error", "Error decoding packet: %s", e)
+                continue
+            if indication.upper_protocol_entity != CommonNH.ANY:
+                indications.append(indication)
+        if not indications:
+            return
+        start = time.perf_counter()
+        if self.indication_batch_callback:
+            self.indication_batch_callback(indications)
+        elif self.indication_callback:
+            for indication in indications:
+                self.indication_callback(indication)
+        self.statistics.observe("indication_callback", time.perf_counter() - start)
+
+    def gn_data_decap(self, packet: bytes, sender_address: bytes = None) -> GNDataIndication:
+        # pylint: disable=no-else-raise, too-many-branches
+        """
+        Processes a received GeoNetworking packet (ETSI EN 302 636-4-1 V1.4.1 (2020-01). Section 10.3) and
+        returns the indication for the upper layer, without delivering it.
+
+        Parameters
+        ----------
+        packet : bytes | memoryview
+            GeoNetworking packet to process.
+        sender_address : bytes
+            LL address of the sender of the packet, None if it is unknown.
+
+        Returns
+        -------
+        GNDataIndication
+            Indication of the packet.
 
         Raises
         ------
         NotImplementedError : Version not implemented
         """
         if self.metrics_callback:
-            self.metrics_callback(sys.getsizeof(packet), 0)
+            self.metrics_callback(len(packet), 0)
+        self.statistics.count("rx_packets")
+        self.statistics.count("rx_bytes", len(packet))
+        start = time.perf_counter()
 
         indication = GNDataIndication()
-        # ETSI EN 302 636-4-1 V1.4.1 (2020-01). Section 10.3.3
-        # Decap the common header
-        basic_header = BasicHeader()
-        basic_header.decode_from_bytes(packet[0:4])
-        packet = packet[4:]
-        if basic_header.version != self.mib.itsGnProtocolVersion:
-            raise NotImplementedError("Version not implemented")
-        if basic_header.nh == BasicNH.COMMON_HEADER:
-            # ETSI EN 302 636-4-1 V1.4.1 (2020-01). Section 10.3.5
+        try:
+            # ETSI EN 302 636-4-1 V1.4.1 (2020-01). Section 10.3.3
             # Decap the common header
-            common_header = CommonHeader()
-            common_header.decode_from_bytes(packet[0:8])
-            packet = packet[8:]
-            if basic_header.rhl > self.mib.itsGnDefaultHopLimit:
-                raise DecapError("Hop limit exceeded")
-            # TODO: Forwarding packet buffer flush
-            if common_header.ht == HeaderType.ANY:
-                raise NotImplementedError("Any packet (Common Header) not implemented")
-            elif common_header.ht == HeaderType.BEACON:
-                raise NotImplementedError("Beacon not implemented")
-            elif common_header.ht == HeaderType.GEOUNICAST:
-                raise NotImplementedError("Geounicast not implemented")
-            elif common_header.ht == HeaderType.GEOANYCAST:
-                raise NotImplementedError("Geoanycast not implemented")
-            elif common_header.ht == HeaderType.GEOBROADCAST:
-                indication = self.gn_data_indicate_gbc(packet, common_header)
-            elif common_header.ht == HeaderType.TSB:
-                if common_header.hst == TopoBroadcastHST.SINGLE_HOP:
-                    indication = self.gn_data_indicate_shb(packet, common_header)
+            packet = memoryview(packet)
+            frame = packet
+            basic_header = BasicHeader()
+            basic_header.decode_from_bytes(packet[0:4])
+            if basic_header.version != self.mib.itsGnProtocolVersion:
+                raise NotImplementedError("Version not implemented")
+            if basic_header.nh == BasicNH.COMMON_HEADER:
+                # ETSI EN 302 636-4-1 V1.4.1 (2020-01). Section 10.3.5
+                # Decap the common header
+                common_header = CommonHeader()
+                common_header.decode_from_bytes(packet[4:12])
+                packet = packet[12:]
+                if basic_header.rhl > self.mib.itsGnDefaultHopLimit:
+                    raise DecapError("Hop limit exceeded")
+                if self.location_table.pdr_exceeded and self.check_source_pdr(common_header, packet):
+                    self.drop("pdr_exceeded", "Packet data rate of the source exceeded")
+                    return indication
+                # The BC forwarding packet buffer is flushed by the location table when the sender becomes a new
+                # neighbour (see on_new_neighbour)
+                if common_header.ht == HeaderType.ANY:
+                    raise NotImplementedError("Any packet (Common Header) not implemented")
+                elif common_header.ht == HeaderType.BEACON:
+                    raise NotImplementedError("Beacon not implemented")
+                elif common_header.ht == HeaderType.GEOUNICAST:
+                    raise NotImplementedError("Geounicast not implemented")
+                elif common_header.ht == HeaderType.GEOANYCAST:
+                    raise NotImplementedError("Geoanycast not implemented")
+                elif common_header.ht == HeaderType.GEOBROADCAST:
+                    indication = self.gn_data_indicate_gbc(
+                        packet, common_header, basic_header, frame, sender_address
+                    )
+                elif common_header.ht == HeaderType.TSB:
+                    if common_header.hst == TopoBroadcastHST.SINGLE_HOP:
+                        indication = self.gn_data_indicate_shb(packet, common_header)
+                    else:
+                        raise NotImplementedError("TopoBroadcast not implemented")
+                elif common_header.ht == HeaderType.LS:
+                    raise NotImplementedError("Location Service not implemented")
                 else:
-                    raise NotImplementedError("TopoBroadcast not implemented")
-            elif common_header.ht == HeaderType.LS:
-                raise NotImplementedError("Location Service not implemented")
+                    raise NotImplementedError("Any packet (Common Header) not implemented")
+
+            elif basic_header.nh == BasicNH.SECURED_PACKET:
+                raise NotImplementedError("Secured packet not implemented")
             else:
-                raise NotImplementedError("Any packet (Common Header) not implemented")
+                raise NotImplementedError("ANY next header not implemented")
+        except NotImplementedError as e:
+            self.drop("not_implemented", "Packet not supported: %s", e)
+            raise
+        except DecapError as e:
+            self.drop("decap_error", "Error decapsulating packet: %s", e)
+            raise
+        finally:
+            self.statistics.observe("decode", time.perf_counter() - start)
+        return indication
+
+    def check_source_pdr(self, common_header: CommonHeader, packet: memoryview) -> bool:
+        """
+        Checks whether a received packet has to be dropped because the Packet Data Rate (PDR) of its source
+        exceeds itsGnMaxPacketDataRate. ETSI EN 302 636-4-1 V1.4.1 (2020-01). Annex B.2
+
+        Only the MID of the source position vector is read, so the packets of a flooding source are dropped
+        before decoding the rest of the headers, updating the Location Table or delivering them to the upper
+        layer.
 
-        elif basic_header.nh == BasicNH.SECURED_PACKET:
-            raise NotImplementedError("Secured packet not implemented")
+        Parameters
+        ----------
+        common_header : CommonHeader
+            CommonHeader of the packet.
+        packet : memoryview
+            GeoNetworking packet (without the basic header and common header).
+
+        Returns
+        -------
+        bool
+            True if the packet has to be dropped.
+        """
+        if common_header.ht == HeaderType.GEOBROADCAST:
+            # SN and Reserved fields precede the SO PV
+            so_pv_offset = 4
+            extended_header_length = 44
+        elif common_header.ht == HeaderType.TSB and common_header.hst == TopoBroadcastHST.SINGLE_HOP:
+            so_pv_offset = 0
+            extended_header_length = 24 + 4
         else:
-            raise NotImplementedError("ANY next header not implemented")
-        if self.indication_callback:
-            self.indication_callback(indication)
+            return False
+        if len(packet) < extended_header_length:
+            return False
+        # MID of the GN address of the source, from the third byte of the SO PV
+        mid = bytes(packet[so_pv_offset + 2:so_pv_offset + 8])
+        # Same packet size as the one accounted by the Location Table entries
+        return self.location_table.check_pdr(mid, len(packet) - extended_header_length + 8 + 4)
+
+    def drop(self, reason: str, msg: str, *args) -> None:
+        """
+        Accounts a dropped packet: increments the counter of the drop reason and logs the message, rate limited
+        per reason.
+
+        Parameters
+        ----------
+        reason : str
+            Drop reason. The counter is named "drop_" + reason.
+        msg : str
+            Message to log, with %-style placeholders for args.
+        """
+        self.statistics.count("drop_" + reason)
+        self.logging.warning(reason, msg, *args)
 
     def duplicate_address_detection(self, gn_addr: GNAddress) -> None:
         """
@@ -678,8 +1094,30 @@ class Router:
             raise DADException("Duplicate Address Detected!")
             # TODO : Handle the reset of the GN address as said in the standard
 
+    def set_ego_position_vector(self, position_vector: LongPositionVector) -> None:
+        """
+        Publish a new ego position vector.
+
+        A snapshot (with its encoding) is taken of the position vector and replaces the current one
+        in a single assignment, so sending threads never read a partially updated position vector.
+
+        Parameters
+        ----------
+        position_vector : LongPositionVector
+            New ego position vector.
+        """
+        self.ego_position_vector = LongPositionVectorSnapshot(position_vector)
+
     def refresh_ego_position_vector(self, tpv: dict) -> None:
         """
-        Refresh the ego position vector.
+        Refresh the ego position vector with a GPSD TPV message.
+
+        Parameters
+        ----------
+        tpv : dict
+            Dict containing the data from a GPSD TPV message.
         """
-        self.ego_position_vector.refresh_with_tpv_data(tpv)
+        position_vector = LongPositionVector()
+        position_vector.set_gn_addr(self.gn_address)
+        position_vector.refresh_with_tpv_data(tpv)
+        self.set_ego_position_vector(position_vector)
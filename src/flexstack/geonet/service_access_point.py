@@ -1,5 +1,7 @@
+from __future__ import annotations
 from enum import Enum
 from base64 import b64encode, b64decode
+from .geometry import AreaGeometry, geometric_function_f
 from .position_vector import LongPositionVector
 from ..security.security_profiles import SecurityProfile
 
@@ -359,6 +361,45 @@ class Area:
         self.a = 0
         self.b = 0
         self.angle = 0
+        self._geometry: AreaGeometry = None
+        self._geometry_key: tuple[int, int, int] = None
+
+    def geometry(self) -> AreaGeometry:
+        """
+        Returns the precomputed terms of the centre and the angle of the area. They are computed again only if
+        the centre or the angle have changed.
+
+        Returns
+        -------
+        AreaGeometry :
+            Geometry of the area.
+        """
+        key = (self.latitude, self.longitude, self.angle)
+        if key != self._geometry_key:
+            self._geometry = AreaGeometry(self.latitude, self.longitude, self.angle)
+            self._geometry_key = key
+        return self._geometry
+
+    def geometric_function_f(self, area_type: GeoBroadcastHST, latitude: int, longitude: int) -> float:
+        """
+        Geometric function F of a point for this area. As specified in ETSI EN 302 931 V1.1.1 (2011-07). Section 5.
+
+        Parameters
+        ----------
+        area_type : GeoBroadcastHST
+            Type of the area.
+        latitude : int
+            Latitude of the point. In 1/10 micro degree.
+        longitude : int
+            Longitude of the point. In 1/10 micro degree.
+
+        Returns
+        -------
+        float :
+            Positive inside the area, zero at the border and negative outside.
+        """
+        x, y = self.geometry().cartesian_coordinates(latitude, longitude)
+        return geometric_function_f(area_type.value, x, y, self.a, self.b)
 
     def to_dict(self) -> dict:
         """
@@ -548,7 +589,10 @@ class GNDataIndication:
     length : int
         Length of the payload.
     data : bytes
-        Payload.
+        Payload. It can be set to a memoryview of the received frame, it is only copied into
+        bytes the first time it is read.
+    data_view : memoryview
+        Payload as a memoryview, without copying it.
     """
 
     def __init__(self) -> None:
@@ -562,6 +606,26 @@ class GNDataIndication:
         self.length = 0
         self.data = b""
 
+    @property
+    def data(self) -> bytes:
+        """
+        Payload as bytes. Converted (once) from the memoryview if needed.
+        """
+        if not isinstance(self._data, bytes):
+            self._data = bytes(self._data)
+        return self._data
+
+    @data.setter
+    def data(self, data: bytes | memoryview) -> None:
+        self._data = data
+
+    @property
+    def data_view(self) -> memoryview:
+        """
+        Payload as a memoryview, without copying it.
+        """
+        return memoryview(self._data)
+
     def to_dict(self) -> dict:
         """
         Returns a dictionary representation of the GN Data Indication.
@@ -0,0 +1,126 @@
+from __future__ import annotations
+import ctypes
+import socket
+import struct
+
+# Linux socket option to attach a classic BPF program (asm-generic/socket.h)
+SO_ATTACH_FILTER = 26
+
+# Classic BPF opcodes (linux/filter.h)
+BPF_LD_W_ABS = 0x20
+BPF_LD_H_ABS = 0x28
+BPF_JEQ_K = 0x15
+BPF_RET_K = 0x06
+
+# struct sock_filter: code, jt, jf, k
+SOCK_FILTER_STRUCT = struct.Struct("=HBBI")
+# struct sock_fprog: len, filter (with the native alignment of the pointer)
+SOCK_FPROG_STRUCT = struct.Struct("@HP")
+
+# Bytes of the frame accepted by the filter (the whole frame)
+ACCEPT_LENGTH = 0x40000
+ETHERTYPE_GEONETWORKING = 0x8947
+
+ACCEPT = "accept"
+DROP = "drop"
+
+
+def assemble(program: list[tuple]) -> list[tuple[int, int, int, int]]:
+    """
+    Resolves the jump targets of a classic BPF program.
+
+    Parameters
+    ----------
+    program : List[tuple]
+        Instructions as (code, k) or, for jumps, (code, k, jump if true, jump if false), where the targets are
+        ACCEPT, DROP, None for the next instruction or the number of instructions to skip. The program is
+        followed by a "return accept" and a "return drop" instruction.
+
+    Returns
+    -------
+    List[Tuple[int, int, int, int]]
+        Instructions as (code, jt, jf, k), with the jumps relative to the next instruction.
+    """
+    targets = {ACCEPT: len(program), DROP: len(program) + 1}
+    instructions = []
+    for index, instruction in enumerate(program):
+        if len(instruction) == 2:
+            code, k = instruction
+            instructions.append((code, 0, 0, k))
+        else:
+            code, k, jump_true, jump_false = instruction
+            instructions.append((code, _jump(jump_true, index, targets), _jump(jump_false, index, targets), k))
+    instructions.append((BPF_RET_K, 0, 0, ACCEPT_LENGTH))
+    instructions.append((BPF_RET_K, 0, 0, 0))
+    return instructions
+
+
+def _jump(target, index: int, targets: dict[str, int]) -> int:
+    if target is None:
+        return 0
+    if isinstance(target, int):
+        return target
+    return targets[target] - index - 1
+
+
+def build_geonetworking_filter(mac_address: bytes) -> list[tuple[int, int, int, int]]:
+    """
+    Builds a classic BPF program that accepts the GeoNetworking frames addressed to a station: frames with the
+    GeoNetworking ethertype that are unicast to its MAC address, or broadcast and not sent by itself.
+
+    Parameters
+    ----------
+    mac_address : bytes
+        MAC address of the station.
+
+    Returns
+    -------
+    List[Tuple[int, int, int, int]]
+        Instructions as (code, jt, jf, k).
+    """
+    mac_high, mac_low = struct.unpack(">IH", mac_address)
+    return assemble([
+        # Ethertype
+        (BPF_LD_H_ABS, 12),
+        (BPF_JEQ_K, ETHERTYPE_GEONETWORKING, None, DROP),
+        # Destination unicast to the station (jumps to the broadcast check otherwise)
+        (BPF_LD_W_ABS, 0),
+        (BPF_JEQ_K, mac_high, None, 2),
+        (BPF_LD_H_ABS, 4),
+        (BPF_JEQ_K, mac_low, ACCEPT, DROP),
+        # Destination broadcast
+        (BPF_JEQ_K, 0xFFFFFFFF, None, DROP),
+        (BPF_LD_H_ABS, 4),
+        (BPF_JEQ_K, 0xFFFF, None, DROP),
+        # Source other than the station
+        (BPF_LD_W_ABS, 6),
+        (BPF_JEQ_K, mac_high, None, ACCEPT),
+        (BPF_LD_H_ABS, 10),
+        (BPF_JEQ_K, mac_low, DROP, ACCEPT),
+    ])
+
+
+def attach_filter(sock: socket.socket, instructions: list[tuple[int, int, int, int]]) -> None:
+    """
+    Attaches a classic BPF program to a socket (SO_ATTACH_FILTER). The kernel drops the frames the program
+    does not accept before they are queued to the socket.
+
+    Parameters
+    ----------
+    sock : socket.socket
+        Socket.
+    instructions : List[Tuple[int, int, int, int]]
+        Instructions as (code, jt, jf, k).
+
+    Raises
+    ------
+    OSError
+        If the program cannot be attached.
+    """
+    program = ctypes.create_string_buffer(
+        b"".join(SOCK_FILTER_STRUCT.pack(*instruction) for instruction in instructions)
+    )
+    # The kernel copies the program during the call
+    sock.setsockopt(
+        socket.SOL_SOCKET, SO_ATTACH_FILTER, SOCK_FPROG_STRUCT.pack(len(instructions), ctypes.addressof(program))
+    )
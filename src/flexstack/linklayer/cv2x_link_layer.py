@@ -3,9 +3,13 @@ from collections.abc import Callable
 import multiprocessing
 import threading
 
-# pylint: disable=import-error
-from cv2xlinklayer import CV2XLinkLayer
+try:
+    # pylint: disable=import-error
+    from cv2xlinklayer import CV2XLinkLayer
+except ImportError:
+    CV2XLinkLayer = None
 from .link_layer import LinkLayer
+from .shared_memory_ring import SharedMemoryRing
 
 
 class PythonCV2XLinkLayer(LinkLayer):
@@ -15,85 +19,125 @@ class PythonCV2XLinkLayer(LinkLayer):
 
     Attributes
     ----------
-    receive_callback : Callable[[bytes], None]
-        Callback to call when a packet is received.
+    receive_callback : Callable[[bytes, bytes], None]
+        Callback to call when a packet is received. The Telematics SDK does not give the L2 source of the
+        frames, so the LL address of the sender is always None.
     link_layer : CV2XLinkLayer
         Link Layer to send and receive C-V2X messages.
     process : multiprocessing.Process
         Process to run the receive function.
     callback_thread : threading.Thread
         Thread to handle callbacks in the main memory space.
-    callback_queue : multiprocessing.Queue
-        Queue for transferring data between processes for callback execution.
+    ring : SharedMemoryRing
+        Shared memory ring transferring the received frames from the receive process to the main process,
+        without pickling them.
     stop_event : multiprocessing.Event
         Event to signal the process to stop.
     """
 
-    def __init__(self, receive_callback: Callable[[bytes], None]) -> None:
+    def __init__(self, receive_callback: Callable[[bytes, bytes], None], link_layer: CV2XLinkLayer = None) -> None:
+        """
+        Parameters
+        ----------
+        receive_callback : Callable[[bytes, bytes], None]
+            Callback to call when a packet is received, with None as LL address of the sender. The packet is a memoryview of the shared memory ring,
+            only valid during the call.
+        link_layer : CV2XLinkLayer
+            Link Layer to send and receive C-V2X messages. Defaults to a new CV2XLinkLayer.
+
+        Raises
+        ------
+        ImportError
+            If no link layer is given and the cv2xlinklayer library is not installed.
+        """
         super().__init__(receive_callback)
-        self.link_layer = CV2XLinkLayer()
+        if link_layer is None:
+            if CV2XLinkLayer is None:
+                raise ImportError("The cv2xlinklayer library is required by PythonCV2XLinkLayer")
+            link_layer = CV2XLinkLayer()
+        self.link_layer = link_layer
         self.stop_event = multiprocessing.Event()
-        self.callback_queue = multiprocessing.Queue()
+        self.stopped = False
+        self.ring = SharedMemoryRing()
 
-        # Process for receiving data
-        self.process = multiprocessing.Process(
+        # Process for receiving data. It shares the ring by forking.
+        self.process = multiprocessing.get_context("fork").Process(
             target=self.receive_process,
-            args=(self.callback_queue, self.stop_event),
+            args=(self.ring, self.stop_event),
             daemon=True,
         )
         self.process.start()
 
         # Thread for handling callbacks in the main process
         self.callback_thread = threading.Thread(
-            target=self.callback_handler_loop, args=(self.callback_queue,), daemon=True
+            target=self.callback_handler_loop, args=(self.ring,), daemon=True
         )
         self.callback_thread.start()
 
-    def send(self, packet: bytes) -> None:
+    def send(self, packet: bytes, destination: bytes = None) -> None:
         """
         Sends a packet via C-V2X.
 
+        The C-V2X SDK only broadcasts, so the packet is broadcast even if a next hop is given.
+
         Parameters
         ----------
         packet : bytes
             Packet to send.
+        destination : bytes
+            LL address of the next hop. Ignored.
         """
         self.link_layer.send(b"\x03" + packet)
+        self.statistics.count("tx_packets")
+        self.statistics.count("tx_bytes", len(packet) + 1)
 
-    def receive_process(
-        self, callback_queue: multiprocessing.Queue, stop_event: multiprocessing.Event
-    ) -> None:
+    def receive_process(self, ring: SharedMemoryRing, stop_event: multiprocessing.Event) -> None:
         """
-        Process to receive data from CV2XLinkLayer and place it in the callback queue.
+        Process to receive data from CV2XLinkLayer and place it in the shared memory ring.
 
         Parameters
         ----------
-        callback_queue : multiprocessing.Queue
-            Queue for transferring received data to the main process.
+        ring : SharedMemoryRing
+            Ring for transferring received data to the main process.
         stop_event : multiprocessing.Event
             Event to signal the process to stop.
         """
         while not stop_event.is_set():
             data = self.link_layer.receive()
             if data:
-                data = data[1:]  # Remove the first byte as per protocol
-                callback_queue.put(data)  # Place data in the queue
+                # Remove the first byte as per protocol
+                ring.put(memoryview(data)[1:])
+
+    def callback_handler_loop(self, ring: SharedMemoryRing) -> None:
+        """
+        Thread loop to handle callbacks from the shared memory ring.
+
+        Parameters
+        ----------
+        ring : SharedMemoryRing
+            Ring for transferring received data to the main process.
+        """
+        while not self.stopped:
+            ring.wait()
+            ring.consume(self.handle_frame)
 
-    def callback_handler_loop(self, callback_queue: multiprocessing.Queue) -> None:
+    def handle_frame(self, data: memoryview) -> None:
         """
-        Thread loop to handle callbacks from the callback queue.
+        Passes a received frame to the receive callback.
 
         Parameters
         ----------
-        callback_queue : multiprocessing.Queue
-            Queue for transferring received data to the main process.
+        data : memoryview
+            Frame, without the protocol byte.
         """
-        while True:
-            data = callback_queue.get()
-            if data is None:  # Stop signal
-                break
-            if self.receive_callback:
-                self.receive_callback(data)
+        self.statistics.count("rx_packets")
+        self.statistics.count("rx_bytes", len(data))
+        if self.receive_callback:
+            try:
+                self.receive_callback(data, None)
+            except NotImplementedError as e:
+                self.statistics.count("drop_not_implemented")
+                self.logging.warning("not_implemented", "Error decoding packet: %s", e)
 
     def stop(self) -> None:
         """
@@ -104,5 +148,8 @@ class PythonCV2XLinkLayer(LinkLayer):
         self.process.join()
 
         # Stop the callback thread
-        self.callback_queue.put(None)  # Send a stop signal to the thread
+        self.stopped = True
+        self.ring.wakeup.signal()
         self.callback_thread.join()
+        self.statistics.count("drop_ring_full", self.ring.dropped_frames)
+        self.ring.close()
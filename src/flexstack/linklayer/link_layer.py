@@ -1,5 +1,9 @@
 from __future__ import annotations
 from collections.abc import Callable
+import logging
+
+from ..metrics.stack_statistics import StackStatistics
+from ..utils.rate_limited_logger import RateLimitedLogger
 
 
 class LinkLayer:
@@ -8,20 +12,25 @@ class LinkLayer:
 
     Attributes
     ----------
-    receive_callback : Callable[[bytes], None]
-        Callback function to receive packets.
+    receive_callback : Callable[[bytes, bytes], None]
+        Callback function to receive packets, called with the packet and the LL address of its sender (None if
+        the link layer does not know it), e.g. Router.gn_data_indicate.
+    statistics : StackStatistics
+        Counters of the frames and bytes sent and received, and of the errors.
+    logging : RateLimitedLogger
+        Logger for the errors of the receive and send paths.
 
     Methods
     -------
-    send(bytes)
-        Send a packet to the LL.
+    send(bytes, bytes)
+        Send a packet to the LL, broadcast or to the LL address of its next hop.
     receive()
         Receive a packet from the LL. (To be called in a thread)
 
 
     """
 
-    def __init__(self, receive_callback: Callable[[bytes], None]) -> None:
+    def __init__(self, receive_callback: Callable[[bytes, bytes], None]) -> None:
         """
         Create a Link Layer object.
 
@@ -31,8 +40,8 @@ class LinkLayer:
             Interface to use. (Linux only)
         mac_address : bytes
             MAC address of the interface.
-        receive_callback : Callable[[bytes], None]
-            Callback function to receive packets.
+        receive_callback : Callable[[bytes, bytes], None]
+            Callback function to receive packets, called with the packet and the LL address of its sender.
 
         Raises
         ------
@@ -42,8 +51,10 @@ class LinkLayer:
             If the MAC address is not 6 bytes long.
         """
         self.receive_callback = receive_callback
+        self.statistics = StackStatistics("link_layer")
+        self.logging = RateLimitedLogger(logging.getLogger("link_layer"))
 
-    def send(self, packet: bytes) -> None:
+    def send(self, packet: bytes, destination: bytes = None) -> None:
         """
         Send a packet to the lower layer.
 
@@ -51,6 +62,8 @@ class LinkLayer:
         ----------
         packet : bytes
             Packet to send.
+        destination : bytes
+            LL address of the next hop (LL_ADDR_NH), or None to broadcast the packet.
 
         Raises
         ------
@@ -0,0 +1,227 @@
+from __future__ import annotations
+import ctypes
+import ctypes.util
+import os
+
+try:
+    _libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+except (OSError, TypeError):
+    _libc = None
+_sendmmsg = getattr(_libc, "sendmmsg", None)
+_recvmmsg = getattr(_libc, "recvmmsg", None)
+
+# True if the C library provides sendmmsg / recvmmsg (Linux)
+HAS_SENDMMSG = _sendmmsg is not None
+HAS_RECVMMSG = _recvmmsg is not None
+
+# Flags of recvmmsg and of the received messages (bits/socket.h)
+MSG_WAITFORONE = 0x10000
+MSG_TRUNC = 0x20
+
+
+class IOVec(ctypes.Structure):
+    """
+    struct iovec
+    """
+
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+
+class MsgHdr(ctypes.Structure):
+    """
+    struct msghdr
+    """
+
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p),
+        ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(IOVec)),
+        ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p),
+        ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int),
+    ]
+
+
+class MMsgHdr(ctypes.Structure):
+    """
+    struct mmsghdr
+    """
+
+    _fields_ = [("msg_hdr", MsgHdr), ("msg_len", ctypes.c_uint)]
+
+
+if HAS_SENDMMSG:
+    _sendmmsg.argtypes = [ctypes.c_int, ctypes.POINTER(MMsgHdr), ctypes.c_uint, ctypes.c_int]
+    _sendmmsg.restype = ctypes.c_int
+if HAS_RECVMMSG:
+    _recvmmsg.argtypes = [ctypes.c_int, ctypes.POINTER(MMsgHdr), ctypes.c_uint, ctypes.c_int, ctypes.c_void_p]
+    _recvmmsg.restype = ctypes.c_int
+
+
+def _raise_errno() -> None:
+    errno = ctypes.get_errno()
+    raise OSError(errno, os.strerror(errno))
+
+
+class MMsgSender:
+    """
+    Sends several frames with a single sendmmsg system call.
+
+    Every frame is sent as two I/O vectors: a header shared by all the frames, held in a preallocated buffer,
+    and the packet, which is not copied. The message and I/O vector arrays are preallocated too, so a
+    sender must only be used by one thread.
+
+    Attributes
+    ----------
+    header : ctypes.Array
+        Preallocated header of the frames (e.g. the Ethernet header).
+    max_batch : int
+        Maximum number of frames sent by a single system call.
+    """
+
+    def __init__(self, header: bytes, max_batch: int) -> None:
+        """
+        Parameters
+        ----------
+        header : bytes
+            Header of the frames.
+        max_batch : int
+            Maximum number of frames sent by a single system call.
+
+        Raises
+        ------
+        OSError
+            If sendmmsg is not available.
+        """
+        if not HAS_SENDMMSG:
+            raise OSError("sendmmsg is not available")
+        self.header = ctypes.create_string_buffer(header, len(header))
+        self.max_batch = max_batch
+        self._iovecs = (IOVec * (2 * max_batch))()
+        self._messages = (MMsgHdr * max_batch)()
+        header_address = ctypes.addressof(self.header)
+        for index in range(max_batch):
+            self._iovecs[2 * index].iov_base = header_address
+            self._iovecs[2 * index].iov_len = len(header)
+            message = self._messages[index].msg_hdr
+            message.msg_iov = ctypes.pointer(self._iovecs[2 * index])
+            message.msg_iovlen = 2
+
+    def send(self, fd: int, packets: list[bytes]) -> int:
+        """
+        Sends the frames of a list of packets.
+
+        Parameters
+        ----------
+        fd : int
+            File descriptor of a connected (or bound packet) socket.
+        packets : List[bytes]
+            Packets to send, at most max_batch. The header is prepended to each of them.
+
+        Returns
+        -------
+        int
+            Number of frames sent, which may be less than the number of packets.
+
+        Raises
+        ------
+        OSError
+            If no frame can be sent.
+        """
+        count = min(len(packets), self.max_batch)
+        # The references keep the packets alive during the call
+        references = []
+        for index in range(count):
+            packet = packets[index]
+            if not isinstance(packet, bytes):
+                packet = bytes(packet)
+            references.append(packet)
+            iovec = self._iovecs[2 * index + 1]
+            iovec.iov_base = ctypes.cast(ctypes.c_char_p(packet), ctypes.c_void_p).value
+            iovec.iov_len = len(packet)
+        sent = _sendmmsg(fd, self._messages, count, 0)
+        if sent < 0:
+            _raise_errno()
+        return sent
+
+
+class MMsgReceiver:
+    """
+    Receives several datagrams with a single recvmmsg system call.
+
+    The datagrams are received into a preallocated buffer with one slot per message, and returned as views of
+    it, so there is no allocation per datagram. A receiver must only be used by one thread.
+
+    Attributes
+    ----------
+    max_batch : int
+        Maximum number of datagrams received by a single system call.
+    slot_size : int
+        Maximum size of a datagram. Longer datagrams are discarded.
+    buffer : ctypes.Array
+        Preallocated buffer of the datagrams.
+    """
+
+    def __init__(self, max_batch: int, slot_size: int) -> None:
+        """
+        Parameters
+        ----------
+        max_batch : int
+            Maximum number of datagrams received by a single system call.
+        slot_size : int
+            Maximum size of a datagram.
+
+        Raises
+        ------
+        OSError
+            If recvmmsg is not available.
+        """
+        if not HAS_RECVMMSG:
+            raise OSError("recvmmsg is not available")
+        self.max_batch = max_batch
+        self.slot_size = slot_size
+        self.buffer = ctypes.create_string_buffer(max_batch * slot_size)
+        self.view = memoryview(self.buffer).cast("B")
+        self._iovecs = (IOVec * max_batch)()
+        self._messages = (MMsgHdr * max_batch)()
+        buffer_address = ctypes.addressof(self.buffer)
+        for index in range(max_batch):
+            self._iovecs[index].iov_base = buffer_address + index * slot_size
+            self._iovecs[index].iov_len = slot_size
+            message = self._messages[index].msg_hdr
+            message.msg_iov = ctypes.pointer(self._iovecs[index])
+            message.msg_iovlen = 1
+
+    def receive(self, fd: int) -> list[memoryview]:
+        """
+        Waits for at least one datagram and returns all the datagrams available, up to max_batch.
+
+        Parameters
+        ----------
+        fd : int
+            File descriptor of a blocking datagram socket.
+
+        Returns
+        -------
+        List[memoryview]
+            Datagrams received, as views of the buffer. Only valid until the next call.
+
+        Raises
+        ------
+        OSError
+            If the datagrams cannot be received.
+        """
+        for index in range(self.max_batch):
+            self._messages[index].msg_hdr.msg_flags = 0
+        received = _recvmmsg(fd, self._messages, self.max_batch, MSG_WAITFORONE, None)
+        if received < 0:
+            _raise_errno()
+        datagrams = []
+        for index in range(received):
+            message = self._messages[index]
+            if message.msg_hdr.msg_flags & MSG_TRUNC:
+                continue
+            start = index * self.slot_size
+            datagrams.append(self.view[start:start + message.msg_len])
+        return datagrams
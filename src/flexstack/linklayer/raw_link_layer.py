@@ -1,14 +1,29 @@
 from __future__ import annotations
+import select
 import socket
+import struct
 import platform
 from collections.abc import Callable
 import threading
+from ..geonet.exceptions import DecapError, DecodeError
 from .exceptions import (
     WindowsNotSupportedException,
     InvalidMACAddressException,
     PacketTooLongException,
 )
+from .bpf_filter import attach_filter, build_geonetworking_filter
 from .link_layer import LinkLayer
+from .mmsg import HAS_SENDMMSG, MMsgSender
+from .tpacket_v3 import TPacketV3Ring
+from .transmit_queue import DEFAULT_MAX_BATCH, TransmitQueue, access_category
+
+BROADCAST_MAC_ADDRESS = b"\xff\xff\xff\xff\xff\xff"
+ETHERTYPE_GEONETWORKING = b"\x89\x47"
+MAX_FRAME_LENGTH = 1500
+# Timeout of the wait for a block of the receive ring, in milliseconds
+RX_RING_POLL_TIMEOUT = 100
+# Errors of the upper layers that only drop the packet that caused them
+PACKET_ERRORS = (DecapError, DecodeError, ValueError, struct.error)
 
 
 def raise_exception_if_windows(func):
@@ -33,17 +48,31 @@ class RawLinkLayer(LinkLayer):
 
     Attributes
     ----------
-    receive_callback : Callable[[bytes], None]
-        Callback function to receive packets.
+    receive_callback : Callable[[bytes, bytes], None]
+        Callback function to receive packets, called with the packet and the source MAC address of the frame.
     sock : socket
         Socket to send and receive packets.
     mac_address : bytes
         MAC address of the interface.
+    rx_ring : TPacketV3Ring
+        Memory-mapped receive ring, None if frames are received with recv.
+    receive_batch_callback : Callable[[List[bytes], List[bytes]], None]
+        Callback function to receive the packets of a block of the receive ring at once, with the source MAC
+        address of each of them (e.g. Router.gn_data_indicate_batch). If None, the packets are passed one by one
+        to receive_callback.
+    header : bytes
+        Ethernet header of the broadcast frames sent (broadcast destination, own MAC address and GeoNetworking
+        ethertype).
+    tx_queue : TransmitQueue
+        Transmit queue drained by a sender thread, None if packets are sent on the caller's thread.
+    kernel_filter : bool
+        Whether the frames not addressed to the station are dropped by a BPF program attached to the socket,
+        so they are not checked again in Python.
 
     Methods
     -------
-    send(bytes)
-        Send a packet to the LL.
+    send(bytes, bytes)
+        Send a packet to the LL, broadcast or to the MAC address of its next hop.
     receive()
         Receive a packet from the LL. (To be called in a thread)
 
@@ -51,7 +80,14 @@ class RawLinkLayer(LinkLayer):
     """
 
     def __init__(
-        self, iface: str, mac_address: bytes, receive_callback: Callable[[bytes], None]
+        self,
+        iface: str,
+        mac_address: bytes,
+        receive_callback: Callable[[bytes, bytes], None],
+        rx_ring: bool = False,
+        receive_batch_callback: Callable[[list[bytes], list[bytes]], None] = None,
+        tx_queue: bool = False,
+        kernel_filter: bool = True,
     ) -> None:
         """
         Create a Link Layer object.
@@ -62,8 +98,21 @@ class RawLinkLayer(LinkLayer):
             Interface to use. (Linux only)
         mac_address : bytes
             MAC address of the interface.
-        receive_callback : Callable[[bytes], None]
-            Callback function to receive packets.
+        receive_callback : Callable[[bytes, bytes], None]
+            Callback function to receive packets, called with the packet and the source MAC address of the frame.
+        rx_ring : bool
+            Receive the frames through a memory-mapped TPACKET_V3 ring (PACKET_RX_RING) instead of one recv
+            per frame. The frames are copied out of the ring before their packets are passed to the callbacks,
+            since the block is given back to the kernel as soon as they return.
+        receive_batch_callback : Callable[[List[bytes], List[bytes]], None]
+            Callback function to receive the packets of a block of the receive ring at once, with their source
+            MAC addresses. Only used with rx_ring.
+        tx_queue : bool
+            Queue the packets to send per access category and send them from a dedicated thread, in batches
+            with sendmmsg where available, so the caller never blocks on the socket.
+        kernel_filter : bool
+            Attach a BPF program (SO_ATTACH_FILTER) that drops in the kernel the frames not addressed to the
+            station and the ones sent by itself. If it cannot be attached, the frames are filtered in Python.
 
         Raises
         ------
@@ -76,34 +125,118 @@ class RawLinkLayer(LinkLayer):
         self.sock = socket.socket(
             socket.AF_PACKET, socket.SOCK_RAW, socket.htons(0x8947)
         )
-        self.sock.bind((iface, 0))
         if len(mac_address) != 6:
             raise InvalidMACAddressException("MAC address must be 6 bytes long")
+        self.kernel_filter = False
+        if kernel_filter:
+            try:
+                attach_filter(self.sock, build_geonetworking_filter(mac_address))
+                self.kernel_filter = True
+            except OSError as e:
+                self.logging.warning("bpf_filter", "Could not attach the BPF filter, filtering in Python: %s", e)
+        self.rx_ring: TPacketV3Ring = None
+        self.receive_batch_callback = receive_batch_callback
+        if rx_ring:
+            # The ring has to be set up before binding the socket
+            self.rx_ring = TPacketV3Ring.open(self.sock)
+        self.sock.bind((iface, 0))
         self.mac_address = mac_address
-        self.receiving_thread = threading.Thread(target=self.receive, daemon=True)
+        self.header = BROADCAST_MAC_ADDRESS + mac_address + ETHERTYPE_GEONETWORKING
+        self.mmsg_sender: MMsgSender = None
+        self.tx_queue: TransmitQueue = None
+        if tx_queue:
+            if HAS_SENDMMSG:
+                self.mmsg_sender = MMsgSender(self.header, DEFAULT_MAX_BATCH)
+            self.tx_queue = TransmitQueue(self.send_batch)
+        self.receiving_thread = threading.Thread(
+            target=self.receive_ring if rx_ring else self.receive, daemon=True
+        )
         self.receiving_thread.start()
 
     def __del__(self) -> None:
         """
         Close the socket.
         """
+        if self.rx_ring is not None:
+            self.rx_ring.close()
         self.sock.close()
 
-    def send(self, packet: bytes) -> None:
+    def send(self, packet: bytes, destination: bytes = None) -> None:
         """
         Send a packet to the LL.
 
+        With a transmit queue the packet is queued with the access category of its traffic class and sent
+        later by the sender thread.
+
         Parameters
         ----------
         packet : bytes
             Packet to send.
+        destination : bytes
+            MAC address of the next hop, or None to broadcast the packet.
         """
-        dest = b"\xff\xff\xff\xff\xff\xff"
-        ethertype = b"\x89\x47"
-        packet = dest + self.mac_address + ethertype + packet
-        if len(packet) > 1500:
+        if len(self.header) + len(packet) > MAX_FRAME_LENGTH:
+            self.statistics.count("drop_packet_too_long")
             raise PacketTooLongException("Packet too long")
-        self.sock.send(packet)
+        if self.tx_queue is not None:
+            entry = packet if destination is None else (packet, destination)
+            if not self.tx_queue.put(entry, access_category(packet)):
+                self.statistics.count("drop_tx_queue_full")
+            return
+        frame = self.frame_header(destination) + packet
+        self.sock.send(frame)
+        self.statistics.count("tx_packets")
+        self.statistics.count("tx_bytes", len(frame))
+
+    def frame_header(self, destination: bytes = None) -> bytes:
+        """
+        Returns the Ethernet header of a frame.
+
+        Parameters
+        ----------
+        destination : bytes
+            MAC address of the next hop, or None for a broadcast frame.
+        """
+        if destination is None:
+            return self.header
+        return destination + self.mac_address + ETHERTYPE_GEONETWORKING
+
+    def send_batch(self, packets: list[bytes | tuple[bytes, bytes]]) -> None:
+        """
+        Sends a batch of packets taken from the transmit queue. (Called by the sender thread)
+
+        Several broadcast packets are sent with a single sendmmsg call where available. Otherwise, or for a
+        single packet, they are sent one by one. The unicast packets, queued with the MAC address of their next
+        hop, are always sent one by one.
+
+        Parameters
+        ----------
+        packets : List[bytes | Tuple[bytes, bytes]]
+            Packets to send, or tuples of a packet and the MAC address of its next hop.
+        """
+        broadcast = [packet for packet in packets if not isinstance(packet, tuple)]
+        unicast = [packet for packet in packets if isinstance(packet, tuple)]
+        try:
+            if self.mmsg_sender is not None and len(broadcast) > 1:
+                sent = 0
+                while sent < len(broadcast):
+                    sent += self.mmsg_sender.send(self.sock.fileno(), broadcast[sent:])
+            else:
+                for packet in broadcast:
+                    self.sock.send(self.header + packet)
+            for packet, destination in unicast:
+                self.sock.send(self.frame_header(destination) + packet)
+        except OSError as e:
+            self.statistics.count("tx_errors")
+            self.logging.error("tx_error", "OS Error sending packets: %s", e)
+            return
+        self.statistics.count("tx_packets", len(packets))
+        self.statistics.count(
+            "tx_bytes",
+            len(self.header) * len(packets)
+            + sum(len(packet) for packet in broadcast)
+            + sum(len(packet) for packet, _ in unicast),
+        )
 
     def receive(self) -> None:
         """
@@ -112,18 +245,107 @@ class RawLinkLayer(LinkLayer):
         while True:
             try:
                 m = self.sock.recv(1500)
-                print("[RawLinkLayer] Received broadcast packet. First 6 bytes: ", m[0:6])
-                try:
-                    if m[0:6] == self.mac_address:
-                        self.receive_callback(m[14:])
-                    elif (
-                        m[0:6] == b"\xff\xff\xff\xff\xff\xff"
-                        and m[6:12] != self.mac_address
-                    ):
-                        self.receive_callback(m[14:])
-                    # if m[0:6] == b'\xff\xff\xff\xff\xff\xff' and m[6:12] == self.mac_address:
-                except NotImplementedError as e:
-                    print("Error decoding packet: " + str(e))
+                self.statistics.count("rx_packets")
+                self.statistics.count("rx_bytes", len(m))
+                if self.kernel_filter or self.is_addressed_to_us(m):
+                    self.handle_packet(m[14:], m[6:12])
+                else:
+                    self.statistics.count("rx_filtered")
             except OSError:
-                print(f"OS Error receiving packet on {self.sock.getsockname()}")
+                self.statistics.count("rx_errors")
+                self.logging.error("os_error", "OS Error receiving packet on %s", self.sock.getsockname())
+                break
+
+    def is_addressed_to_us(self, frame: bytes) -> bool:
+        """
+        Checks whether a frame is addressed to this station: unicast to its MAC address, or broadcast and not
+        sent by itself.
+
+        Parameters
+        ----------
+        frame : bytes | memoryview
+            Frame, starting with the MAC header.
+        """
+        destination = frame[0:6]
+        if destination == self.mac_address:
+            return True
+        return destination == BROADCAST_MAC_ADDRESS and frame[6:12] != self.mac_address
+
+    def receive_ring(self) -> None:
+        """
+        Receive the packets from the memory-mapped receive ring. (To be called in a thread)
+
+        Waits until the kernel hands a block of frames to user space, passes its packets to the receive
+        callbacks and gives the block back to the kernel.
+        """
+        poller = select.poll()
+        poller.register(self.sock, select.POLLIN | select.POLLERR)
+        while True:
+            try:
+                frames = self.rx_ring.read_block()
+                if frames is None:
+                    poller.poll(RX_RING_POLL_TIMEOUT)
+                    continue
+            except (OSError, ValueError):
+                # ValueError if the ring has been unmapped
+                self.statistics.count("rx_errors")
+                self.logging.error("os_error", "OS Error receiving packet on %s", self.sock.getsockname())
                 break
+            try:
+                self.handle_ring_frames(frames)
+            finally:
+                for frame in frames:
+                    frame.release()
+                self.rx_ring.release_block()
+
+    def handle_ring_frames(self, frames: list[memoryview]) -> None:
+        """
+        Passes the packets of a block of the receive ring to the receive callbacks.
+
+        The frames are copied, since the upper layers may keep slices of the packets (e.g. the payload of an
+        indication) after the block has been given back to the kernel.
+
+        Parameters
+        ----------
+        frames : List[memoryview]
+            Frames of the block, starting with the MAC header.
+        """
+        self.statistics.count("rx_packets", len(frames))
+        self.statistics.count("rx_bytes", sum(len(frame) for frame in frames))
+        frames = [bytes(frame) for frame in frames]
+        if not self.kernel_filter:
+            addressed = [frame for frame in frames if self.is_addressed_to_us(frame)]
+            if len(addressed) < len(frames):
+                self.statistics.count("rx_filtered", len(frames) - len(addressed))
+            frames = addressed
+        packets = [frame[14:] for frame in frames]
+        sender_addresses = [frame[6:12] for frame in frames]
+        if packets and self.receive_batch_callback:
+            try:
+                self.receive_batch_callback(packets, sender_addresses)
+            except (NotImplementedError,) + PACKET_ERRORS as e:
+                self.statistics.count("rx_errors")
+                self.logging.warning("receive_error", "Error handling batch: %s", e)
+            return
+        for packet, sender_address in zip(packets, sender_addresses):
+            self.handle_packet(packet, sender_address)
+
+    def handle_packet(self, packet: bytes, sender_address: bytes) -> None:
+        """
+        Passes a received packet to the receive callback. An error decoding the packet only drops it.
+
+        Parameters
+        ----------
+        packet : bytes
+            GN packet.
+        sender_address : bytes
+            Source MAC address of the frame.
+        """
+        try:
+            self.receive_callback(packet, sender_address)
+        except NotImplementedError as e:
+            self.statistics.count("drop_not_implemented")
+            self.logging.warning("not_implemented", "Error decoding packet: %s", e)
+        except PACKET_ERRORS as e:
+            self.statistics.count("rx_errors")
+            self.logging.warning("receive_error", "Error handling packet: %s", e)
@@ -0,0 +1,240 @@
+from __future__ import annotations
+from collections.abc import Callable
+from multiprocessing import shared_memory
+import os
+import select
+import struct
+
+COUNTER_STRUCT = struct.Struct("=I")
+EVENTFD_VALUE_STRUCT = struct.Struct("=Q")
+COUNTER_MODULO = 1 << 32
+# Offsets of the fields of the header of the ring. The producer and consumer counters are in different cache
+# lines so the two processes do not write to the same line.
+HEAD_OFFSET = 0
+DROPPED_OFFSET = 4
+TAIL_OFFSET = 64
+CONSUMER_WAITING_OFFSET = 68
+HEADER_SIZE = 128
+# Each slot starts with the length of its frame
+SLOT_LENGTH_SIZE = 4
+
+DEFAULT_SLOT_COUNT = 1024
+DEFAULT_SLOT_SIZE = 2048
+# Maximum time the consumer sleeps without being woken up, in seconds. Bounds the delay of a frame whose
+# wakeup is missed because the stores of the two processes are seen in a different order.
+DEFAULT_WAIT_TIMEOUT = 0.01
+
+
+class Wakeup:
+    """
+    Wakeup of the consumer of a ring from another process. Uses an eventfd where available, a pipe otherwise.
+    The file descriptors are inherited by forked processes.
+    """
+
+    def __init__(self) -> None:
+        if hasattr(os, "eventfd"):
+            self.read_fd = self.write_fd = os.eventfd(0, os.EFD_NONBLOCK)
+        else:
+            self.read_fd, self.write_fd = os.pipe()
+            os.set_blocking(self.read_fd, False)
+            os.set_blocking(self.write_fd, False)
+
+    def signal(self) -> None:
+        """
+        Wakes up the consumer.
+        """
+        try:
+            os.write(self.write_fd, EVENTFD_VALUE_STRUCT.pack(1))
+        except BlockingIOError:
+            # A wakeup is already pending
+            pass
+
+    def wait(self, timeout: float) -> None:
+        """
+        Waits for a wakeup.
+
+        Parameters
+        ----------
+        timeout : float
+            Maximum time to wait, in seconds.
+        """
+        readable, _, _ = select.select([self.read_fd], [], [], timeout)
+        if readable:
+            try:
+                os.read(self.read_fd, 4096)
+            except BlockingIOError:
+                pass
+
+    def close(self) -> None:
+        """
+        Closes the file descriptors.
+        """
+        os.close(self.read_fd)
+        if self.write_fd != self.read_fd:
+            os.close(self.write_fd)
+
+
+class SharedMemoryRing:
+    """
+    Single-producer single-consumer ring of frames in shared memory.
+
+    The frames are copied by the producer into fixed-size slots of a multiprocessing.shared_memory block and
+    read in place by the consumer, so they cross processes without pickling. The producer only advances the
+    head counter and the consumer only advances the tail counter, so no lock is needed. The producer signals
+    the wakeup only when the consumer is waiting for frames, so there is no system call per frame while the
+    consumer keeps up. Frames that do not fit in a full ring are dropped.
+
+    Attributes
+    ----------
+    slot_count : int
+        Number of slots. Power of two.
+    slot_size : int
+        Maximum size of a frame in bytes.
+    shared_memory : shared_memory.SharedMemory
+        Memory of the ring.
+    wakeup : Wakeup
+        Wakeup of the consumer.
+    """
+
+    def __init__(
+        self,
+        slot_count: int = DEFAULT_SLOT_COUNT,
+        slot_size: int = DEFAULT_SLOT_SIZE,
+        wait_timeout: float = DEFAULT_WAIT_TIMEOUT,
+    ) -> None:
+        """
+        Creates the ring. The producer and the consumer processes must share it by forking.
+
+        Parameters
+        ----------
+        slot_count : int
+            Number of slots. Power of two.
+        slot_size : int
+            Maximum size of a frame in bytes.
+        wait_timeout : float
+            Maximum time the consumer sleeps without being woken up, in seconds.
+
+        Raises
+        ------
+        ValueError
+            If the number of slots is not a power of two.
+        """
+        if slot_count <= 0 or slot_count & (slot_count - 1):
+            raise ValueError("The number of slots must be a power of two")
+        self.slot_count = slot_count
+        self.slot_size = slot_size
+        self.slot_stride = SLOT_LENGTH_SIZE + slot_size
+        self.wait_timeout = wait_timeout
+        self.shared_memory = shared_memory.SharedMemory(
+            create=True, size=HEADER_SIZE + slot_count * self.slot_stride
+        )
+        self.buffer = self.shared_memory.buf
+        self.buffer[0:HEADER_SIZE] = bytes(HEADER_SIZE)
+        self.wakeup = Wakeup()
+
+    def _get(self, offset: int) -> int:
+        return COUNTER_STRUCT.unpack_from(self.buffer, offset)[0]
+
+    def _set(self, offset: int, value: int) -> None:
+        COUNTER_STRUCT.pack_into(self.buffer, offset, value % COUNTER_MODULO)
+
+    def __len__(self) -> int:
+        return (self._get(HEAD_OFFSET) - self._get(TAIL_OFFSET)) % COUNTER_MODULO
+
+    @property
+    def dropped_frames(self) -> int:
+        """
+        Frames dropped by the producer because the ring was full.
+        """
+        return self._get(DROPPED_OFFSET)
+
+    def put(self, frame: bytes) -> bool:
+        """
+        Copies a frame into the next slot. (Producer side)
+
+        Parameters
+        ----------
+        frame : bytes | memoryview
+            Frame to put.
+
+        Returns
+        -------
+        bool
+            False if the frame has been dropped because the ring is full.
+
+        Raises
+        ------
+        ValueError
+            If the frame is longer than the slot size.
+        """
+        length = len(frame)
+        if length > self.slot_size:
+            raise ValueError("Frame longer than the slot size")
+        head = self._get(HEAD_OFFSET)
+        if (head - self._get(TAIL_OFFSET)) % COUNTER_MODULO >= self.slot_count:
+            self._set(DROPPED_OFFSET, self._get(DROPPED_OFFSET) + 1)
+            return False
+        offset = HEADER_SIZE + (head % self.slot_count) * self.slot_stride
+        COUNTER_STRUCT.pack_into(self.buffer, offset, length)
+        self.buffer[offset + SLOT_LENGTH_SIZE:offset + SLOT_LENGTH_SIZE + length] = frame
+        # The head is published after the frame is written
+        self._set(HEAD_OFFSET, head + 1)
+        if self._get(CONSUMER_WAITING_OFFSET):
+            self.wakeup.signal()
+        return True
+
+    def consume(self, callback: Callable[[memoryview], None]) -> int:
+        """
+        Passes the available frames to a callback, in order. (Consumer side)
+
+        The frames are views of the slots, only valid during the call. Each slot is given back to the producer
+        after the callback returns.
+
+        Parameters
+        ----------
+        callback : Callable[[memoryview], None]
+            Function called with every frame.
+
+        Returns
+        -------
+        int
+            Number of frames consumed.
+        """
+        tail = self._get(TAIL_OFFSET)
+        count = (self._get(HEAD_OFFSET) - tail) % COUNTER_MODULO
+        for _ in range(count):
+            offset = HEADER_SIZE + (tail % self.slot_count) * self.slot_stride
+            (length,) = COUNTER_STRUCT.unpack_from(self.buffer, offset)
+            frame = self.buffer[offset + SLOT_LENGTH_SIZE:offset + SLOT_LENGTH_SIZE + length]
+            try:
+                callback(frame)
+            finally:
+                frame.release()
+                tail += 1
+                self._set(TAIL_OFFSET, tail)
+        return count
+
+    def wait(self, timeout: float = None) -> None:
+        """
+        Waits until there are frames in the ring. (Consumer side)
+
+        Parameters
+        ----------
+        timeout : float
+            Maximum time to wait, in seconds. Defaults to the wait timeout of the ring.
+        """
+        self._set(CONSUMER_WAITING_OFFSET, 1)
+        try:
+            if not len(self):
+                self.wakeup.wait(self.wait_timeout if timeout is None else timeout)
+        finally:
+            self._set(CONSUMER_WAITING_OFFSET, 0)
+
+    def close(self) -> None:
+        """
+        Releases the ring: closes the wakeup and the shared memory and frees it.
+        """
+        self.wakeup.close()
+        self.buffer = None
+        self.shared_memory.close()
+        self.shared_memory.unlink()
@@ -0,0 +1,160 @@
+from __future__ import annotations
+import mmap
+import socket
+import struct
+
+# Linux AF_PACKET constants (linux/if_packet.h)
+SOL_PACKET = 263
+PACKET_RX_RING = 5
+PACKET_VERSION = 10
+TPACKET_V3 = 2
+TP_STATUS_KERNEL = 0
+TP_STATUS_USER = 1
+
+# struct tpacket_req3: block size, block number, frame size, frame number, retire block timeout, sizeof priv,
+# feature request word
+TPACKET_REQ3_STRUCT = struct.Struct("=7I")
+# block_status, num_pkts and offset_to_first_pkt of the struct tpacket_hdr_v1 of a block, at offset 8 of the
+# struct tpacket_block_desc
+BLOCK_STATUS_STRUCT = struct.Struct("=I")
+BLOCK_STATUS_OFFSET = 8
+BLOCK_PACKETS_STRUCT = struct.Struct("=II")
+BLOCK_PACKETS_OFFSET = 12
+# tp_next_offset, tp_snaplen and tp_mac of a struct tpacket3_hdr
+PACKET_HEADER_STRUCT = struct.Struct("=I8xI8xH")
+
+DEFAULT_BLOCK_SIZE = 1 << 16
+DEFAULT_BLOCK_COUNT = 32
+DEFAULT_FRAME_SIZE = 2048
+# Time after which the kernel hands a block that is not full to user space, in milliseconds
+DEFAULT_BLOCK_TIMEOUT = 1
+
+
+class TPacketV3Ring:
+    """
+    Memory-mapped AF_PACKET receive ring (PACKET_RX_RING) with the TPACKET_V3 layout.
+
+    The kernel writes the received frames into blocks of a ring shared with the process. A block is handed to
+    user space (TP_STATUS_USER) when it is full or when its timeout expires, and every frame of the block is
+    read in place, so there is no system call and no allocation per frame. The block is given back to the
+    kernel (TP_STATUS_KERNEL) once its frames have been processed.
+
+    Attributes
+    ----------
+    buffer : mmap.mmap | bytearray
+        Memory of the ring.
+    view : memoryview
+        View of the memory of the ring. Frames are returned as slices of it.
+    block_size : int
+        Size of each block in bytes.
+    block_count : int
+        Number of blocks of the ring.
+    block_index : int
+        Index of the next block to read.
+    """
+
+    def __init__(self, buffer: mmap.mmap | bytearray, block_size: int, block_count: int) -> None:
+        """
+        Parameters
+        ----------
+        buffer : mmap.mmap | bytearray
+            Memory of the ring, block_size * block_count bytes long.
+        block_size : int
+            Size of each block in bytes.
+        block_count : int
+            Number of blocks of the ring.
+        """
+        self.buffer = buffer
+        self.view = memoryview(buffer)
+        self.block_size = block_size
+        self.block_count = block_count
+        self.block_index = 0
+
+    @classmethod
+    def open(
+        cls,
+        sock: socket.socket,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        block_count: int = DEFAULT_BLOCK_COUNT,
+        frame_size: int = DEFAULT_FRAME_SIZE,
+        block_timeout: int = DEFAULT_BLOCK_TIMEOUT,
+    ) -> TPacketV3Ring:
+        """
+        Sets up the receive ring of an AF_PACKET socket and maps it.
+
+        Parameters
+        ----------
+        sock : socket.socket
+            AF_PACKET socket. The ring must be set up before binding it.
+        block_size : int
+            Size of each block in bytes. Multiple of the page size.
+        block_count : int
+            Number of blocks of the ring.
+        frame_size : int
+            Maximum size of a frame (with its tpacket3_hdr) in bytes.
+        block_timeout : int
+            Time after which a block that is not full is handed to user space, in milliseconds.
+
+        Returns
+        -------
+        TPacketV3Ring
+            The ring.
+
+        Raises
+        ------
+        OSError
+            If the kernel does not support TPACKET_V3 or the ring cannot be mapped.
+        """
+        sock.setsockopt(SOL_PACKET, PACKET_VERSION, TPACKET_V3)
+        frame_count = block_size // frame_size * block_count
+        sock.setsockopt(
+            SOL_PACKET,
+            PACKET_RX_RING,
+            TPACKET_REQ3_STRUCT.pack(block_size, block_count, frame_size, frame_count, block_timeout, 0, 0),
+        )
+        buffer = mmap.mmap(
+            sock.fileno(), block_size * block_count, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE
+        )
+        return cls(buffer, block_size, block_count)
+
+    def read_block(self) -> list[memoryview]:
+        """
+        Reads the frames of the next block, if it has been handed to user space.
+
+        The frames are views of the ring. They are only valid until release_block is called.
+
+        Returns
+        -------
+        List[memoryview]
+            Frames of the block, starting with the MAC header. None if the block still belongs to the kernel.
+        """
+        offset = self.block_index * self.block_size
+        (block_status,) = BLOCK_STATUS_STRUCT.unpack_from(self.buffer, offset + BLOCK_STATUS_OFFSET)
+        if not block_status & TP_STATUS_USER:
+            return None
+        packet_count, packet_offset = BLOCK_PACKETS_STRUCT.unpack_from(self.buffer, offset + BLOCK_PACKETS_OFFSET)
+        packet_offset += offset
+        frames = []
+        for _ in range(packet_count):
+            next_offset, snap_length, mac_offset = PACKET_HEADER_STRUCT.unpack_from(self.buffer, packet_offset)
+            start = packet_offset + mac_offset
+            frames.append(self.view[start:start + snap_length])
+            packet_offset += next_offset
+        return frames
+
+    def release_block(self) -> None:
+        """
+        Gives the current block back to the kernel and moves to the next one.
+        """
+        BLOCK_STATUS_STRUCT.pack_into(
+            self.buffer, self.block_index * self.block_size + BLOCK_STATUS_OFFSET, TP_STATUS_KERNEL
+        )
+        self.block_index = (self.block_index + 1) % self.block_count
+
+    def close(self) -> None:
+        """
+        Unmaps the ring.
+        """
+        self.view.release()
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
@@ -0,0 +1,135 @@
+from __future__ import annotations
+from collections import deque
+from collections.abc import Callable
+import threading
+
+# Access categories, in priority order. As in ETSI EN 302 663 V1.3.1 (2020-01). Table B.3
+AC_VO = 0
+AC_VI = 1
+AC_BE = 2
+AC_BK = 3
+ACCESS_CATEGORIES = (AC_VO, AC_VI, AC_BE, AC_BK)
+
+# Offset of the TC field in a GN-PDU (third byte of the Common Header)
+TC_OFFSET = 6
+# Value of the NH field of the Basic Header (4 least significant bits of its first byte) for a Common Header
+BASIC_NH_COMMON_HEADER = 1
+
+DEFAULT_MAX_QUEUE_LENGTH = 256
+DEFAULT_MAX_BATCH = 32
+
+
+def access_category(packet: bytes) -> int:
+    """
+    Returns the access category of a GN-PDU, from the TC ID of the traffic class of its Common Header.
+    The TC IDs 0 to 3 map to AC_VO, AC_VI, AC_BE and AC_BK. ETSI EN 302 663 V1.3.1 (2020-01). Annex B.
+
+    Parameters
+    ----------
+    packet : bytes
+        GN-PDU, starting with the Basic Header.
+
+    Returns
+    -------
+    int
+        Access category. AC_BE if the packet has no Common Header in clear.
+    """
+    if len(packet) <= TC_OFFSET or packet[0] & 0x0F != BASIC_NH_COMMON_HEADER:
+        return AC_BE
+    return min(packet[TC_OFFSET] & 0x3F, AC_BK)
+
+
+class TransmitQueue:
+    """
+    Transmit queue drained by a dedicated sender thread.
+
+    Packets are queued per access category and served in strict priority order, similar to the EDCA access
+    categories of the access layer. Every time the sender thread wakes up it takes all the queued packets
+    (up to max_batch), highest priority first, and passes them in a single call to the send callback, so
+    bursts are sent in batches. Threads that queue packets never block on the socket.
+
+    Attributes
+    ----------
+    send_callback : Callable[[List[bytes]], None]
+        Function called by the sender thread with the batches of packets to send.
+    max_queue_length : int
+        Maximum number of packets of each queue. Packets that do not fit are dropped.
+    max_batch : int
+        Maximum number of packets of a batch.
+    queues : Tuple[Deque[bytes], ...]
+        Queue of each access category.
+    dropped_packets : int
+        Packets dropped because their queue was full.
+    """
+
+    def __init__(
+        self,
+        send_callback: Callable[[list[bytes]], None],
+        max_queue_length: int = DEFAULT_MAX_QUEUE_LENGTH,
+        max_batch: int = DEFAULT_MAX_BATCH,
+    ) -> None:
+        self.send_callback = send_callback
+        self.max_queue_length = max_queue_length
+        self.max_batch = max_batch
+        self.queues: tuple[deque[bytes], ...] = tuple(deque() for _ in ACCESS_CATEGORIES)
+        self.length = 0
+        self.dropped_packets = 0
+        self.condition = threading.Condition()
+        self.sender_thread = threading.Thread(target=self._run, daemon=True)
+        self.sender_thread.start()
+
+    def __len__(self) -> int:
+        return self.length
+
+    def put(self, packet: bytes, category: int = AC_BE) -> bool:
+        """
+        Queues a packet.
+
+        Parameters
+        ----------
+        packet : bytes
+            Packet to send.
+        category : int
+            Access category of the packet.
+
+        Returns
+        -------
+        bool
+            False if the packet has been dropped because its queue is full.
+        """
+        with self.condition:
+            queue = self.queues[category]
+            if len(queue) >= self.max_queue_length:
+                self.dropped_packets += 1
+                return False
+            queue.append(packet)
+            self.length += 1
+            self.condition.notify()
+        return True
+
+    def take_batch(self) -> list[bytes]:
+        """
+        Takes the next batch of packets, highest priority first. Must be called with the condition held.
+
+        Returns
+        -------
+        List[bytes]
+            Packets of the batch.
+        """
+        batch: list[bytes] = []
+        for queue in self.queues:
+            while queue and len(batch) < self.max_batch:
+                batch.append(queue.popleft())
+        self.length -= len(batch)
+        return batch
+
+    def _run(self) -> None:
+        """
+        Sender thread loop.
+        """
+        while True:
+            with self.condition:
+                while not self.length:
+                    self.condition.wait()
+                batch = self.take_batch()
+            self.send_callback(batch)
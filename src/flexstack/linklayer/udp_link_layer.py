@@ -0,0 +1,252 @@
+from __future__ import annotations
+from collections.abc import Callable
+import socket
+import threading
+
+from .exceptions import InvalidMACAddressException, PacketTooLongException
+from .link_layer import LinkLayer
+from .mmsg import HAS_RECVMMSG, MMsgReceiver
+
+DEFAULT_GROUP = "239.255.89.71"
+DEFAULT_PORT = 8947
+# Maximum length of a GN packet, as in the Ethernet based link layers
+MAX_PACKET_LENGTH = 1500 - 14
+BROADCAST_MAC_ADDRESS = b"\xff\xff\xff\xff\xff\xff"
+# Each datagram starts with the MAC address of its destination and the one of its sender, as an Ethernet frame
+ADDRESS_LENGTH = 6
+HEADER_LENGTH = 2 * ADDRESS_LENGTH
+# Shorter datagrams cannot carry a GN Basic Header
+MIN_DATAGRAM_LENGTH = HEADER_LENGTH + 4
+MAX_BATCH = 64
+
+
+class UDPLinkLayer(LinkLayer):
+    """
+    Link Layer that carries GN packets over UDP multicast (or broadcast).
+
+    Needs no privileges nor a shared layer 2 segment, so it can connect stations running in unprivileged
+    containers or on different hosts, e.g. for testbeds and performance runs. Every datagram carries the MAC
+    address of its destination (broadcast or the next hop) and the one of its sender, followed by the GN packet.
+    All the datagrams are sent to the group, and each station discards the ones addressed to another station.
+    Multicast loopback is enabled so several stations can run on the same host, and each station discards its
+    own datagrams.
+
+    Attributes
+    ----------
+    receive_callback : Callable[[bytes, bytes], None]
+        Callback function to receive packets, called with the packet and the MAC address of its sender.
+    mac_address : bytes
+        MAC address of the station, used to identify its own datagrams and the ones addressed to it.
+    destination : Tuple[str, int]
+        Multicast group (or broadcast address) and port the datagrams are sent to.
+    sock : socket.socket
+        UDP socket.
+    receiver : MMsgReceiver
+        Batched receiver (recvmmsg), None if datagrams are received one by one.
+    receive_batch_callback : Callable[[List[memoryview], List[bytes]], None]
+        Callback function to receive the packets of a batch at once, with the MAC address of the sender of each
+        of them (e.g. Router.gn_data_indicate_batch).
+    """
+
+    def __init__(
+        self,
+        mac_address: bytes,
+        receive_callback: Callable[[bytes, bytes], None],
+        group: str = DEFAULT_GROUP,
+        port: int = DEFAULT_PORT,
+        interface_address: str = "0.0.0.0",
+        broadcast: bool = False,
+        batch_receive: bool = False,
+        receive_batch_callback: Callable[[list[memoryview], list[bytes]], None] = None,
+    ) -> None:
+        """
+        Create a Link Layer object.
+
+        Parameters
+        ----------
+        mac_address : bytes
+            MAC address of the station.
+        receive_callback : Callable[[bytes, bytes], None]
+            Callback function to receive packets, called with the packet and the MAC address of its sender.
+        group : str
+            Multicast group, or broadcast address if broadcast is set.
+        port : int
+            UDP port.
+        interface_address : str
+            IPv4 address of the interface to use for multicast. Defaults to the one chosen by the system.
+        broadcast : bool
+            Send the datagrams to the broadcast address given as group instead of to a multicast group.
+        batch_receive : bool
+            Receive several datagrams per system call with recvmmsg, where available. The packets are then
+            passed to the callbacks as memoryviews only valid during the call.
+        receive_batch_callback : Callable[[List[memoryview], List[bytes]], None]
+            Callback function to receive the packets of a batch at once, with the MAC addresses of their
+            senders. Only used with batch_receive.
+
+        Raises
+        ------
+        InvalidMACAddressException
+            If the MAC address is not 6 bytes long.
+        OSError
+            If the socket cannot be set up.
+        """
+        super().__init__(receive_callback)
+        if len(mac_address) != 6:
+            raise InvalidMACAddressException("MAC address must be 6 bytes long")
+        self.mac_address = mac_address
+        self.destination = (group, port)
+        self.receive_batch_callback = receive_batch_callback
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        # Several stations may run on the same host
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, "SO_REUSEPORT"):
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        if broadcast:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            self.sock.bind(("", port))
+        else:
+            self.sock.bind((group, port))
+            membership = socket.inet_aton(group) + socket.inet_aton(interface_address)
+            self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+            self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(interface_address))
+            self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 1)
+            self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+        self.receiver: MMsgReceiver = None
+        if batch_receive and HAS_RECVMMSG:
+            self.receiver = MMsgReceiver(MAX_BATCH, HEADER_LENGTH + MAX_PACKET_LENGTH)
+        self.receiving_thread = threading.Thread(
+            target=self.receive_batch if self.receiver else self.receive, daemon=True
+        )
+        self.receiving_thread.start()
+
+    def __del__(self) -> None:
+        """
+        Close the socket.
+        """
+        # The socket does not exist if the constructor failed before creating it
+        sock = getattr(self, "sock", None)
+        if sock is not None:
+            sock.close()
+
+    def send(self, packet: bytes, destination: bytes = None) -> None:
+        """
+        Send a packet to the multicast group.
+
+        Parameters
+        ----------
+        packet : bytes
+            Packet to send.
+        destination : bytes
+            MAC address of the next hop, or None to broadcast the packet.
+        """
+        if len(packet) > MAX_PACKET_LENGTH:
+            self.statistics.count("drop_packet_too_long")
+            raise PacketTooLongException("Packet too long")
+        datagram = (destination or BROADCAST_MAC_ADDRESS) + self.mac_address + packet
+        self.sock.sendto(datagram, self.destination)
+        self.statistics.count("tx_packets")
+        self.statistics.count("tx_bytes", len(datagram))
+
+    def receive(self) -> None:
+        """
+        Receive the datagrams one by one. (To be called in a thread)
+        """
+        while True:
+            try:
+                datagram = self.sock.recv(HEADER_LENGTH + MAX_PACKET_LENGTH)
+            except OSError:
+                self.statistics.count("rx_errors")
+                self.logging.error("os_error", "OS Error receiving packet on %s", self.destination)
+                break
+            self.statistics.count("rx_packets")
+            self.statistics.count("rx_bytes", len(datagram))
+            if len(datagram) < MIN_DATAGRAM_LENGTH:
+                self.statistics.count("drop_packet_too_short")
+                continue
+            if not self.is_addressed_to_us(datagram):
+                self.statistics.count("rx_filtered")
+                continue
+            self.handle_packet(datagram[HEADER_LENGTH:], datagram[ADDRESS_LENGTH:HEADER_LENGTH])
+
+    def receive_batch(self) -> None:
+        """
+        Receive the datagrams in batches with recvmmsg. (To be called in a thread)
+        """
+        while True:
+            try:
+                datagrams = self.receiver.receive(self.sock.fileno())
+            except OSError:
+                self.statistics.count("rx_errors")
+                self.logging.error("os_error", "OS Error receiving packet on %s", self.destination)
+                break
+            self.statistics.count("rx_packets", len(datagrams))
+            self.statistics.count("rx_bytes", sum(len(datagram) for datagram in datagrams))
+            self.handle_batch(datagrams)
+
+    def handle_batch(self, datagrams: list[memoryview]) -> None:
+        """
+        Passes the packets of a batch of received datagrams to the receive callbacks, discarding the own, the too
+        short and the ones addressed to another station.
+
+        Parameters
+        ----------
+        datagrams : List[memoryview]
+            Datagrams received.
+        """
+        long_enough = [datagram for datagram in datagrams if len(datagram) >= MIN_DATAGRAM_LENGTH]
+        if len(long_enough) < len(datagrams):
+            self.statistics.count("drop_packet_too_short", len(datagrams) - len(long_enough))
+        packets = []
+        sender_addresses = []
+        for datagram in long_enough:
+            if self.is_addressed_to_us(datagram):
+                packets.append(datagram[HEADER_LENGTH:])
+                sender_addresses.append(bytes(datagram[ADDRESS_LENGTH:HEADER_LENGTH]))
+        if len(packets) < len(long_enough):
+            self.statistics.count("rx_filtered", len(long_enough) - len(packets))
+        if packets and self.receive_batch_callback:
+            try:
+                self.receive_batch_callback(packets, sender_addresses)
+            except Exception as e:  # pylint: disable=broad-except
+                # Datagrams come from any host of the network, a malformed one must not stop the receive thread
+                self.statistics.count("rx_errors")
+                self.logging.warning("receive_error", "Error handling batch: %s", e)
+            return
+        for packet, sender_address in zip(packets, sender_addresses):
+            self.handle_packet(packet, sender_address)
+
+    def is_addressed_to_us(self, datagram: bytes) -> bool:
+        """
+        Checks whether a datagram is addressed to this station: unicast to its MAC address, or broadcast and not
+        sent by itself.
+
+        Parameters
+        ----------
+        datagram : bytes | memoryview
+            Datagram, starting with the destination and sender MAC addresses.
+        """
+        destination = datagram[0:ADDRESS_LENGTH]
+        if destination == self.mac_address:
+            return True
+        return destination == BROADCAST_MAC_ADDRESS and datagram[ADDRESS_LENGTH:HEADER_LENGTH] != self.mac_address
+
+    def handle_packet(self, packet: bytes, sender_address: bytes = None) -> None:
+        """
+        Passes a received packet to the receive callback.
+
+        Parameters
+        ----------
+        packet : bytes | memoryview
+            GN packet.
+        sender_address : bytes
+            MAC address of the sender.
+        """
+        try:
+            self.receive_callback(packet, sender_address)
+        except NotImplementedError as e:
+            self.statistics.count("drop_not_implemented")
+            self.logging.warning("not_implemented", "Error decoding packet: %s", e)
+        except Exception as e:  # pylint: disable=broad-except
+            # Any other error (e.g. a DecodeError of a malformed packet) only drops the packet
+            self.statistics.count("rx_errors")
+            self.logging.warning("receive_error", "Error handling packet: %s", e)
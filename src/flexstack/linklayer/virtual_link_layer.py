@@ -0,0 +1,318 @@
+from __future__ import annotations
+from collections.abc import Callable
+import heapq
+import math
+import random
+import threading
+import time
+
+from ..geonet.geometry import NORTH_SCALE
+from ..metrics.stack_statistics import StackStatistics
+from .exceptions import PacketTooLongException
+from .link_layer import LinkLayer
+
+MAX_FRAME_LENGTH = 1500
+
+
+class VirtualChannel:
+    """
+    In-process virtual radio medium shared by several VirtualLinkLayer, e.g. to simulate many stations (each
+    with its own GN router) in one process without any network setup.
+
+    A frame sent by a station is delivered to every other station of the channel (or only to its destination,
+    if it is sent to a MAC address) unless it is out of range, according to the positions given by the
+    stations, or it is lost. The channel is a single collision domain:
+    with a bandwidth set, frames are serialized on the medium and each one occupies it for its airtime. The
+    frames are delivered by a single thread of the channel, at the end of their transmission plus the latency.
+
+    Attributes
+    ----------
+    range : float
+        Communication range in meters. None for an unlimited range.
+    loss : float
+        Probability of losing a frame on each link, between 0 and 1.
+    latency : float
+        Propagation and processing latency in seconds.
+    bandwidth : float
+        Bandwidth of the medium in bits per second. None for an infinite bandwidth.
+    stations : List[VirtualLinkLayer]
+        Stations attached to the channel.
+    statistics : StackStatistics
+        Counters of the frames transmitted, delivered, lost and out of range.
+    """
+
+    def __init__(
+        self,
+        range: float = None,  # pylint: disable=redefined-builtin
+        loss: float = 0.0,
+        latency: float = 0.0,
+        bandwidth: float = None,
+        seed: int = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        range : float
+            Communication range in meters. None for an unlimited range.
+        loss : float
+            Probability of losing a frame on each link, between 0 and 1.
+        latency : float
+            Propagation and processing latency in seconds.
+        bandwidth : float
+            Bandwidth of the medium in bits per second. None for an infinite bandwidth.
+        seed : int
+            Seed of the random losses, for reproducible simulations.
+        """
+        self.range = range
+        self.loss = loss
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.random = random.Random(seed)
+        self.stations: list[VirtualLinkLayer] = []
+        self.attached_stations: set[VirtualLinkLayer] = set()
+        self.statistics = StackStatistics("virtual_channel")
+        self.busy_until = 0.0
+        self.deliveries: list[tuple[float, int, VirtualLinkLayer, bytes, bytes]] = []
+        self._counter = 0
+        self.delivering = 0
+        self.condition = threading.Condition()
+        self.delivery_thread: threading.Thread = None
+
+    def attach(self, station: VirtualLinkLayer) -> None:
+        """
+        Attaches a station to the channel.
+
+        Parameters
+        ----------
+        station : VirtualLinkLayer
+            Station to attach.
+        """
+        with self.condition:
+            self.stations.append(station)
+            self.attached_stations.add(station)
+
+    def detach(self, station: VirtualLinkLayer) -> None:
+        """
+        Detaches a station from the channel. The frames pending delivery to it are discarded.
+
+        Parameters
+        ----------
+        station : VirtualLinkLayer
+            Station to detach.
+        """
+        with self.condition:
+            self.stations.remove(station)
+            self.attached_stations.discard(station)
+
+    def in_range(self, sender_position: tuple[int, int], receiver: VirtualLinkLayer) -> bool:
+        """
+        Checks whether a receiver is in the communication range of a sender. Stations without a position are
+        always in range.
+
+        Parameters
+        ----------
+        sender_position : Tuple[int, int]
+            Latitude and longitude of the sender in 1/10 micro degree, or None if it has no position.
+        receiver : VirtualLinkLayer
+            Receiving station.
+        """
+        if self.range is None or sender_position is None:
+            return True
+        receiver_position = receiver.get_position()
+        if receiver_position is None:
+            return True
+        east_scale = NORTH_SCALE * math.cos(math.radians(sender_position[0] / 10000000))
+        distance = math.hypot(
+            NORTH_SCALE * (receiver_position[0] - sender_position[0]),
+            east_scale * (receiver_position[1] - sender_position[1]),
+        )
+        return distance <= self.range
+
+    def transmit(self, sender: VirtualLinkLayer, frame: bytes, destination: bytes = None) -> None:
+        """
+        Transmits a frame on the channel and schedules its delivery to the stations that receive it.
+
+        Parameters
+        ----------
+        sender : VirtualLinkLayer
+            Sending station.
+        frame : bytes
+            Frame to transmit.
+        destination : bytes
+            MAC address of the station the frame is addressed to, or None to broadcast it.
+        """
+        now = time.monotonic()
+        sender_position = sender.get_position() if self.range is not None else None
+        with self.condition:
+            end_of_transmission = now
+            if self.bandwidth:
+                end_of_transmission = max(now, self.busy_until) + len(frame) * 8 / self.bandwidth
+                self.busy_until = end_of_transmission
+            self.statistics.count("transmitted_frames")
+            delivery_time = end_of_transmission + self.latency
+            for station in self.stations:
+                if station is sender or (destination is not None and station.mac_address != destination):
+                    continue
+                if not self.in_range(sender_position, station):
+                    self.statistics.count("out_of_range_frames")
+                    continue
+                if self.loss and self.random.random() < self.loss:
+                    self.statistics.count("lost_frames")
+                    continue
+                self._counter += 1
+                heapq.heappush(self.deliveries, (delivery_time, self._counter, station, frame, sender.mac_address))
+            if self.deliveries:
+                if self.delivery_thread is None:
+                    self.delivery_thread = threading.Thread(target=self._run, daemon=True)
+                    self.delivery_thread.start()
+                self.condition.notify_all()
+
+    def wait_idle(self, timeout: float = None) -> bool:
+        """
+        Waits until all the transmitted frames have been delivered.
+
+        Parameters
+        ----------
+        timeout : float
+            Maximum time to wait, in seconds.
+
+        Returns
+        -------
+        bool
+            False if the timeout expired.
+        """
+        with self.condition:
+            return self.condition.wait_for(lambda: not self.deliveries and not self.delivering, timeout)
+
+    def _run(self) -> None:
+        """
+        Delivery thread loop.
+        """
+        while True:
+            with self.condition:
+                while not self.deliveries:
+                    self.condition.wait()
+                wait_time = self.deliveries[0][0] - time.monotonic()
+                if wait_time > 0:
+                    self.condition.wait(wait_time)
+                    continue
+                _, _, station, frame, sender_address = heapq.heappop(self.deliveries)
+                attached = station in self.attached_stations
+                self.delivering += 1
+            try:
+                if attached:
+                    self.statistics.count("delivered_frames")
+                    station.deliver(frame, sender_address)
+            finally:
+                with self.condition:
+                    self.delivering -= 1
+                    self.condition.notify_all()
+
+
+class VirtualLinkLayer(LinkLayer):
+    """
+    Link Layer attached to a VirtualChannel.
+
+    Attributes
+    ----------
+    receive_callback : Callable[[bytes, bytes], None]
+        Callback function to receive packets, called with the packet and the MAC address of its sender.
+    channel : VirtualChannel
+        Channel the station is attached to.
+    position_callback : Callable[[], object]
+        Function returning the current position of the station, as an object with latitude and longitude
+        attributes in 1/10 micro degree (e.g. the ego position vector of the GN router). None if the station
+        has no position.
+    mac_address : bytes
+        MAC address of the station, passed to the receivers of its frames. None if the station has none.
+    """
+
+    def __init__(
+        self,
+        channel: VirtualChannel,
+        receive_callback: Callable[[bytes, bytes], None],
+        position_callback: Callable[[], object] = None,
+        mac_address: bytes = None,
+    ) -> None:
+        """
+        Create a Link Layer object and attach it to a channel.
+
+        Parameters
+        ----------
+        channel : VirtualChannel
+            Channel to attach to.
+        receive_callback : Callable[[bytes, bytes], None]
+            Callback function to receive packets, called with the packet and the MAC address of its sender.
+            Called from the delivery thread of the channel.
+        position_callback : Callable[[], object]
+            Function returning the current position of the station, e.g. lambda: router.ego_position_vector.
+        mac_address : bytes
+            MAC address of the station, e.g. the MID of its GN address.
+        """
+        super().__init__(receive_callback)
+        self.channel = channel
+        self.position_callback = position_callback
+        self.mac_address = mac_address
+        channel.attach(self)
+
+    def get_position(self) -> tuple[int, int]:
+        """
+        Returns the current position of the station.
+
+        Returns
+        -------
+        Tuple[int, int]
+            Latitude and longitude in 1/10 micro degree, or None if the station has no position.
+        """
+        if self.position_callback is None:
+            return None
+        position = self.position_callback()
+        if position is None:
+            return None
+        return position.latitude, position.longitude
+
+    def send(self, packet: bytes, destination: bytes = None) -> None:
+        """
+        Send a packet to the channel.
+
+        Parameters
+        ----------
+        packet : bytes
+            Packet to send.
+        destination : bytes
+            MAC address of the next hop, or None to broadcast the packet.
+        """
+        if len(packet) > MAX_FRAME_LENGTH:
+            self.statistics.count("drop_packet_too_long")
+            raise PacketTooLongException("Packet too long")
+        self.statistics.count("tx_packets")
+        self.statistics.count("tx_bytes", len(packet))
+        self.channel.transmit(self, bytes(packet), destination)
+
+    def deliver(self, packet: bytes, sender_address: bytes = None) -> None:
+        """
+        Passes a packet received from the channel to the receive callback. (Called by the channel)
+
+        Parameters
+        ----------
+        packet : bytes
+            Packet received.
+        sender_address : bytes
+            MAC address of the sending station.
+        """
+        self.statistics.count("rx_packets")
+        self.statistics.count("rx_bytes", len(packet))
+        if not self.receive_callback:
+            return
+        try:
+            self.receive_callback(packet, sender_address)
+        except Exception as e:  # pylint: disable=broad-except
+            # An error of a station must not stop the deliveries to the others
+            self.statistics.count("rx_errors")
+            self.logging.warning("receive_error", "Error handling packet: %s", e)
+
+    def close(self) -> None:
+        """
+        Detaches the station from the channel.
+        """
+        self.channel.detach(self)
@@ -13,6 +13,7 @@ from ..facilities.local_dynamic_map.ldm_constants import SPATEM, CAM, VAM, DENM
 from ..utils.static_location_service import ThreadStaticLocationService as Location
 
 from .prometheus_adaptation import PrometheusClientPull
+from .stack_statistics import StackStatistics
 
 
 class MetricsExposer:
@@ -72,6 +73,22 @@ class MetricsExposer:
         if send_bytes > 0:
             self.prometheus.send_v2x_downlink_bandwidth(send_bytes)
 
+    def expose_stack_statistics(self, statistics: StackStatistics) -> None:
+        """
+        Exposes the counters and latency histograms of a layer of the stack (GN router, BTP router or link
+        layer) to Prometheus.
+
+        Parameters
+        ----------
+        statistics : StackStatistics
+            Statistics of the layer.
+
+        Returns
+        -------
+        None
+        """
+        self.prometheus.register_stack_statistics(statistics)
+
     def ldm_callback(self, ldm_size: int, oldest_message: int = 0) -> None:
         """
         Callback function for the LDM. This function will be called when the LDM recieves or sends a message.
@@ -1,10 +1,40 @@
 import os
 
 from prometheus_client import Histogram, Gauge, CollectorRegistry, start_http_server
+from prometheus_client.core import CounterMetricFamily, HistogramMetricFamily
+from prometheus_client.registry import Collector
+
+from .stack_statistics import StackStatistics
 
 PROMETHEUS_PORT = int(os.getenv("PROMETHEUS_CLIENT_PORT", 8000))
 
 
+class StackStatisticsCollector(Collector):
+    """
+    Prometheus collector that reads a StackStatistics when it is scraped.
+
+    Every counter is exported as "<layer>_<counter>_total" and every latency histogram as
+    "<layer>_<stage>_latency_seconds", so the packet processing paths do not call Prometheus.
+    """
+
+    def __init__(self, statistics: StackStatistics) -> None:
+        self.statistics = statistics
+
+    def collect(self):
+        name = self.statistics.name
+        statistics = self.statistics.to_dict()
+        for counter, value in statistics["counters"].items():
+            yield CounterMetricFamily(f"{name}_{counter}", f"{name} {counter.replace('_', ' ')}", value=value)
+        for stage, histogram in statistics["latencies"].items():
+            yield HistogramMetricFamily(
+                f"{name}_{stage}_latency_seconds",
+                f"Latency of the {stage.replace('_', ' ')} stage of {name} in seconds",
+                buckets=[(str(bound) if bound != float("inf") else "+Inf", count)
+                         for bound, count in histogram["buckets"]],
+                sum_value=histogram["sum"],
+            )
+
+
 class PrometheusClientPull:
     def __init__(self) -> None:
         self.registry = CollectorRegistry()
@@ -32,6 +62,22 @@ class PrometheusClientPull:
 
         start_http_server(PROMETHEUS_PORT, registry=self.registry)
 
+    def register_stack_statistics(self, statistics: StackStatistics) -> None:
+        """
+        Function to expose the statistics of a layer of the stack (e.g. Router.statistics of the GN router).
+        The statistics are read when Prometheus scrapes them.
+
+        Parameters
+        ----------
+        statistics: StackStatistics
+            Statistics to expose.
+
+        Returns
+        -------
+        None
+        """
+        self.registry.register(StackStatisticsCollector(statistics))
+
     def send_number_of_messages_sent(self) -> None:
         """
         Function to send the number of messages sent to the Prometheus Gateway.
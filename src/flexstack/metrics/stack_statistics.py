@@ -0,0 +1,148 @@
+from __future__ import annotations
+from bisect import bisect_left
+from collections import defaultdict
+
+# Upper bounds (in seconds) of the buckets of the latency histograms
+DEFAULT_LATENCY_BUCKETS = (
+    0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1,
+)
+
+
+class LatencyHistogram:
+    """
+    Histogram of the latencies of a processing stage.
+
+    Attributes
+    ----------
+    buckets : Tuple[float, ...]
+        Upper bounds of the buckets in seconds. Latencies above the last bound go to an overflow bucket.
+    counts : List[int]
+        Number of observations of each bucket (not cumulative). Has one more item than buckets.
+    count : int
+        Total number of observations.
+    sum : float
+        Sum of the observations in seconds.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        Adds an observation.
+
+        Parameters
+        ----------
+        value : float
+            Latency in seconds.
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative_counts(self) -> list[tuple[float, int]]:
+        """
+        Returns the cumulative counts of the buckets, the last one with an infinite upper bound.
+
+        Returns
+        -------
+        List[Tuple[float, int]]
+            List of (upper bound, observations lower or equal to the bound).
+        """
+        cumulative = []
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            cumulative.append((bound, total))
+        return cumulative
+
+
+class StackStatistics:
+    """
+    Statistics of a layer of the stack: counters (e.g. received packets or drops per reason) and latency
+    histograms per processing stage.
+
+    Updating the statistics only increments integers, so it can be done for every packet. Latencies are
+    measured by the layers with time.perf_counter(). The values are read when they are exported (e.g. when
+    Prometheus scrapes them), not pushed.
+
+    Attributes
+    ----------
+    name : str
+        Name of the layer (e.g. "geonet"), used as prefix of the exported metrics.
+    counters : Dict[str, int]
+        Counters by name.
+    latencies : Dict[str, LatencyHistogram]
+        Latency histograms by stage.
+    """
+
+    def __init__(self, name: str, latency_buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS) -> None:
+        self.name = name
+        self.latency_buckets = latency_buckets
+        self.counters: dict[str, int] = defaultdict(int)
+        self.latencies: dict[str, LatencyHistogram] = {}
+
+    def count(self, counter: str, value: int = 1) -> None:
+        """
+        Increments a counter.
+
+        Parameters
+        ----------
+        counter : str
+            Name of the counter.
+        value : int
+            Increment.
+        """
+        self.counters[counter] += value
+
+    def observe(self, stage: str, latency: float) -> None:
+        """
+        Adds an observation to the latency histogram of a stage.
+
+        Parameters
+        ----------
+        stage : str
+            Name of the stage.
+        latency : float
+            Latency in seconds.
+        """
+        histogram = self.latencies.get(stage)
+        if histogram is None:
+            histogram = self.latencies.setdefault(stage, LatencyHistogram(self.latency_buckets))
+        histogram.observe(latency)
+
+    def get_counter(self, counter: str) -> int:
+        """
+        Returns the value of a counter, 0 if it has never been incremented.
+
+        Parameters
+        ----------
+        counter : str
+            Name of the counter.
+        """
+        return self.counters.get(counter, 0)
+
+    def to_dict(self) -> dict:
+        """
+        Returns a dictionary representation of the statistics.
+
+        Returns
+        -------
+        dict
+            Dictionary with the counters and, for every stage, the count, sum and cumulative buckets of its
+            latency histogram.
+        """
+        return {
+            "counters": dict(self.counters),
+            "latencies": {
+                stage: {
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "buckets": histogram.cumulative_counts(),
+                }
+                for stage, histogram in list(self.latencies.items())
+            },
+        }
@@ -1,5 +1,4 @@
-import asn1tools
-from .security_asn1 import SECURITY_ASN1_DESCRIPTIONS
+from ..utils.asn1_coder_cache import get_coder
 
 
 class SecurityCoder:
@@ -17,9 +16,9 @@ class SecurityCoder:
         """
         Initialize the Security Coder.
         """
-        self.asn_coder = asn1tools.compile_string(
-            SECURITY_ASN1_DESCRIPTIONS, codec="oer"
-        )
+        # Lazy import, the security modules are large
+        from .security_asn1 import SECURITY_ASN1_DESCRIPTIONS  # pylint: disable=import-outside-toplevel
+        self.asn_coder = get_coder(SECURITY_ASN1_DESCRIPTIONS, "oer")
 
     def encode_etsi_ts_103097_certificate(self, certificate: dict) -> bytes:
         """
@@ -0,0 +1,189 @@
+"""
+Startup time profile of the FlexStack subsystems.
+
+Measures, for every subsystem, the time to import its modules and the time to initialise it (e.g. to build its
+ASN.1 coders), each one in a new interpreter so the subsystems do not share the modules they import.
+
+Usage:
+    python -m flexstack.startup_profile [--subsystem NAME ...] [--cold-cache] [--budget MS] [--json]
+"""
+from __future__ import annotations
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def _init_geonet() -> None:
+    from .geonet.mib import MIB  # pylint: disable=import-outside-toplevel
+    from .geonet.router import Router  # pylint: disable=import-outside-toplevel
+
+    Router(MIB())
+
+
+def _init_btp() -> None:
+    from .btp.router import Router  # pylint: disable=import-outside-toplevel
+
+    Router(None)
+
+
+def _init_cam() -> None:
+    from .facilities.ca_basic_service.cam_coder import CAMCoder  # pylint: disable=import-outside-toplevel
+
+    CAMCoder()
+
+
+def _init_vam() -> None:
+    from .facilities.vru_awareness_service.vam_coder import VAMCoder  # pylint: disable=import-outside-toplevel
+
+    VAMCoder()
+
+
+def _init_denm() -> None:
+    # pylint: disable=import-outside-toplevel
+    from .facilities.decentralized_environmental_notification_service.denm_coder import DENMCoder
+
+    DENMCoder()
+
+
+def _init_security() -> None:
+    from .security.security_coder import SecurityCoder  # pylint: disable=import-outside-toplevel
+
+    SecurityCoder()
+
+
+# Name of each subsystem: module imported and function initialising it (None if it is only imported)
+SUBSYSTEMS = {
+    "linklayer": ("flexstack.linklayer.raw_link_layer", None),
+    "geonet": ("flexstack.geonet.router", _init_geonet),
+    "btp": ("flexstack.btp.router", _init_btp),
+    "ldm": ("flexstack.facilities.local_dynamic_map.factory", None),
+    "cam": ("flexstack.facilities.ca_basic_service.ca_basic_service", _init_cam),
+    "vam": ("flexstack.facilities.vru_awareness_service.vru_awareness_service", _init_vam),
+    "denm": ("flexstack.facilities.decentralized_environmental_notification_service.den_service", _init_denm),
+    "security": ("flexstack.security.sign_service", _init_security),
+}
+
+
+def measure(name: str) -> dict:
+    """
+    Imports and initialises a subsystem in the current interpreter, which must not have imported it yet.
+
+    Parameters
+    ----------
+    name : str
+        Name of the subsystem.
+
+    Returns
+    -------
+    dict
+        Import and initialisation times in seconds, and number of modules loaded.
+    """
+    module, initialise = SUBSYSTEMS[name]
+    modules = len(sys.modules)
+    start = time.perf_counter()
+    importlib.import_module(module)
+    imported = time.perf_counter()
+    if initialise is not None:
+        initialise()
+    initialised = time.perf_counter()
+    return {
+        "subsystem": name,
+        "import": imported - start,
+        "initialisation": initialised - imported,
+        "modules": len(sys.modules) - modules,
+    }
+
+
+def profile(name: str, cache_directory: str = None) -> dict:
+    """
+    Measures a subsystem in a new interpreter.
+
+    Parameters
+    ----------
+    name : str
+        Name of the subsystem.
+    cache_directory : str
+        Directory of the on-disk ASN.1 coder cache to use, None to use the default one.
+
+    Returns
+    -------
+    dict
+        Measures (see measure).
+    """
+    environment = dict(os.environ)
+    # The new interpreter imports the same flexstack package, even if it is not installed
+    package_parent = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    environment["PYTHONPATH"] = os.pathsep.join(filter(None, [package_parent, environment.get("PYTHONPATH")]))
+    if cache_directory is not None:
+        environment["FLEXSTACK_ASN1_CACHE"] = cache_directory
+    output = subprocess.run(
+        [sys.executable, "-m", "flexstack.startup_profile", "--measure", name],
+        check=True,
+        capture_output=True,
+        env=environment,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def main(arguments: list[str] = None) -> int:
+    """
+    Profiles the subsystems and prints the results.
+
+    Parameters
+    ----------
+    arguments : List[str]
+        Command line arguments, sys.argv by default.
+
+    Returns
+    -------
+    int
+        Exit status: 1 if a subsystem exceeds the budget, 0 otherwise.
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument(
+        "--subsystem", action="append", choices=list(SUBSYSTEMS), help="Subsystem to profile (default: all)"
+    )
+    arg_parser.add_argument(
+        "--cold-cache", action="store_true", help="Use an empty ASN.1 coder cache, to measure the compilation"
+    )
+    arg_parser.add_argument(
+        "--budget", type=float, default=None, help="Maximum import plus initialisation time of a subsystem in ms"
+    )
+    arg_parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    arg_parser.add_argument("--measure", choices=list(SUBSYSTEMS), help=argparse.SUPPRESS)
+    args = arg_parser.parse_args(arguments)
+    if args.measure:
+        print(json.dumps(measure(args.measure)))
+        return 0
+    with tempfile.TemporaryDirectory() as cache_directory:
+        results = [
+            profile(name, cache_directory if args.cold_cache else None) for name in args.subsystem or SUBSYSTEMS
+        ]
+    over_budget = [
+        result["subsystem"]
+        for result in results
+        if args.budget is not None and (result["import"] + result["initialisation"]) * 1000 > args.budget
+    ]
+    if args.json:
+        print(json.dumps({"results": results, "over_budget": over_budget}, indent=2))
+    else:
+        print(f"{'Subsystem':<12}{'Import (ms)':>14}{'Init (ms)':>14}{'Total (ms)':>14}{'Modules':>10}")
+        for result in results:
+            total = result["import"] + result["initialisation"]
+            print(
+                f"{result['subsystem']:<12}{result['import'] * 1000:>14.1f}{result['initialisation'] * 1000:>14.1f}"
+                f"{total * 1000:>14.1f}{result['modules']:>10}"
+            )
+        for name in over_budget:
+            print(f"{name} exceeds the budget of {args.budget:.0f} ms")
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
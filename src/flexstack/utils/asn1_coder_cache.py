@@ -0,0 +1,139 @@
+from __future__ import annotations
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import asn1tools
+
+# Version of the format of the cache files, to be increased whenever it changes
+CACHE_FORMAT_VERSION = 1
+# Environment variable with the directory of the on-disk cache. An empty value disables it.
+CACHE_DIRECTORY_VARIABLE = "FLEXSTACK_ASN1_CACHE"
+DEFAULT_CACHE_DIRECTORY = os.path.join(os.path.expanduser("~"), ".cache", "flexstack", "asn1")
+
+logger = logging.getLogger("asn1_coder_cache")
+_coders: dict[str, asn1tools.compiler.Specification] = {}
+_lock = threading.Lock()
+_cache_directory = os.environ.get(CACHE_DIRECTORY_VARIABLE, DEFAULT_CACHE_DIRECTORY)
+
+
+def set_cache_directory(directory: str | None) -> None:
+    """
+    Sets the directory of the on-disk cache of compiled coders.
+
+    Parameters
+    ----------
+    directory : str | None
+        Directory of the cache, None (or empty) to disable it. The directory must only be writable by trusted
+        users, the cache files are loaded with pickle.
+    """
+    global _cache_directory  # pylint: disable=global-statement
+    _cache_directory = directory
+
+
+def cache_key(descriptions: str, codec: str) -> str:
+    """
+    Returns the key of a compiled coder: a hash of the ASN.1 source, the codec and the versions the compiled
+    coder depends on.
+
+    Parameters
+    ----------
+    descriptions : str
+        ASN.1 source.
+    codec : str
+        Codec (e.g. "uper").
+
+    Returns
+    -------
+    str
+        Key, as an hexadecimal string.
+    """
+    # asn1tools is only imported when a coder is needed, it takes hundreds of milliseconds
+    import asn1tools  # pylint: disable=import-outside-toplevel
+
+    digest = hashlib.sha256(descriptions.encode("utf-8"))
+    digest.update(f"{codec}:{asn1tools.__version__}:{CACHE_FORMAT_VERSION}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def get_coder(descriptions: str, codec: str) -> asn1tools.compiler.Specification:
+    """
+    Returns the coder of an ASN.1 source for a codec, compiled once per process.
+
+    The coder is loaded from the on-disk cache if it has been compiled before with the same source and versions,
+    and stored in it otherwise. Parsing the ETSI ASN.1 modules takes seconds, loading the compiled coder takes
+    milliseconds. The coders are shared, they must not be modified.
+
+    Parameters
+    ----------
+    descriptions : str
+        ASN.1 source.
+    codec : str
+        Codec (e.g. "uper").
+
+    Returns
+    -------
+    asn1tools.compiler.Specification
+        Compiled coder.
+    """
+    key = cache_key(descriptions, codec)
+    with _lock:
+        coder = _coders.get(key)
+        if coder is None:
+            coder = _load(key)
+            if coder is None:
+                import asn1tools  # pylint: disable=import-outside-toplevel
+
+                coder = asn1tools.compile_string(descriptions, codec=codec)
+                _store(key, coder)
+            _coders[key] = coder
+        return coder
+
+
+def clear() -> None:
+    """
+    Clears the coders compiled by the process. The on-disk cache is kept.
+    """
+    with _lock:
+        _coders.clear()
+
+
+def _path(key: str) -> str:
+    return os.path.join(_cache_directory, key + ".pickle")
+
+
+def _load(key: str) -> asn1tools.compiler.Specification | None:
+    if not _cache_directory:
+        return None
+    try:
+        with open(_path(key), "rb") as file:
+            return pickle.load(file)
+    except FileNotFoundError:
+        return None
+    except Exception as e:  # pylint: disable=broad-except
+        # A corrupted or incompatible file is compiled and written again
+        logger.warning("Error loading the cached ASN.1 coder %s: %s", key, e)
+        return None
+
+
+def _store(key: str, coder: asn1tools.compiler.Specification) -> None:
+    if not _cache_directory:
+        return
+    try:
+        os.makedirs(_cache_directory, exist_ok=True)
+        # Written to a temporary file and renamed, so other processes never read a partial file
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=_cache_directory, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                pickle.dump(coder, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, _path(key))
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+    except Exception as e:  # pylint: disable=broad-except
+        logger.warning("Error storing the compiled ASN.1 coder %s: %s", key, e)
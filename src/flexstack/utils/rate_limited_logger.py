@@ -0,0 +1,84 @@
+from __future__ import annotations
+import logging
+import threading
+import time
+
+
+class RateLimitedLogger:
+    """
+    Wrapper of a logger that emits at most one message per key and interval.
+
+    Used in the packet processing paths, where the same condition (e.g. a duplicated packet) may happen for
+    every received packet. The messages of a key that are suppressed during an interval are counted, and the
+    count is appended to the next message emitted for that key.
+
+    Attributes
+    ----------
+    logger : logging.Logger
+        Logger to emit the messages.
+    interval : float
+        Minimum time between two messages of the same key, in seconds.
+    last_emitted : Dict[str, float]
+        Time (time.monotonic()) of the last message emitted for each key.
+    suppressed : Dict[str, int]
+        Messages suppressed for each key since the last one emitted.
+    """
+
+    def __init__(self, logger: logging.Logger, interval: float = 1.0) -> None:
+        self.logger = logger
+        self.interval = interval
+        self.last_emitted: dict[str, float] = {}
+        self.suppressed: dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def log(self, level: int, key: str, msg: str, *args) -> None:
+        """
+        Logs a message if no message with the same key has been emitted in the last interval.
+
+        Parameters
+        ----------
+        level : int
+            Logging level.
+        key : str
+            Key of the message, e.g. the drop reason.
+        msg : str
+            Message, with %-style placeholders for args.
+        """
+        if not self.logger.isEnabledFor(level):
+            return
+        now = time.monotonic()
+        with self.lock:
+            last_emitted = self.last_emitted.get(key)
+            if last_emitted is not None and now - last_emitted < self.interval:
+                self.suppressed[key] = self.suppressed.get(key, 0) + 1
+                return
+            self.last_emitted[key] = now
+            suppressed = self.suppressed.pop(key, 0)
+        if suppressed:
+            msg += " (%d similar messages suppressed)"
+            args = args + (suppressed,)
+        self.logger.log(level, msg, *args)
+
+    def debug(self, key: str, msg: str, *args) -> None:
+        """
+        Logs a rate limited message with level DEBUG.
+        """
+        self.log(logging.DEBUG, key, msg, *args)
+
+    def info(self, key: str, msg: str, *args) -> None:
+        """
+        Logs a rate limited message with level INFO.
+        """
+        self.log(logging.INFO, key, msg, *args)
+
+    def warning(self, key: str, msg: str, *args) -> None:
+        """
+        Logs a rate limited message with level WARNING.
+        """
+        self.log(logging.WARNING, key, msg, *args)
+
+    def error(self, key: str, msg: str, *args) -> None:
+        """
+        Logs a rate limited message with level ERROR.
+        """
+        self.log(logging.ERROR, key, msg, *args)
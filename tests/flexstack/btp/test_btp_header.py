@@ -67,6 +67,18 @@ class TestBTPBHeader(unittest.TestCase):
         self.assertEqual(btp_b_header.destination_port, 1)
         self.assertEqual(btp_b_header.destination_port_info, 2)
 
+    def test_encode_into_decode_from(self):
+        btp_b_header = BTPBHeader()
+        btp_b_header.destination_port = 2001
+        btp_b_header.destination_port_info = 2
+        buffer = bytearray(8)
+        btp_b_header.encode_into(buffer, 4)
+        self.assertEqual(bytes(buffer), b'\x00\x00\x00\x00\x07\xd1\x00\x02')
+        decoded = BTPBHeader()
+        decoded.decode_from(memoryview(buffer), 4)
+        self.assertEqual(decoded.destination_port, 2001)
+        self.assertEqual(decoded.destination_port_info, 2)
+
 
 if __name__ == '__main__':
     unittest.main()
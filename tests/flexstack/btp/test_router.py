@@ -3,6 +3,7 @@ from unittest.mock import MagicMock
 
 from flexstack.btp.router import Router
 from flexstack.btp.service_access_point import BTPDataRequest, PacketTransportType, CommunicationProfile, TrafficClass, CommonNH
+from flexstack.geonet.service_access_point import GNDataIndication
 
 
 class TestRouter(unittest.TestCase):
@@ -18,7 +19,77 @@ class TestRouter(unittest.TestCase):
         router = Router(gn_router)
         callback = MagicMock()
         router.register_indication_callback_btp(1, callback)
-        self.assertEqual(router.indication_callbacks[1], callback)
+        self.assertEqual(router.indication_callbacks[1][0].callback, callback)
+        other_callback = MagicMock()
+        router.register_indication_callback_btp(1, other_callback)
+        self.assertEqual(len(router.indication_callbacks[1]), 2)
+        router.unregister_indication_callback_btp(1, callback)
+        self.assertEqual(router.indication_callbacks[1][0].callback, other_callback)
+        router.unregister_indication_callback_btp(1, other_callback)
+        self.assertNotIn(1, router.indication_callbacks)
+
+    def test_BTPBDataIndication_fan_out(self):
+        router = Router(MagicMock())
+        callback = MagicMock()
+        payload_callback = MagicMock()
+        executor_callback = MagicMock()
+        executor = MagicMock()
+        router.register_indication_callback_btp(2001, callback)
+        router.register_indication_callback_btp(2001, payload_callback, payload_only=True)
+        router.register_indication_callback_btp(2001, executor_callback, executor=executor, payload_only=True)
+        gn_data_indication = GNDataIndication()
+        gn_data_indication.upper_protocol_entity = CommonNH.BTP_B
+        gn_data_indication.data = memoryview(bytearray((2001).to_bytes(2, 'big') + bytes(2) + b'payload'))
+        gn_data_indication.length = len(gn_data_indication.data)
+        router.btp_data_indication(gn_data_indication)
+        indication = callback.call_args[0][0]
+        self.assertEqual(indication.destination_port, 2001)
+        self.assertEqual(indication.data, b'payload')
+        payload = payload_callback.call_args[0][0]
+        self.assertIsInstance(payload, memoryview)
+        self.assertEqual(payload, b'payload')
+        # The payload is copied for the executor
+        executor.submit.assert_called_once_with(executor_callback, b'payload')
+        executor_callback.assert_not_called()
+        self.assertEqual(router.statistics.get_counter("rx_packets"), 1)
+
+    def test_BTPBDataIndication_batch_subscriber(self):
+        # Given a port with only a batch subscriber
+        router = Router(MagicMock())
+        batch_callback = MagicMock()
+        router.register_indication_batch_callback_btp(2001, batch_callback)
+        gn_data_indication = GNDataIndication()
+        gn_data_indication.upper_protocol_entity = CommonNH.BTP_B
+        gn_data_indication.data = (2001).to_bytes(2, 'big') + bytes(2) + b'payload'
+        # When a packet is received on the per packet path
+        router.btp_data_indication(gn_data_indication)
+        # Then it is passed to the batch subscriber as a single indication list
+        batch_callback.assert_called_once()
+        indications = batch_callback.call_args[0][0]
+        self.assertEqual(len(indications), 1)
+        self.assertEqual(indications[0].destination_port, 2001)
+        self.assertEqual(indications[0].data, b'payload')
+        self.assertEqual(router.statistics.get_counter("drop_no_subscriber"), 0)
+
+    def test_BTPBDataIndication_no_subscriber(self):
+        router = Router(MagicMock())
+        gn_data_indication = GNDataIndication()
+        gn_data_indication.upper_protocol_entity = CommonNH.BTP_B
+        gn_data_indication.data = (2001).to_bytes(2, 'big') + bytes(2) + b'payload'
+        router.btp_data_indication(gn_data_indication)
+        self.assertEqual(router.statistics.get_counter("drop_no_subscriber"), 1)
+
+    def test_BTPBDataIndication_too_short(self):
+        router = Router(MagicMock())
+        callback = MagicMock()
+        router.register_indication_callback_btp(2001, callback)
+        for data in (b'', b'\x07', b'\x07\xd1\x00'):
+            gn_data_indication = GNDataIndication()
+            gn_data_indication.upper_protocol_entity = CommonNH.BTP_B
+            gn_data_indication.data = data
+            router.btp_data_indication(gn_data_indication)
+        callback.assert_not_called()
+        self.assertEqual(router.statistics.get_counter("drop_decode_error"), 3)
 
     def test_BTPDataRequest(self):
         """
@@ -38,6 +109,39 @@ class TestRouter(unittest.TestCase):
         router.btp_data_request(request)
         gn_router.gn_data_request.assert_called_once()
 
+    def test_BTPDataIndicationBatch(self):
+        router = Router(MagicMock())
+        batch_callback = MagicMock()
+        callback = MagicMock()
+        payload_callback = MagicMock()
+        router.register_indication_batch_callback_btp(2001, batch_callback)
+        router.register_indication_callback_btp(2001, payload_callback, payload_only=True)
+        router.register_indication_callback_btp(2002, callback)
+        gn_data_indications = []
+        for port in (2001, 2002, 2001, 2003):
+            gn_data_indication = GNDataIndication()
+            gn_data_indication.upper_protocol_entity = CommonNH.BTP_B
+            gn_data_indication.data = port.to_bytes(2, 'big') + bytes(2) + b'payload'
+            gn_data_indication.length = len(gn_data_indication.data)
+            gn_data_indications.append(gn_data_indication)
+        # A packet shorter than the BTP-B header does not drop the rest of the batch
+        short_indication = GNDataIndication()
+        short_indication.upper_protocol_entity = CommonNH.BTP_B
+        short_indication.data = b'\x07\xd1'
+        gn_data_indications.insert(2, short_indication)
+        router.btp_data_indication_batch(gn_data_indications)
+        batch_callback.assert_called_once()
+        indications = batch_callback.call_args[0][0]
+        self.assertEqual([indication.destination_port for indication in indications], [2001, 2001])
+        self.assertEqual(indications[0].data, b'payload')
+        self.assertEqual(payload_callback.call_count, 2)
+        self.assertEqual(payload_callback.call_args[0][0], b'payload')
+        callback.assert_called_once()
+        self.assertEqual(callback.call_args[0][0].destination_port, 2002)
+        self.assertEqual(router.statistics.get_counter("rx_packets"), 4)
+        self.assertEqual(router.statistics.get_counter("drop_no_subscriber"), 1)
+        self.assertEqual(router.statistics.get_counter("drop_decode_error"), 1)
+
 
 if __name__ == '__main__':
     unittest.main()
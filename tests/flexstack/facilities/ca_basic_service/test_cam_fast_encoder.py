@@ -0,0 +1,107 @@
+import random
+import unittest
+from unittest.mock import MagicMock
+
+from flexstack.facilities.ca_basic_service.cam_coder import CAMCoder
+from flexstack.facilities.ca_basic_service.cam_fast_encoder import CAMFastEncoder, static_part_equal
+from flexstack.facilities.ca_basic_service.cam_transmission_management import CooperativeAwarenessMessage
+
+ALTITUDE_CONFIDENCES = ["alt-000-01", "alt-000-50", "alt-010-00", "alt-200-00", "outOfRange", "unavailable"]
+
+
+def randomize_dynamic_fields(cam: dict, rng: random.Random) -> None:
+    cam["cam"]["generationDeltaTime"] = rng.randint(0, 65535)
+    reference_position = cam["cam"]["camParameters"]["basicContainer"]["referencePosition"]
+    reference_position["latitude"] = rng.randint(-900000000, 900000001)
+    reference_position["longitude"] = rng.randint(-1800000000, 1800000001)
+    reference_position["positionConfidenceEllipse"] = {
+        "semiMajorAxisLength": rng.randint(0, 4095),
+        "semiMinorAxisLength": rng.randint(0, 4095),
+        "semiMajorAxisOrientation": rng.randint(0, 3601),
+    }
+    reference_position["altitude"] = {
+        "altitudeValue": rng.randint(-100000, 800001),
+        "altitudeConfidence": rng.choice(ALTITUDE_CONFIDENCES),
+    }
+    high_frequency_container = cam["cam"]["camParameters"]["highFrequencyContainer"][1]
+    high_frequency_container["heading"] = {
+        "headingValue": rng.randint(0, 3601),
+        "headingConfidence": rng.randint(1, 127),
+    }
+    high_frequency_container["speed"] = {
+        "speedValue": rng.randint(0, 16383),
+        "speedConfidence": rng.randint(1, 127),
+    }
+
+
+class TestCAMFastEncoder(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.cam_coder = CAMCoder()
+
+    def test_encode_random_cams(self):
+        rng = random.Random(1)
+        encoder = CAMFastEncoder(self.cam_coder)
+        cam = CooperativeAwarenessMessage().cam
+        for i in range(300):
+            if i % 50 == 0:
+                # New static part: station, vehicle data and optional containers
+                cam["header"]["stationId"] = rng.randint(0, 4294967295)
+                cam["cam"]["camParameters"]["basicContainer"]["stationType"] = rng.randint(0, 15)
+                high_frequency_container = cam["cam"]["camParameters"]["highFrequencyContainer"][1]
+                high_frequency_container["vehicleWidth"] = rng.randint(1, 62)
+                high_frequency_container["driveDirection"] = rng.choice(["forward", "backward", "unavailable"])
+                if rng.random() < 0.5:
+                    high_frequency_container["accelerationControl"] = (b"\xa0", 7)
+                else:
+                    high_frequency_container.pop("accelerationControl", None)
+            randomize_dynamic_fields(cam, rng)
+            self.assertEqual(encoder.encode(cam), self.cam_coder.encode(cam))
+        self.assertIsNotNone(encoder.fields)
+
+    def test_encode_reuses_template(self):
+        encoder = CAMFastEncoder(self.cam_coder)
+        cam = CooperativeAwarenessMessage().cam
+        encoder.encode(cam)
+        template = encoder.template
+        randomize_dynamic_fields(cam, random.Random(2))
+        encoder.encode(cam)
+        self.assertIs(encoder.template, template)
+        cam["header"]["stationId"] = 1234
+        self.assertEqual(encoder.encode(cam), self.cam_coder.encode(cam))
+        self.assertIsNot(encoder.template, template)
+
+    def test_encode_out_of_range_value(self):
+        encoder = CAMFastEncoder(self.cam_coder)
+        cam = CooperativeAwarenessMessage().cam
+        encoder.encode(cam)
+        # Outside the range of AltitudeValue, encoded as an extension
+        cam["cam"]["camParameters"]["basicContainer"]["referencePosition"]["altitude"]["altitudeValue"] = 900000
+        self.assertEqual(encoder.encode(cam), self.cam_coder.encode(cam))
+        cam["cam"]["camParameters"]["basicContainer"]["referencePosition"]["altitude"]["altitudeValue"] = 1000
+        cam["cam"]["camParameters"]["basicContainer"]["referencePosition"]["altitude"]["altitudeConfidence"] = "bad"
+        with self.assertRaises(Exception):
+            encoder.encode(cam)
+
+    def test_encode_without_layout(self):
+        cam_coder = MagicMock()
+        cam_coder.encode = MagicMock(return_value=b"encoded_cam")
+        encoder = CAMFastEncoder(cam_coder)
+        cam = CooperativeAwarenessMessage().cam
+        self.assertEqual(encoder.encode(cam), b"encoded_cam")
+        self.assertIsNone(encoder.fields)
+        cam["cam"]["generationDeltaTime"] = 100
+        self.assertEqual(encoder.encode(cam), b"encoded_cam")
+        cam_coder.encode.assert_called_with(cam)
+        self.assertEqual(cam_coder.encode.call_count, 2)
+
+    def test_static_part_equal(self):
+        dynamic = {"a": None, "b": {"c": None}}
+        self.assertTrue(static_part_equal({"a": 1, "b": {"c": 2}, "d": 3}, {"a": 4, "b": {"c": 5}, "d": 3}, dynamic))
+        self.assertFalse(static_part_equal({"a": 1, "b": {"c": 2}, "d": 3}, {"a": 1, "b": {"c": 2}, "d": 4}, dynamic))
+        self.assertFalse(static_part_equal({"a": 1, "b": {"c": 2}}, {"a": 1, "b": {"c": 2, "e": 1}}, dynamic))
+        self.assertFalse(static_part_equal({"a": 1}, {"a": 1, "b": {"c": 2}}, dynamic))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -42,3 +42,23 @@ class TestCamReceptionManagement(unittest.TestCase):
         # Assert
         ca_basic_service_ldm.add_provider_data_to_ldm.assert_called_once()
         cam_coder.decode.assert_called_once()
+
+    def test_reception_callback_message_filter(self):
+        cam_coder = MagicMock()
+        ca_basic_service_ldm = MagicMock()
+        cam_reception_management = CAMReceptionManagement(cam_coder, MagicMock(), ca_basic_service_ldm)
+        message_filter = MagicMock(return_value=False)
+        cam_reception_management.set_message_filter(message_filter)
+        btp_indication = MagicMock()
+        btp_indication.data_view = memoryview(bytes([2, 2, 0, 0, 0, 7]) + bytes(20))
+        cam_reception_management.reception_callback(btp_indication)
+        self.assertEqual(message_filter.call_args[0][0].station_id, 7)
+        cam_coder.decode.assert_not_called()
+        message_filter.return_value = True
+        cam_reception_management.reception_callback(btp_indication)
+        cam_coder.decode.assert_called_once()
+        ca_basic_service_ldm.add_provider_data_to_ldm.assert_called_once()
+        # Malformed CAMs are discarded
+        btp_indication.data_view = memoryview(bytes(3))
+        cam_reception_management.reception_callback(btp_indication)
+        cam_coder.decode.assert_called_once()
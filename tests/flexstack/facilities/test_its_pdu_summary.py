@@ -0,0 +1,136 @@
+import random
+import unittest
+from unittest.mock import patch
+
+from flexstack.facilities.ca_basic_service.cam_coder import CAMCoder
+from flexstack.facilities.ca_basic_service.cam_transmission_management import CooperativeAwarenessMessage
+from flexstack.facilities.decentralized_environmental_notification_service.denm_coder import DENMCoder
+from flexstack.facilities.decentralized_environmental_notification_service.denm_transmission_management import (
+    DecentralizedEnvironmentalNotificationMessage,
+)
+from flexstack.facilities.its_pdu_summary import DuplicateFilter, ItsPduSummary, read_bits
+from flexstack.facilities.vru_awareness_service.vam_coder import VAMCoder
+from flexstack.facilities.vru_awareness_service.vam_transmission_management import VAMMessage
+
+
+def random_position(rng: random.Random) -> tuple:
+    return rng.randint(-900000000, 900000001), rng.randint(-1800000000, 1800000001)
+
+
+class TestItsPduSummary(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = random.Random(0)
+
+    def test_read_bits(self):
+        self.assertEqual(read_bits(b"\x0f\xf0", 4, 8), 0xFF)
+        self.assertEqual(read_bits(b"\x80", 0, 1), 1)
+        with self.assertRaises(ValueError):
+            read_bits(b"\x00", 4, 8)
+
+    def test_decode_cam(self):
+        cam_coder = CAMCoder()
+        for _ in range(50):
+            cam = CooperativeAwarenessMessage().cam
+            cam["header"]["stationId"] = self.rng.randrange(2**32)
+            cam["cam"]["generationDeltaTime"] = self.rng.randrange(2**16)
+            basic_container = cam["cam"]["camParameters"]["basicContainer"]
+            basic_container["stationType"] = self.rng.randrange(16)
+            latitude, longitude = random_position(self.rng)
+            basic_container["referencePosition"]["latitude"] = latitude
+            basic_container["referencePosition"]["longitude"] = longitude
+            summary = ItsPduSummary.decode_cam(memoryview(cam_coder.encode(cam)))
+            self.assertEqual(summary.protocol_version, 2)
+            self.assertEqual(summary.station_id, cam["header"]["stationId"])
+            self.assertEqual(summary.generation_delta_time, cam["cam"]["generationDeltaTime"])
+            self.assertEqual(summary.station_type, basic_container["stationType"])
+            self.assertEqual((summary.latitude, summary.longitude), (latitude, longitude))
+
+    def test_decode_vam(self):
+        vam_coder = VAMCoder()
+        for _ in range(50):
+            vam = VAMMessage().vam
+            vam["header"]["stationId"] = self.rng.randrange(2**32)
+            vam["vam"]["generationDeltaTime"] = self.rng.randrange(2**16)
+            reference_position = vam["vam"]["vamParameters"]["basicContainer"]["referencePosition"]
+            latitude, longitude = random_position(self.rng)
+            reference_position["latitude"] = latitude
+            reference_position["longitude"] = longitude
+            summary = ItsPduSummary.decode_vam(vam_coder.encode(vam))
+            self.assertEqual(summary.station_id, vam["header"]["stationId"])
+            self.assertEqual(summary.generation_delta_time, vam["vam"]["generationDeltaTime"])
+            self.assertEqual(summary.station_type, 15)
+            self.assertEqual((summary.latitude, summary.longitude), (latitude, longitude))
+
+    def test_decode_denm(self):
+        denm_coder = DENMCoder()
+        for index in range(50):
+            denm = DecentralizedEnvironmentalNotificationMessage().denm
+            management = denm["denm"]["management"]
+            if index % 2:
+                # The position of the event depends on the presence of the termination
+                del management["termination"]
+            management["actionId"] = {
+                "originatingStationId": self.rng.randrange(2**32), "sequenceNumber": self.rng.randrange(2**16)
+            }
+            management["detectionTime"] = self.rng.randrange(2**42)
+            management["referenceTime"] = self.rng.randrange(2**42)
+            latitude, longitude = random_position(self.rng)
+            management["eventPosition"]["latitude"] = latitude
+            management["eventPosition"]["longitude"] = longitude
+            summary = ItsPduSummary.decode_denm(denm_coder.encode(denm))
+            self.assertEqual(
+                summary.action_id,
+                (management["actionId"]["originatingStationId"], management["actionId"]["sequenceNumber"]),
+            )
+            self.assertEqual(summary.detection_time, management["detectionTime"])
+            self.assertEqual(summary.reference_time, management["referenceTime"])
+            self.assertEqual((summary.latitude, summary.longitude), (latitude, longitude))
+
+    def test_decode_errors(self):
+        cam = CAMCoder().encode(CooperativeAwarenessMessage().cam)
+        with self.assertRaises(ValueError):
+            ItsPduSummary.decode_denm(cam)
+        with self.assertRaises(ValueError):
+            ItsPduSummary.decode_cam(cam[:10])
+        with self.assertRaises(ValueError):
+            ItsPduSummary.decode_cam(cam[:3])
+
+
+class TestDuplicateFilter(unittest.TestCase):
+
+    def test_call(self):
+        duplicate_filter = DuplicateFilter(max_entries=2)
+        summaries = []
+        for station_id in (1, 2, 3):
+            summary = ItsPduSummary()
+            summary.message_id = 2
+            summary.station_id = station_id
+            summary.generation_delta_time = 100
+            summaries.append(summary)
+        self.assertTrue(duplicate_filter(summaries[0]))
+        self.assertFalse(duplicate_filter(summaries[0]))
+        self.assertTrue(duplicate_filter(summaries[1]))
+        self.assertTrue(duplicate_filter(summaries[2]))
+        # The oldest message is forgotten
+        self.assertTrue(duplicate_filter(summaries[0]))
+
+    @patch("flexstack.facilities.its_pdu_summary.time.monotonic")
+    def test_call_expiry(self, monotonic_mock):
+        duplicate_filter = DuplicateFilter(max_age=5.0)
+        summary = ItsPduSummary()
+        summary.message_id = 2
+        summary.station_id = 1
+        summary.generation_delta_time = 100
+        monotonic_mock.return_value = 1000.0
+        self.assertTrue(duplicate_filter(summary))
+        monotonic_mock.return_value = 1001.0
+        self.assertFalse(duplicate_filter(summary))
+        # A new CAM of the station with the same generationDeltaTime, after generationDeltaTime wrapped around
+        monotonic_mock.return_value = 1000.0 + 65.536
+        self.assertTrue(duplicate_filter(summary))
+        self.assertEqual(len(duplicate_filter.seen), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,14 +5,14 @@ from flexstack.facilities.vru_awareness_service.vam_coder import VAMCoder
 
 
 class TestCoder(unittest.TestCase):
-    @patch("asn1tools.compile_string")
-    def setUp(self, mock_asn1tools) -> None:
+    @patch("flexstack.facilities.vru_awareness_service.vam_coder.get_coder")
+    def setUp(self, mock_get_coder) -> None:
         compile_string_mock = MagicMock()
         encode_mock = MagicMock(return_value="test")
         decode_mock = MagicMock(return_value="test")
         compile_string_mock.encode = encode_mock
         compile_string_mock.decode = decode_mock
-        mock_asn1tools.return_value = compile_string_mock
+        mock_get_coder.return_value = compile_string_mock
 
         self.VAMCoder = VAMCoder()
 
@@ -13,6 +13,9 @@ class TestLT(unittest.TestCase):
         lt.set_value_in_millis(100)
         self.assertEqual(lt.multiplier, 2)
         self.assertEqual(lt.base, LTbase.FIFTY_MILLISECONDS)
+        lt.set_value_in_millis(700)
+        self.assertEqual(lt.multiplier, 14)
+        self.assertEqual(lt.base, LTbase.FIFTY_MILLISECONDS)
         lt.set_value_in_millis(1000)
         self.assertEqual(lt.multiplier, 1)
         self.assertEqual(lt.base, LTbase.ONE_SECOND)
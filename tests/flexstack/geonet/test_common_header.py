@@ -1,6 +1,8 @@
 import unittest
 
 from flexstack.geonet.common_header import CommonHeader, CommonNH, HeaderType, HeaderSubType, TrafficClass
+from flexstack.geonet.mib import MIB
+from flexstack.geonet.service_access_point import GeoBroadcastHST, GNDataRequest, TopoBroadcastHST
 
 
 class TestCommonHeader(unittest.TestCase):
@@ -21,6 +23,20 @@ class TestCommonHeader(unittest.TestCase):
         self.assertEqual(ch.encode_to_bytes(),
                          b'\x10\x10\xc1\x00\x01,\x01\x00')
 
+    def test_initialize_with_request(self):
+        mib = MIB()
+        request = GNDataRequest()
+        request.packet_transport_type.header_type = HeaderType.TSB
+        request.packet_transport_type.header_subtype = TopoBroadcastHST.SINGLE_HOP
+        ch = CommonHeader()
+        ch.initialize_with_request(request, mib)
+        self.assertEqual(ch.mhl, 1)
+        # Multi-hop packets can traverse itsGnDefaultHopLimit hops
+        request.packet_transport_type.header_type = HeaderType.GEOBROADCAST
+        request.packet_transport_type.header_subtype = GeoBroadcastHST.GEOBROADCAST_CIRCLE
+        ch.initialize_with_request(request, mib)
+        self.assertEqual(ch.mhl, mib.itsGnDefaultHopLimit)
+
     def test_decode_from_bytes(self):
         ch = CommonHeader()
         ch.nh = CommonNH.BTP_A
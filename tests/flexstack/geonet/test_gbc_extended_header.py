@@ -62,3 +62,27 @@ class TestGBCExtendedHeader(unittest.TestCase):
         self.assertEqual(gbc_extended_header.b, 40)
         self.assertEqual(gbc_extended_header.angle, 45)
         self.assertEqual(gbc_extended_header.reserved2, 0)
+
+    def test_encode_into_decode_from(self):
+        # Given
+        gbc_extended_header = GBCExtendedHeader()
+        gbc_extended_header.sn = 7
+        gbc_extended_header.so_pv.latitude = 425234589
+        gbc_extended_header.so_pv.longitude = -37878965
+        gbc_extended_header.latitude = -425238621
+        gbc_extended_header.longitude = 29877856
+        gbc_extended_header.a = 30
+        gbc_extended_header.b = 40
+        gbc_extended_header.angle = 45
+        buffer = bytearray(50)
+        # when
+        gbc_extended_header.encode_into(buffer, 6)
+        decoded = GBCExtendedHeader()
+        decoded.decode_from(buffer, 6)
+        # then
+        self.assertEqual(bytes(buffer[6:]), gbc_extended_header.encode())
+        self.assertEqual(decoded.sn, 7)
+        self.assertEqual(decoded.so_pv, gbc_extended_header.so_pv)
+        self.assertEqual(decoded.latitude, -425238621)
+        self.assertEqual(decoded.longitude, 29877856)
+        self.assertEqual(decoded.angle, 45)
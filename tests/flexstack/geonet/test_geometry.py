@@ -0,0 +1,77 @@
+import unittest
+
+from flexstack.geonet.geometry import AreaGeometry, geometric_function_f_batch
+from flexstack.geonet.service_access_point import Area, GeoBroadcastHST
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 1/10 micro degrees of latitude per meter
+LATITUDE_PER_METER = 10000000 * 360 / (2 * 3.141592653589793 * 6371000)
+
+
+def build_area(a: int, b: int, angle: int) -> Area:
+    area = Area()
+    area.latitude = 421255850
+    area.longitude = 27601710
+    area.a = a
+    area.b = b
+    area.angle = angle
+    return area
+
+
+class TestGeometry(unittest.TestCase):
+
+    def test_cartesian_coordinates(self):
+        geometry = AreaGeometry(0, 0, 90)
+        x, y = geometry.cartesian_coordinates(int(100 * LATITUDE_PER_METER), 0)
+        # A point 100 m North of the centre is 100 m to the left of an area pointing East
+        self.assertAlmostEqual(x, 0, places=3)
+        self.assertAlmostEqual(y, -100, places=0)
+
+    def test_geometric_function_f_rotated_ellipse(self):
+        area = build_area(200, 50, 90)
+        north = area.latitude + int(150 * LATITUDE_PER_METER)
+        east = area.longitude + int(150 * LATITUDE_PER_METER / 0.7414)
+        self.assertLess(area.geometric_function_f(GeoBroadcastHST.GEOBROADCAST_ELIP, north, area.longitude), 0)
+        self.assertGreater(area.geometric_function_f(GeoBroadcastHST.GEOBROADCAST_ELIP, area.latitude, east), 0)
+        self.assertAlmostEqual(
+            area.geometric_function_f(GeoBroadcastHST.GEOBROADCAST_ELIP, area.latitude, area.longitude), 1
+        )
+
+    def test_geometric_function_f_rectangle(self):
+        area = build_area(200, 50, 0)
+        inside = area.latitude + int(100 * LATITUDE_PER_METER)
+        outside = area.latitude + int(300 * LATITUDE_PER_METER)
+        self.assertAlmostEqual(
+            area.geometric_function_f(GeoBroadcastHST.GEOBROADCAST_RECT, inside, area.longitude), 0.75, places=2
+        )
+        self.assertLess(area.geometric_function_f(GeoBroadcastHST.GEOBROADCAST_RECT, outside, area.longitude), 0)
+
+    def test_geometry_cache(self):
+        area = build_area(100, 100, 0)
+        geometry = area.geometry()
+        self.assertIs(area.geometry(), geometry)
+        area.angle = 45
+        self.assertIsNot(area.geometry(), geometry)
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_geometric_function_f_batch(self):
+        areas = [
+            (GeoBroadcastHST.GEOBROADCAST_CIRCLE, build_area(100, 0, 0)),
+            (GeoBroadcastHST.GEOBROADCAST_ELIP, build_area(200, 50, 30)),
+            (GeoBroadcastHST.GEOBROADCAST_RECT, build_area(200, 50, 120)),
+        ]
+        latitudes = [421255850, 421254550, 421236840, 421265850]
+        longitudes = [27601710, 27603740, 27632710, 27600710]
+        result = geometric_function_f_batch(areas, latitudes, longitudes)
+        self.assertEqual(result.shape, (3, 4))
+        for i, (area_type, area) in enumerate(areas):
+            for j, (latitude, longitude) in enumerate(zip(latitudes, longitudes)):
+                self.assertAlmostEqual(result[i, j], area.geometric_function_f(area_type, latitude, longitude))
+
+
+if __name__ == '__main__':
+    unittest.main()
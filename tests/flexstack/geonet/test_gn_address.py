@@ -48,6 +48,17 @@ class TestGNAddress(unittest.TestCase):
         self.assertEqual(gn_address.st.value, gn_address_decoded.st.value)
         self.assertEqual(gn_address.mid.mid, gn_address_decoded.mid.mid)
 
+    def test_hash(self):
+        gn_address = GNAddress()
+        gn_address.set_mid(MID(b'\xaa\xbb\xcc\x11\x22\x33'))
+        gn_address_decoded = GNAddress()
+        gn_address_decoded.decode(gn_address.encode())
+        self.assertEqual(hash(gn_address), hash(gn_address_decoded))
+        self.assertEqual({gn_address: 1}[gn_address_decoded], 1)
+        other_decoded = GNAddress()
+        other_decoded.decode(gn_address.encode())
+        self.assertIs(other_decoded.mid, gn_address_decoded.mid)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+
+from flexstack.geonet.basic_header import BasicHeader
+from flexstack.geonet.common_header import CommonHeader
+from flexstack.geonet.gbc_extended_header import GBCExtendedHeader
+from flexstack.geonet.header_template import HeaderTemplateCache
+from flexstack.geonet.mib import MIB
+from flexstack.geonet.position_vector import LongPositionVector
+from flexstack.geonet.service_access_point import CommonNH, GeoBroadcastHST, GNDataRequest, HeaderType
+
+
+class TestHeaderTemplateCache(unittest.TestCase):
+
+    def create_position_vector(self) -> LongPositionVector:
+        position_vector = LongPositionVector()
+        position_vector.set_tst_in_normal_timestamp_seconds(1675071608)
+        position_vector.set_latitude(41.387275688863674)
+        position_vector.set_longitude(2.112266864991681)
+        position_vector.set_speed(3)
+        position_vector.set_heading(4)
+        return position_vector
+
+    def test_shb_template(self):
+        # Given
+        mib = MIB()
+        cache = HeaderTemplateCache(mib)
+        request = GNDataRequest()
+        request.upper_protocol_entity = CommonNH.BTP_B
+        request.data = b'request_data'
+        request.length = len(request.data)
+        position_vector = self.create_position_vector()
+        basic_header = BasicHeader()
+        basic_header.initialize_with_mib(mib)
+        basic_header.set_rhl(1)
+        common_header = CommonHeader()
+        common_header.initialize_with_request(request)
+        # When
+        packet = cache.get_shb_template(request).build_packet(position_vector, request.length, request.data)
+        # Then
+        headers = basic_header.encode_to_bytes() + common_header.encode_to_bytes() + position_vector.encode()
+        self.assertEqual(packet, headers + bytes(4) + request.data)
+        # The template is reused and only the variable fields change
+        request.data = b'other'
+        request.length = len(request.data)
+        common_header.pl = request.length
+        self.assertIs(cache.get_shb_template(request), cache.get_shb_template(request))
+        other_packet = cache.get_shb_template(request).build_packet(position_vector, request.length, request.data)
+        headers = basic_header.encode_to_bytes() + common_header.encode_to_bytes() + position_vector.encode()
+        self.assertEqual(other_packet, headers + bytes(4) + b'other')
+        self.assertEqual(packet[-12:], b'request_data')
+        self.assertEqual(len(cache.templates), 1)
+
+    def test_gbc_template(self):
+        # Given
+        mib = MIB()
+        cache = HeaderTemplateCache(mib)
+        request = GNDataRequest()
+        request.upper_protocol_entity = CommonNH.BTP_B
+        request.packet_transport_type.header_type = HeaderType.GEOBROADCAST
+        request.packet_transport_type.header_subtype = GeoBroadcastHST.GEOBROADCAST_CIRCLE
+        request.area.latitude = 421255850
+        request.area.longitude = 27601710
+        request.area.a = 100
+        request.data = bytes(300)
+        request.length = len(request.data)
+        basic_header = BasicHeader()
+        basic_header.initialize_with_mib(mib)
+        common_header = CommonHeader()
+        common_header.initialize_with_request(request, mib)
+        gbc_extended_header = GBCExtendedHeader()
+        gbc_extended_header.initialize_with_request(request)
+        gbc_extended_header.sn = 5
+        gbc_extended_header.so_pv = self.create_position_vector()
+        # When
+        template = cache.get_gbc_template(request)
+        packet = template.build_packet(gbc_extended_header, request.length, request.data)
+        # Then
+        headers = basic_header.encode_to_bytes() + common_header.encode_to_bytes() + gbc_extended_header.encode()
+        self.assertEqual(packet, headers + request.data)
+        # The MHL (7th byte of the Common Header) equals the RHL set at the source
+        self.assertEqual(packet[4 + 6], packet[3])
+        self.assertGreaterEqual(len(template.buffer), len(packet))
+        # Different payload length bucket
+        request.data = bytes(10)
+        self.assertIsNot(cache.get_gbc_template(request), template)
+
+
+if __name__ == '__main__':
+    unittest.main()
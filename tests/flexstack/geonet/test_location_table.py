@@ -2,15 +2,14 @@ import unittest
 from unittest.mock import patch
 
 from flexstack.geonet.gn_address import MID, M, ST, GNAddress
-from flexstack.geonet.exceptions import (
-    DuplicatedPacketException,
-    IncongruentTimestampException,
-)
+from flexstack.geonet.exceptions import DuplicatedPacketException
 from flexstack.geonet.location_table import (
+    LocationTable,
     LocationTableEntry,
     LongPositionVector,
 )
 from flexstack.geonet.mib import MIB
+from flexstack.geonet.position_vector import TST
 
 
 class TestLocationTableEntry(unittest.TestCase):
@@ -43,46 +42,165 @@ class TestLocationTableEntry(unittest.TestCase):
         position_vector2 = self.create_filled_position_vector()
         position_vector2.set_tst_in_normal_timestamp_seconds(timestamp + 0.1)
         entry.update_position_vector(position_vector2)
-        self.assertRaises(
-            IncongruentTimestampException, entry.update_position_vector, position_vector
-        )
+        # An older position vector is ignored
+        entry.update_position_vector(position_vector)
+        self.assertEqual(entry.position_vector, position_vector2)
 
-    @patch("time.time")
-    def test_update_pdr(self, mock_time):
-        timestamp = 1675071608.1964376
-        mock_time.return_value = timestamp - 200
+    def test_update_pdr(self):
         mib = MIB()
         entry = LocationTableEntry(mib)
-        mock_time.assert_not_called()
+        # The first packet only starts the measurement
+        entry.update_pdr(packet_size=100, receive_time=1000.0)
+        self.assertEqual(entry.pdr, 0)
+        entry.update_pdr(packet_size=100, receive_time=1000.1)
+        self.assertAlmostEqual(entry.pdr, 100)
+        entry.update_pdr(packet_size=100, receive_time=1000.2)
+        self.assertAlmostEqual(entry.pdr, 190)
 
-        # First position_vector
-        position_vector = self.create_filled_position_vector()
-        position_vector.set_tst_in_normal_timestamp_seconds(timestamp)
-        entry.update_position_vector(position_vector)
-        entry.update_pdr(position_vector=position_vector, packet_size=100)
-        self.assertAlmostEqual(entry.pdr, 1.1566219266650857e-05)
-        # Second position_vector
-        position_vector2 = self.create_filled_position_vector()
-        position_vector2.set_tst_in_normal_timestamp_seconds(timestamp + 0.1)
-        entry.update_position_vector(position_vector2)
-        entry.update_pdr(position_vector=position_vector2, packet_size=100)
-        self.assertAlmostEqual(entry.pdr, 100.00013248005884)
-        # Third position_vector
-        position_vector3 = self.create_filled_position_vector()
-        position_vector3.set_tst_in_normal_timestamp_seconds(timestamp + 0.2)
-        entry.update_position_vector(position_vector3)
-        entry.update_pdr(position_vector=position_vector3, packet_size=100)
-        self.assertAlmostEqual(entry.pdr, 189.99999716188944)
+    def test_update_pdr_burst(self):
+        mib = MIB()
+        entry = LocationTableEntry(mib)
+        entry.update_pdr(packet_size=100, receive_time=1000.0)
+        # Packets received in a burst are accounted together in the next update
+        entry.update_pdr(packet_size=100, receive_time=1000.0)
+        entry.update_pdr(packet_size=100, receive_time=1000.001)
+        self.assertEqual(entry.pdr, 0)
+        entry.update_pdr(packet_size=100, receive_time=1000.1)
+        self.assertAlmostEqual(entry.pdr, 300)
+
+    @patch("flexstack.geonet.location_table.time.monotonic")
+    def test_update_pdr_local_time(self, mock_monotonic):
+        mib = MIB()
+        entry = LocationTableEntry(mib)
+        # The TST sent by the source does not change, the PDR is measured with the local time of reception
+        for i in range(3):
+            mock_monotonic.return_value = 1000 + i * 0.1
+            position_vector = self.create_filled_position_vector()
+            position_vector.set_tst_in_normal_timestamp_seconds(1675071608)
+            entry.update_with_shb_packet(position_vector, bytes(88))
+        self.assertAlmostEqual(entry.pdr, 190)
 
     def test_duplicate_packet(self):
         mib = MIB()
         entry = LocationTableEntry(mib)
-        packet1 = b"\x07\xd1\x00\x00\x02\x02\x00\x00\x07\xa9\xb5\xc8\x40\x59\xca\x03\xa2\x4d\x91\x82\x8b\xe1\x90\x19\x03\x84\x38\x6c\xf0\x00\xe1\x0f\xc0\x00\x2c\x82\xf0\x8a\x80\x03\xff\x05\xff\xf8\x00\x00\x0e\x00\x70\x80\x54\xd8\x5d\x9f\x2b\xc0"
-        entry.check_duplicate_packet(packet1)
+        tst = TST()
+        tst.set_in_normal_timestamp_seconds(1675071608)
+        entry.check_duplicate_packet(1, tst)
+        self.assertRaises(
+            DuplicatedPacketException, entry.check_duplicate_packet, 1, tst
+        )
+        # Same timestamp, different sequence number
+        entry.check_duplicate_packet(2, tst)
+
+    def test_update_with_shb_packet_no_dpl(self):
+        mib = MIB()
+        entry = LocationTableEntry(mib)
+        for i in range(3):
+            position_vector = self.create_filled_position_vector()
+            position_vector.set_tst_in_normal_timestamp_seconds(1675071608 + i)
+            entry.update_with_shb_packet(position_vector, b"payload" + bytes([i]))
+        # SHB packets have no sequence number and are left out of the DPL
+        self.assertEqual(len(entry.dpl), 0)
+
+    def test_duplicate_packet_list_length(self):
+        mib = MIB()
+        entry = LocationTableEntry(mib)
+        tst = TST()
+        for sn in range(mib.itsGnDPLLength + 1):
+            entry.check_duplicate_packet(sn, tst)
+        self.assertEqual(len(entry.dpl), mib.itsGnDPLLength)
+        # The oldest identifier has been evicted
+        entry.check_duplicate_packet(0, tst)
         self.assertRaises(
-            DuplicatedPacketException, entry.check_duplicate_packet, packet1
+            DuplicatedPacketException, entry.check_duplicate_packet, mib.itsGnDPLLength, tst
         )
 
 
+class TestLocationTable(unittest.TestCase):
+
+    def create_position_vector(self, mid: bytes, timestamp: float) -> LongPositionVector:
+        position_vector = LongPositionVector()
+        gn_address = GNAddress()
+        gn_address.set_mid(MID(mid))
+        position_vector.set_gn_addr(gn_address)
+        position_vector.set_tst_in_normal_timestamp_seconds(timestamp)
+        return position_vector
+
+    @patch("time.time")
+    def test_new_shb_packet(self, mock_time):
+        mock_time.return_value = 1675071608
+        location_table = LocationTable(MIB())
+        position_vector = self.create_position_vector(b"\xaa\xbb\xcc\xdd\x22\x33", 1675071608)
+        location_table.new_shb_packet(position_vector, b"payload1")
+        lookup_address = GNAddress()
+        lookup_address.decode(position_vector.gn_addr.encode())
+        entry = location_table.get_entry(lookup_address)
+        self.assertIsNotNone(entry)
+        self.assertEqual(entry.position_vector, position_vector)
+        self.assertEqual(location_table.get_neighbours(), [entry])
+        self.assertTrue(location_table.has_neighbours())
+        self.assertIsNone(location_table.get_entry(GNAddress()))
+
+    def test_new_shb_packet_same_tst(self):
+        location_table = LocationTable(MIB())
+        position_vector = self.create_position_vector(b"\xaa\xbb\xcc\xdd\x22\x33", 1675071608)
+        # Several packets sent before the next position fix of the source carry the same TST
+        for payload in (b"payload1", b"payload2", b"payload3"):
+            same_position_vector = self.create_position_vector(b"\xaa\xbb\xcc\xdd\x22\x33", 1675071608)
+            location_table.new_shb_packet(same_position_vector, payload)
+        entry = location_table.get_entry(position_vector.gn_addr)
+        self.assertEqual(entry.position_vector, position_vector)
+        self.assertTrue(entry.is_neighbour)
+
+    @patch("time.time")
+    def test_refresh_table(self, mock_time):
+        mib = MIB()
+        mock_time.return_value = 1675071608
+        location_table = LocationTable(mib)
+        position_vector1 = self.create_position_vector(b"\xaa\xbb\xcc\xdd\x22\x33", 1675071608)
+        position_vector2 = self.create_position_vector(b"\xaa\xbb\xcc\xdd\x22\x34", 1675071608)
+        location_table.new_shb_packet(position_vector1, b"payload1")
+        location_table.new_shb_packet(position_vector2, b"payload2")
+        # Refreshing the first entry extends its lifetime
+        mock_time.return_value = 1675071608 + mib.itsGnLifetimeLocTE - 1
+        position_vector1 = self.create_position_vector(b"\xaa\xbb\xcc\xdd\x22\x33", 1675071609)
+        location_table.new_shb_packet(position_vector1, b"payload3")
+        mock_time.return_value = 1675071608 + mib.itsGnLifetimeLocTE + 1
+        location_table.refresh_table()
+        self.assertIsNotNone(location_table.get_entry(position_vector1.gn_addr))
+        self.assertIsNone(location_table.get_entry(position_vector2.gn_addr))
+        self.assertEqual(len(location_table.get_neighbours()), 1)
+        self.assertEqual(len(location_table.expiry_heap), 1)
+        mock_time.return_value = 1675071608 + 2 * mib.itsGnLifetimeLocTE
+        self.assertFalse(location_table.has_neighbours())
+        self.assertEqual(location_table.loc_t, {})
+        self.assertEqual(location_table.expiry_heap, [])
+
+    @patch("flexstack.geonet.location_table.time.monotonic")
+    def test_check_pdr(self, mock_monotonic):
+        mib = MIB()
+        mib.itsGnMaxPacketDataRate = 1
+        location_table = LocationTable(mib)
+        mid = b"\xaa\xbb\xcc\xdd\x22\x33"
+        self.assertFalse(location_table.check_pdr(mid, 10000))
+        # A source flooding with a constant TST
+        position_vector = self.create_position_vector(mid, 1675071608)
+        mock_monotonic.return_value = 1000
+        location_table.new_shb_packet(position_vector, bytes(200))
+        mock_monotonic.return_value = 1000 + 1 / 64
+        location_table.new_shb_packet(position_vector, bytes(200))
+        self.assertIn(mid, location_table.pdr_exceeded)
+        # Packets sent at a high rate are dropped
+        mock_monotonic.return_value = 1000 + 2 / 64
+        self.assertTrue(location_table.check_pdr(mid, 212))
+        # Once the rate falls below the limit, the source is accepted again
+        dropped = []
+        for i in range(1, 13):
+            mock_monotonic.return_value = 1000 + 10 * i
+            dropped.append(location_table.check_pdr(mid, 212))
+        self.assertEqual(dropped, [True] * 9 + [False] * 3)
+        self.assertNotIn(mid, location_table.pdr_exceeded)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,90 @@
+import math
+import random
+import unittest
+
+from flexstack.geonet.geometry import NORTH_SCALE
+from flexstack.geonet.gn_address import GNAddress, MID
+from flexstack.geonet.neighbour_index import GRID_CELL_SIZE, NeighbourIndex
+
+
+def build_gn_address(i: int) -> GNAddress:
+    gn_address = GNAddress()
+    gn_address.mid = MID(i.to_bytes(6, 'big'))
+    return gn_address
+
+
+class TestNeighbourIndex(unittest.TestCase):
+
+    def test_update_remove(self):
+        neighbour_index = NeighbourIndex()
+        gn_address = build_gn_address(1)
+        neighbour_index.update(gn_address, 421255850, 27601710)
+        self.assertIn(gn_address, neighbour_index)
+        self.assertEqual(len(neighbour_index.cells), 1)
+        # Moving to another cell leaves no empty cell behind
+        neighbour_index.update(gn_address, 421455850, 27601710)
+        self.assertEqual(len(neighbour_index), 1)
+        self.assertEqual(len(neighbour_index.cells), 1)
+        self.assertEqual(neighbour_index.nearest(421455850, 27601710), (gn_address, 0))
+        neighbour_index.remove(gn_address)
+        neighbour_index.remove(gn_address)
+        self.assertEqual(len(neighbour_index), 0)
+        self.assertEqual(neighbour_index.cells, {})
+        self.assertIsNone(neighbour_index.nearest(421455850, 27601710))
+
+    def test_nearest(self):
+        random_generator = random.Random(7)
+        neighbour_index = NeighbourIndex()
+        positions = {}
+        for i in range(200):
+            gn_address = build_gn_address(i)
+            positions[gn_address] = (
+                421255850 + random_generator.randint(-100000, 100000),
+                27601710 + random_generator.randint(-100000, 100000),
+            )
+            neighbour_index.update(gn_address, *positions[gn_address])
+        for _ in range(50):
+            latitude = 421255850 + random_generator.randint(-1000000, 1000000)
+            longitude = 27601710 + random_generator.randint(-1000000, 1000000)
+            east_scale = NORTH_SCALE * math.cos(math.radians(latitude / 10000000))
+            expected = min(
+                math.hypot(NORTH_SCALE * (lat - latitude), east_scale * (lon - longitude))
+                for lat, lon in positions.values()
+            )
+            gn_address, distance = neighbour_index.nearest(latitude, longitude)
+            self.assertAlmostEqual(distance, expected)
+            self.assertIn(gn_address, positions)
+
+    def test_nearest_dense(self):
+        # 2500 neighbours on a 50 x 50 cell grid, and a far one
+        neighbour_index = NeighbourIndex()
+        positions = {}
+        for i in range(2500):
+            gn_address = build_gn_address(i)
+            positions[gn_address] = (
+                421255850 + (i // 50) * GRID_CELL_SIZE + 5000,
+                27601710 + (i % 50) * GRID_CELL_SIZE + 5000,
+            )
+            neighbour_index.update(gn_address, *positions[gn_address])
+        far = build_gn_address(2500)
+        positions[far] = (431255850, 27601710)
+        neighbour_index.update(far, *positions[far])
+        cell_lookups = []
+
+        class Cells(dict):
+            def get(self, key, default=None):
+                cell_lookups.append(key)
+                return super().get(key, default)
+
+        neighbour_index.cells = Cells(neighbour_index.cells)
+        latitude, longitude = 421255850 + 25 * GRID_CELL_SIZE + 7000, 27601710 + 25 * GRID_CELL_SIZE + 9000
+        east_scale = NORTH_SCALE * math.cos(math.radians(latitude / 10000000))
+        expected = min(
+            positions,
+            key=lambda a: math.hypot(NORTH_SCALE * (positions[a][0] - latitude), east_scale * (positions[a][1] - longitude)),
+        )
+        self.assertEqual(neighbour_index.nearest(latitude, longitude)[0], expected)
+        # Only the cells around the point are looked up
+        self.assertLessEqual(len(cell_lookups), 25)
+        # A point next to the far neighbour falls back to scanning the occupied cells
+        self.assertEqual(neighbour_index.nearest(431255850 + 100, 27601710)[0], far)
@@ -0,0 +1,100 @@
+import time
+import unittest
+from unittest.mock import Mock
+
+from flexstack.geonet.mib import MIB
+from flexstack.geonet.packet_buffer import BCForwardingPacketBuffer, CBFPacketBuffer
+
+
+class TestCBFPacketBuffer(unittest.TestCase):
+
+    def test_timeout(self):
+        mib = MIB()
+        cbf_packet_buffer = CBFPacketBuffer(mib, Mock())
+        self.assertEqual(cbf_packet_buffer.timeout(0), mib.itsGnCbfMaxTime)
+        self.assertEqual(cbf_packet_buffer.timeout(mib.itsGnDefaultMaxCommunicationRange), mib.itsGnCbfMinTime)
+        self.assertEqual(cbf_packet_buffer.timeout(2 * mib.itsGnDefaultMaxCommunicationRange), mib.itsGnCbfMinTime)
+        self.assertEqual(cbf_packet_buffer.timeout(None), mib.itsGnCbfMaxTime)
+        self.assertAlmostEqual(
+            cbf_packet_buffer.timeout(mib.itsGnDefaultMaxCommunicationRange / 2),
+            (mib.itsGnCbfMaxTime + mib.itsGnCbfMinTime) / 2,
+        )
+
+    def test_flush_expired(self):
+        send_callback = Mock()
+        cbf_packet_buffer = CBFPacketBuffer(MIB(), send_callback)
+        cbf_packet_buffer.add("packet1", b"packet1", 10000)
+        cbf_packet_buffer.add("packet2", b"packet2", 20000)
+        cbf_packet_buffer.flush_expired()
+        send_callback.assert_not_called()
+        cbf_packet_buffer.flush_expired(time.monotonic() + 15)
+        send_callback.assert_called_once_with(b"packet1")
+        self.assertNotIn("packet1", cbf_packet_buffer)
+        self.assertIn("packet2", cbf_packet_buffer)
+
+    def test_cancel(self):
+        send_callback = Mock()
+        cbf_packet_buffer = CBFPacketBuffer(MIB(), send_callback)
+        cbf_packet_buffer.add("packet1", b"packet1", 10000)
+        self.assertTrue(cbf_packet_buffer.cancel("packet1"))
+        self.assertFalse(cbf_packet_buffer.cancel("packet1"))
+        self.assertEqual(cbf_packet_buffer.size, 0)
+        cbf_packet_buffer.flush_expired(time.monotonic() + 15)
+        send_callback.assert_not_called()
+
+    def test_head_drop(self):
+        mib = MIB()
+        mib.itsGnCbfPacketBufferSize = 1
+        cbf_packet_buffer = CBFPacketBuffer(mib, Mock())
+        cbf_packet_buffer.add("packet1", bytes(600), 10000)
+        cbf_packet_buffer.add("packet2", bytes(600), 10000)
+        self.assertNotIn("packet1", cbf_packet_buffer)
+        self.assertIn("packet2", cbf_packet_buffer)
+        self.assertEqual(cbf_packet_buffer.size, 600)
+
+    def test_timer_thread(self):
+        send_callback = Mock()
+        cbf_packet_buffer = CBFPacketBuffer(MIB(), send_callback)
+        cbf_packet_buffer.add("packet1", b"packet1", 1)
+        for _ in range(100):
+            if send_callback.called:
+                break
+            time.sleep(0.01)
+        send_callback.assert_called_once_with(b"packet1")
+        self.assertEqual(len(cbf_packet_buffer), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+class TestBCForwardingPacketBuffer(unittest.TestCase):
+
+    def test_flush(self):
+        send_callback = Mock()
+        bc_forwarding_packet_buffer = BCForwardingPacketBuffer(MIB(), send_callback)
+        packet = bytes([0x11, 0x00, 0x1a, 0x01]) + b"payload"
+        bc_forwarding_packet_buffer.add(packet, 60000)
+        bc_forwarding_packet_buffer.add(b"\x11\x00\x1a\x01expired", 1000)
+        self.assertEqual(len(bc_forwarding_packet_buffer), 2)
+        bc_forwarding_packet_buffer.flush(time.monotonic() + 2)
+        # The LT field is reduced by the queuing time (58 s -> 5 * 10 s)
+        send_callback.assert_called_once_with(bytes([0x11, 0x00, 0x16, 0x01]) + b"payload")
+        self.assertEqual(len(bc_forwarding_packet_buffer), 0)
+        metrics = bc_forwarding_packet_buffer.get_metrics()
+        self.assertEqual(metrics["bytes"], 0)
+        self.assertEqual(metrics["expired_packets"], 1)
+        self.assertEqual(metrics["flushed_packets"], 1)
+
+    def test_head_drop(self):
+        mib = MIB()
+        mib.itsGnBcForwardingPacketBufferSize = 1
+        send_callback = Mock()
+        bc_forwarding_packet_buffer = BCForwardingPacketBuffer(mib, send_callback)
+        bc_forwarding_packet_buffer.add(bytes(600), 60000)
+        bc_forwarding_packet_buffer.add(bytes(500), 60000)
+        bc_forwarding_packet_buffer.add(bytes(2000), 60000)
+        metrics = bc_forwarding_packet_buffer.get_metrics()
+        self.assertEqual(metrics["packets"], 1)
+        self.assertEqual(metrics["bytes"], 500)
+        self.assertEqual(metrics["dropped_packets"], 2)
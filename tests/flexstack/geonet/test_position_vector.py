@@ -56,6 +56,22 @@ class TestLongPositionVector(unittest.TestCase):
         self.assertEqual(lpv.h, 0)
         self.assertEqual(lpv.s, 0)
 
+    def test_encode_into_decode_from(self):
+        lpv = LongPositionVector()
+        lpv.set_tst_in_normal_timestamp_seconds(1674638854)
+        lpv.set_latitude(-33.868820)
+        lpv.set_longitude(-151.209296)
+        lpv.set_pai(True)
+        lpv.set_speed(13.5)
+        lpv.set_heading(359.9)
+        buffer = bytearray(30)
+        lpv.encode_into(buffer, 4)
+        self.assertEqual(bytes(buffer[4:28]), lpv.encode())
+        decoded = LongPositionVector()
+        decoded.decode_from(buffer, 4)
+        self.assertEqual(decoded, lpv)
+        self.assertEqual(decoded.latitude, -338688200)
+
 
 class TestShortPositionVector(unittest.TestCase):
     def test_encode(self):
@@ -1,11 +1,11 @@
 import unittest
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 from flexstack.geonet.router import DADException, GNForwardingAlgorithmResponse, Router
-from flexstack.geonet.mib import MIB
+from flexstack.geonet.mib import MIB, AreaForwardingAlgorithm, NonAreaForwardingAlgorithm
 from flexstack.geonet.position_vector import LongPositionVector
 from flexstack.geonet.service_access_point import Area, CommonNH, GNDataIndication, GNDataRequest, GNDataConfirm, GeoBroadcastHST, HeaderType, ResultCode, TopoBroadcastHST
-from flexstack.geonet.gn_address import ST, GNAddress
+from flexstack.geonet.gn_address import MID, ST, GNAddress
 from flexstack.geonet.basic_header import BasicHeader
 from flexstack.geonet.common_header import CommonHeader
 from flexstack.geonet.gbc_extended_header import GBCExtendedHeader
@@ -102,7 +102,7 @@ class TestRouter(unittest.TestCase):
         result = Router.transform_distance_angle(distance, 45)
         # Then
         self.assertAlmostEqual(round(result[0], 2), 0.71)
-        self.assertAlmostEqual(round(result[1], 2), 0)
+        self.assertAlmostEqual(round(result[1], 2), -0.71)
 
     def test_GNGeometricFunctionF(self):
         # Given
@@ -141,16 +141,104 @@ class TestRouter(unittest.TestCase):
         request.area.latitude = 421255850
         request.area.longitude = 27601710
         request.packet_transport_type.header_subtype = GeoBroadcastHST.GEOBROADCAST_CIRCLE
-        router.ego_position_vector.latitude = 421254550
-        router.ego_position_vector.longitude = 27603740
+        position_vector = LongPositionVector()
+        position_vector.latitude = 421254550
+        position_vector.longitude = 27603740
+        router.set_ego_position_vector(position_vector)
         # When
         result = router.gn_forwarding_algorithm_selection(request)
         # Then
         self.assertEqual(result, GNForwardingAlgorithmResponse.AREA_FORWARDING)
 
+    def test_GNForwardingAlgorithmSelection_outside_area(self):
+        # Given
+        mib = MIB()
+        router = Router(mib)
+        request = GNDataRequest()
+        request.area = Area()
+        request.area.a = 100
+        request.area.latitude = 421255850
+        request.area.longitude = 27601710
+        request.packet_transport_type.header_subtype = GeoBroadcastHST.GEOBROADCAST_CIRCLE
+        position_vector = LongPositionVector()
+        position_vector.latitude = 421236840
+        position_vector.longitude = 27632710
+        router.set_ego_position_vector(position_vector)
+        sender_position_vector = LongPositionVector()
+        sender_position_vector.latitude = 421255850
+        sender_position_vector.longitude = 27601710
+        # When & Then
+        self.assertEqual(router.gn_forwarding_algorithm_selection(request),
+                         GNForwardingAlgorithmResponse.NON_AREA_FORWARDING)
+        self.assertEqual(router.gn_forwarding_algorithm_selection(request, sender_position_vector),
+                         GNForwardingAlgorithmResponse.DISCARTED)
+
+    def test_GNGreedyForwarding(self):
+        # Given an ego position 2 km South of the area
+        mib = MIB()
+        router = Router(mib)
+        router.link_layer = Mock()
+        area = Area()
+        area.a = 100
+        area.latitude = 421255850
+        area.longitude = 27601710
+        position_vector = LongPositionVector()
+        position_vector.latitude = 421075850
+        position_vector.longitude = 27601710
+        router.set_ego_position_vector(position_vector)
+        neighbours = []
+        for i, latitude in enumerate((421065850, 421165850, 421115850)):
+            neighbour = LongPositionVector()
+            neighbour.gn_addr = GNAddress()
+            neighbour.gn_addr.mid = MID(bytes([0, 0, 0, 0, 0, i + 1]))
+            neighbour.latitude = latitude
+            neighbour.longitude = 27601710
+            neighbour.tst.msec = 1000
+            neighbours.append(neighbour)
+
+        # When the only neighbour is farther from the area
+        router.location_table.new_shb_packet(neighbours[0], b'')
+        # Then there is no next hop and the packet is buffered if SCF is set
+        self.assertIsNone(router.gn_greedy_next_hop(area))
+        self.assertEqual(router.gn_non_area_forwarding(b'packet', area, True, 1000), ResultCode.ACCEPTED)
+        router.link_layer.send.assert_not_called()
+        self.assertEqual(len(router.bc_forwarding_packet_buffer), 1)
+        # And it is broadcast if SCF is not set
+        self.assertEqual(router.gn_non_area_forwarding(b'packet', area, False, 1000), ResultCode.ACCEPTED)
+        router.link_layer.send.assert_called_once_with(b'packet', None)
+
+        # When neighbours closer to the area appear
+        router.location_table.new_shb_packet(neighbours[1], b'')
+        router.location_table.new_shb_packet(neighbours[2], b'')
+        # Then the closest to the area is the next hop, and the packet is sent to its LL address
+        self.assertEqual(router.gn_greedy_next_hop(area), neighbours[1].gn_addr)
+        router.link_layer.send.reset_mock()
+        self.assertEqual(router.gn_non_area_forwarding(b'packet', area, True, 1000), ResultCode.ACCEPTED)
+        router.link_layer.send.assert_called_once_with(b'packet', b'\x00\x00\x00\x00\x00\x02')
+
+    def test_GNNonAreaForwarding_unspecified(self):
+        # Given a router without a non-area forwarding algorithm and no neighbours
+        mib = MIB()
+        mib.itsGnNonAreaForwardingAlgorithm = NonAreaForwardingAlgorithm.UNSPECIFIED
+        router = Router(mib)
+        router.link_layer = Mock()
+        router.gn_greedy_next_hop = Mock(return_value=None)
+        area = Area()
+        area.a = 100
+        area.latitude = 421255850
+        area.longitude = 27601710
+        # When
+        result = router.gn_non_area_forwarding(b'packet', area, True, 1000)
+        # Then the packet is sent without looking for a greedy next hop
+        self.assertEqual(result, ResultCode.ACCEPTED)
+        router.gn_greedy_next_hop.assert_not_called()
+        router.link_layer.send.assert_called_once_with(b'packet', None)
+        self.assertEqual(len(router.bc_forwarding_packet_buffer), 0)
+
     def test_GNDataforwardGBC(self):
         # Given
         mib = MIB()
+        mib.itsGnAreaForwardingAlgorithm = AreaForwardingAlgorithm.SIMPLE
         router = Router(mib)
         router.link_layer = Mock()
         router.link_layer.send = Mock()
@@ -158,6 +246,7 @@ class TestRouter(unittest.TestCase):
             return_value=GNForwardingAlgorithmResponse.AREA_FORWARDING)
 
         basic_header = BasicHeader()
+        basic_header.set_rhl(10)
 
         common_header = CommonHeader()
         common_header.hst = GeoBroadcastHST.GEOBROADCAST_CIRCLE
@@ -176,6 +265,187 @@ class TestRouter(unittest.TestCase):
         router.link_layer.send.assert_called_once_with(basic_header.encode_to_bytes(
         ) + common_header.encode_to_bytes() + gbc_extended_header.encode() + b'payload')
         router.gn_forwarding_algorithm_selection.assert_called_once()
+        self.assertEqual(basic_header.rhl, 9)
+
+    def test_GNDataforwardGBC_CBF(self):
+        # Given
+        mib = MIB()
+        router = Router(mib)
+        router.link_layer = Mock()
+        router.gn_forwarding_algorithm_selection = Mock(
+            return_value=GNForwardingAlgorithmResponse.AREA_FORWARDING)
+        router.cbf_packet_buffer.add = Mock()
+        basic_header = BasicHeader()
+        basic_header.set_rhl(10)
+        common_header = CommonHeader()
+        common_header.hst = GeoBroadcastHST.GEOBROADCAST_CIRCLE
+        gbc_extended_header = GBCExtendedHeader()
+        gbc_extended_header.sn = 3
+
+        # When
+        router.gn_data_forward_gbc(
+            basic_header, common_header, gbc_extended_header, b'payload')
+
+        # Then
+        router.link_layer.send.assert_not_called()
+        headers = basic_header.encode_to_bytes() + common_header.encode_to_bytes() + gbc_extended_header.encode()
+        router.cbf_packet_buffer.add.assert_called_once_with(
+            (gbc_extended_header.so_pv.gn_addr, 3),
+            headers + b'payload',
+            mib.itsGnCbfMaxTime,
+        )
+
+        # When the remaining hop limit is exhausted
+        router.cbf_packet_buffer.add.reset_mock()
+        basic_header.set_rhl(1)
+        router.gn_data_forward_gbc(
+            basic_header, common_header, gbc_extended_header, b'payload')
+
+        # Then
+        router.cbf_packet_buffer.add.assert_not_called()
+
+    def test_GNDataIndicate_CBF_timeout_two_hops(self):
+        # Given a source 3 km South of a forwarder, and two relays 100 m and 400 m North of the forwarder
+        area_latitude = 421255850
+        longitude = 27601710
+        source = LongPositionVector()
+        source.gn_addr.mid.mid = b'\xaa\xbb\xcc\xdd\xee\xff'
+        source.latitude = area_latitude - 270000
+        source.longitude = longitude
+        source.tst.msec = 1000
+        forwarder = LongPositionVector()
+        forwarder.gn_addr = GNAddress()
+        forwarder.gn_addr.mid = MID(b'\x00\x00\x00\x00\x00\x09')
+        forwarder.latitude = area_latitude
+        forwarder.longitude = longitude
+        forwarder.tst.msec = 1000
+        basic_header = BasicHeader()
+        common_header = CommonHeader()
+        common_header.nh = CommonNH.BTP_B
+        common_header.ht = HeaderType.GEOBROADCAST
+        common_header.hst = GeoBroadcastHST.GEOBROADCAST_CIRCLE
+        common_header.pl = 7
+        common_header.mhl = 10
+        gbc_extended_header = GBCExtendedHeader()
+        gbc_extended_header.sn = 1
+        gbc_extended_header.so_pv = source
+        gbc_extended_header.latitude = area_latitude
+        gbc_extended_header.longitude = longitude
+        gbc_extended_header.a = 5000
+
+        def cbf_timeout(relay_latitude, rhl, sender_address):
+            mib = MIB()
+            router = Router(mib)
+            router.link_layer = Mock()
+            router.gn_forwarding_algorithm_selection = Mock(
+                return_value=GNForwardingAlgorithmResponse.AREA_FORWARDING)
+            router.cbf_packet_buffer.add = Mock()
+            position_vector = LongPositionVector()
+            position_vector.latitude = relay_latitude
+            position_vector.longitude = longitude
+            router.set_ego_position_vector(position_vector)
+            router.location_table.new_shb_packet(forwarder, b'')
+            basic_header.rhl = rhl
+            packet = basic_header.encode_to_bytes() + common_header.encode_to_bytes() + \
+                gbc_extended_header.encode() + b'payload'
+            router.gn_data_indicate(packet, sender_address)
+            return router.cbf_packet_buffer.add.call_args[0][2]
+
+        # When the packet is received from the forwarder (second hop)
+        near_timeout = cbf_timeout(area_latitude + 8990, 9, forwarder.gn_addr.mid.mid)
+        far_timeout = cbf_timeout(area_latitude + 35960, 9, forwarder.gn_addr.mid.mid)
+
+        # Then the timeouts depend on the distance to the forwarder, not to the source
+        mib = MIB()
+        self.assertLess(mib.itsGnCbfMinTime, far_timeout)
+        self.assertLess(far_timeout, near_timeout)
+        self.assertLess(near_timeout, mib.itsGnCbfMaxTime)
+        # When the packet is received from the source (first hop), its position is the one of the sender
+        self.assertAlmostEqual(cbf_timeout(area_latitude - 261010, 10, None), near_timeout)
+        # When the sender is unknown, the maximum timeout is used
+        self.assertEqual(cbf_timeout(area_latitude + 8990, 9, None), mib.itsGnCbfMaxTime)
+
+    def test_GNDataIndicate_CBF_timeout_received_packet(self):
+        # Given a source, a relay 556 m North of it and a second relay 222 m North of the first one
+        def build_router(mid: bytes, latitude: int) -> Router:
+            mib = MIB()
+            mib.itsGnLocalGnAddr = GNAddress()
+            mib.itsGnLocalGnAddr.mid = MID(mid)
+            router = Router(mib)
+            router.link_layer = Mock()
+            position_vector = LongPositionVector()
+            position_vector.set_gn_addr(mib.itsGnLocalGnAddr)
+            position_vector.latitude = latitude
+            position_vector.longitude = 27601710
+            position_vector.tst.msec = 1000
+            router.set_ego_position_vector(position_vector)
+            return router
+
+        source = build_router(b'\x02\x00\x00\x00\x00\x01', 421255850)
+        relay = build_router(b'\x02\x00\x00\x00\x00\x02', 421305850)
+        second_relay = build_router(b'\x02\x00\x00\x00\x00\x03', 421325850)
+        request = GNDataRequest()
+        request.upper_protocol_entity = CommonNH.BTP_B
+        request.packet_transport_type.header_type = HeaderType.GEOBROADCAST
+        request.packet_transport_type.header_subtype = GeoBroadcastHST.GEOBROADCAST_CIRCLE
+        request.area.latitude = 421255850
+        request.area.longitude = 27601710
+        request.area.a = 2000
+        request.data = b'payload'
+        request.length = len(request.data)
+        source.gn_data_request(request)
+        packet = source.link_layer.send.call_args[0][0]
+
+        # When the relay receives the packet from the source
+        relay.cbf_packet_buffer.add = Mock()
+        relay.gn_data_indicate(packet, source.gn_address.mid.mid)
+
+        # Then the CBF timeout depends on the distance to the source (about 45 ms)
+        _, forwarded_packet, timeout = relay.cbf_packet_buffer.add.call_args[0]
+        self.assertAlmostEqual(timeout, relay.cbf_packet_buffer.timeout(relay.distance_to(source.ego_position_vector)))
+        self.assertAlmostEqual(timeout, 45, delta=1)
+
+        # When the second relay, that knows the first one as neighbour, receives the forwarded packet
+        second_relay.location_table.new_shb_packet(relay.ego_position_vector, b'')
+        second_relay.cbf_packet_buffer.add = Mock()
+        second_relay.gn_data_indicate(forwarded_packet, relay.gn_address.mid.mid)
+
+        # Then the CBF timeout depends on the distance to the first relay (about 78 ms)
+        timeout = second_relay.cbf_packet_buffer.add.call_args[0][2]
+        self.assertAlmostEqual(timeout, 78.0, delta=1)
+
+    def test_GNDataforwardGBC_SCF(self):
+        # Given
+        mib = MIB()
+        router = Router(mib)
+        router.link_layer = Mock()
+        basic_header = BasicHeader()
+        basic_header.set_rhl(10)
+        basic_header.lt.set_value_in_seconds(60)
+        common_header = CommonHeader()
+        common_header.tc.scf = True
+        common_header.hst = GeoBroadcastHST.GEOBROADCAST_CIRCLE
+        gbc_extended_header = GBCExtendedHeader()
+
+        # When there is no neighbour
+        router.gn_data_forward_gbc(
+            basic_header, common_header, gbc_extended_header, b'payload')
+
+        # Then the packet is stored in the BC forwarding packet buffer
+        router.link_layer.send.assert_not_called()
+        self.assertEqual(len(router.bc_forwarding_packet_buffer), 1)
+
+        # When a new neighbour appears
+        position_vector = LongPositionVector()
+        position_vector.gn_addr = GNAddress()
+        position_vector.gn_addr.mid = MID(b'\x01\x02\x03\x04\x05\x06')
+        router.location_table.new_shb_packet(position_vector, b'')
+
+        # Then the buffer is flushed
+        router.link_layer.send.assert_called_once()
+        self.assertEqual(router.link_layer.send.call_args[0][0][4:], (
+            common_header.encode_to_bytes() + gbc_extended_header.encode() + b'payload'))
+        self.assertEqual(len(router.bc_forwarding_packet_buffer), 0)
 
     def test_GNDataRequestGBC(self):
         # Given
@@ -319,6 +589,162 @@ class TestRouter(unittest.TestCase):
         router.gn_data_indicate_gbc.assert_not_called()
         router.gn_data_indicate_shb.assert_called_once()
 
+    def test_GNDataIndicate_zero_copy(self):
+        # Given
+        mib = MIB()
+        router = Router(mib)
+        indications = []
+        router.register_indication_callback(indications.append)
+        basic_header = BasicHeader()
+        basic_header.version = 1
+        basic_header.rhl = 1
+        common_header = CommonHeader()
+        common_header.nh = CommonNH.BTP_B
+        common_header.ht = HeaderType.TSB
+        common_header.hst = TopoBroadcastHST.SINGLE_HOP
+        position_vector = LongPositionVector()
+        position_vector.gn_addr.mid.mid = b'\xaa\xbb\xcc\xdd\xee\xff'
+        position_vector.tst.msec = 1000
+        packet = basic_header.encode_to_bytes() + common_header.encode_to_bytes() + \
+            position_vector.encode() + bytes(4) + b'payload'
+
+        # When
+        router.gn_data_indicate(packet)
+
+        # Then
+        self.assertEqual(len(indications), 1)
+        data_view = indications[0].data_view
+        self.assertIs(data_view.obj, packet)
+        self.assertEqual(indications[0].length, 7)
+        self.assertEqual(indications[0].data, b'payload')
+
+    def test_GNDataIndicate_shb_same_tst(self):
+        # Given a source sending several SHB packets before its next position fix
+        mib = MIB()
+        router = Router(mib)
+        indications = []
+        router.register_indication_callback(indications.append)
+        basic_header = BasicHeader()
+        basic_header.rhl = 1
+        common_header = CommonHeader()
+        common_header.nh = CommonNH.BTP_B
+        common_header.ht = HeaderType.TSB
+        common_header.hst = TopoBroadcastHST.SINGLE_HOP
+        position_vector = LongPositionVector()
+        position_vector.gn_addr.mid.mid = b'\xaa\xbb\xcc\xdd\xee\xff'
+        position_vector.tst.msec = 1000
+        headers = basic_header.encode_to_bytes() + common_header.encode_to_bytes() + position_vector.encode()
+
+        # When
+        for payload in (b'cam1', b'cam2', b'cam3'):
+            router.gn_data_indicate(headers + bytes(4) + payload)
+
+        # Then all of them are delivered
+        self.assertEqual([indication.data for indication in indications], [b'cam1', b'cam2', b'cam3'])
+
+    def test_GNDataIndicate_forward_gbc(self):
+        # Given
+        mib = MIB()
+        mib.itsGnAreaForwardingAlgorithm = AreaForwardingAlgorithm.SIMPLE
+        router = Router(mib)
+        router.link_layer = Mock()
+        router.gn_forwarding_algorithm_selection = Mock(
+            return_value=GNForwardingAlgorithmResponse.AREA_FORWARDING)
+        router.gn_data_forward_gbc = Mock(wraps=router.gn_data_forward_gbc)
+        basic_header = BasicHeader()
+        basic_header.rhl = 5
+        common_header = CommonHeader()
+        common_header.nh = CommonNH.BTP_B
+        common_header.ht = HeaderType.GEOBROADCAST
+        common_header.hst = GeoBroadcastHST.GEOBROADCAST_CIRCLE
+        common_header.pl = 7
+        gbc_extended_header = GBCExtendedHeader()
+        gbc_extended_header.sn = 1
+        gbc_extended_header.so_pv.gn_addr.mid.mid = b'\xaa\xbb\xcc\xdd\xee\xff'
+        gbc_extended_header.so_pv.tst.msec = 1000
+        gbc_extended_header.a = 100
+        packet = basic_header.encode_to_bytes() + common_header.encode_to_bytes() + \
+            gbc_extended_header.encode() + b'payload'
+
+        # When
+        router.gn_data_indicate(packet)
+
+        # Then only the RHL byte of the received frame changes
+        router.link_layer.send.assert_called_once_with(packet[0:3] + bytes([4]) + packet[4:])
+        self.assertIs(router.gn_data_forward_gbc.call_args[0][4].obj, packet)
+
+    def test_GNDataIndicateBatch(self):
+        # Given
+        mib = MIB()
+        router = Router(mib)
+        batch_callback = Mock()
+        router.register_indication_batch_callback(batch_callback)
+        basic_header = BasicHeader()
+        basic_header.rhl = 1
+        common_header = CommonHeader()
+        common_header.nh = CommonNH.BTP_B
+        common_header.ht = HeaderType.TSB
+        common_header.hst = TopoBroadcastHST.SINGLE_HOP
+        headers = basic_header.encode_to_bytes() + common_header.encode_to_bytes()
+        frames = []
+        for msec in (1000, 2000, 2000):
+            position_vector = LongPositionVector()
+            position_vector.gn_addr.mid.mid = b'\xaa\xbb\xcc\xdd\xee\xff'
+            position_vector.tst.msec = msec
+            frames.append(headers + position_vector.encode() + bytes(4) + b'payload')
+        # A frame with an unknown version does not drop the rest of the burst
+        frames.insert(1, b'\xf1' + frames[0][1:])
+        # Neither does a frame with an invalid Common Header NH, nor a truncated one
+        frames.insert(2, frames[0][0:4] + bytes([0xf0 | (frames[0][4] & 0x0f)]) + frames[0][5:])
+        frames.insert(3, frames[0][0:20])
+
+        # When
+        router.gn_data_indicate_batch(frames)
+
+        # Then the valid packets are delivered, also the one with the same TST as the previous one
+        batch_callback.assert_called_once()
+        indications = batch_callback.call_args[0][0]
+        self.assertEqual(len(indications), 3)
+        self.assertEqual(indications[2].data, b'payload')
+        self.assertEqual(router.statistics.get_counter("rx_packets"), 6)
+        self.assertEqual(router.statistics.get_counter("drop_not_implemented"), 1)
+        self.assertEqual(router.statistics.get_counter("drop_decode_error"), 2)
+        self.assertEqual(router.statistics.latencies["decode"].count, 6)
+
+    def test_GNDataIndicate_pdr_exceeded(self):
+        # Given a source whose PDR exceeds itsGnMaxPacketDataRate (1 ko/s)
+        mib = MIB()
+        mib.itsGnMaxPacketDataRate = 1
+        router = Router(mib)
+        callback = Mock()
+        router.register_indication_callback(callback)
+        basic_header = BasicHeader()
+        basic_header.rhl = 1
+        common_header = CommonHeader()
+        common_header.nh = CommonNH.BTP_B
+        common_header.ht = HeaderType.TSB
+        common_header.hst = TopoBroadcastHST.SINGLE_HOP
+        headers = basic_header.encode_to_bytes() + common_header.encode_to_bytes()
+        frames = []
+        for msec in (1000, 1010, 1020):
+            position_vector = LongPositionVector()
+            position_vector.gn_addr.mid = MID(b'\xaa\xbb\xcc\xdd\xee\xff')
+            position_vector.tst.msec = msec
+            frames.append(headers + position_vector.encode() + bytes(4) + bytes(200))
+
+        # When the frames are received every 1/64 s
+        with patch("flexstack.geonet.location_table.time.monotonic") as mock_monotonic:
+            for i, frame in enumerate(frames):
+                mock_monotonic.return_value = 1000 + i / 64
+                router.gn_data_indicate(frame)
+
+        # Then the packet that exceeds the PDR is dropped before updating the LocT
+        self.assertEqual(router.statistics.get_counter("drop_pdr_exceeded"), 1)
+        self.assertEqual(callback.call_args_list[2][0][0].upper_protocol_entity, CommonNH.ANY)
+        entry = router.location_table.get_entry(position_vector.gn_addr)
+        self.assertEqual(entry.position_vector.tst.msec, 1010)
+        self.assertIn(b'\xaa\xbb\xcc\xdd\xee\xff', router.location_table.pdr_exceeded)
+
     def test_duplicate_address_detection(self):
         # Given
         mib = MIB()
@@ -337,11 +763,17 @@ class TestRouter(unittest.TestCase):
                     "lat": 46.498293369, "lon": 7.567411672, "alt": 1343.127,
                     "eph": 36.000, "epv": 32.321,
                     "track": 10.3788, "speed": 0.091, "climb": -0.085, "mode": 3}
-        router.ego_position_vector.refresh_with_tpv_data = Mock()
+        previous_position_vector = router.ego_position_vector
+        expected_position_vector = LongPositionVector()
+        expected_position_vector.set_gn_addr(router.gn_address)
+        expected_position_vector.refresh_with_tpv_data(tpv_data)
 
         # When
         router.refresh_ego_position_vector(tpv_data)
 
         # Then
-        router.ego_position_vector.refresh_with_tpv_data.assert_called_once_with(
-            tpv_data)
+        self.assertEqual(router.ego_position_vector, expected_position_vector)
+        self.assertEqual(router.ego_position_vector.encode(), expected_position_vector.encode())
+        self.assertEqual(previous_position_vector.latitude, 0)
+        with self.assertRaises(AttributeError):
+            router.ego_position_vector.latitude = 0
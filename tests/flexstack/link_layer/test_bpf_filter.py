@@ -0,0 +1,67 @@
+import socket
+import unittest
+from unittest.mock import MagicMock
+
+from flexstack.linklayer.bpf_filter import (
+    BPF_JEQ_K,
+    BPF_LD_H_ABS,
+    BPF_LD_W_ABS,
+    BPF_RET_K,
+    SO_ATTACH_FILTER,
+    SOCK_FPROG_STRUCT,
+    attach_filter,
+    build_geonetworking_filter,
+)
+
+MAC_ADDRESS = b"\x02\x00\x00\x00\x00\x01"
+OTHER_MAC_ADDRESS = b"\x02\x00\x00\x00\x00\x02"
+BROADCAST = b"\xff\xff\xff\xff\xff\xff"
+
+
+def run_filter(instructions, frame: bytes) -> int:
+    """
+    Minimal classic BPF interpreter for the instructions used by the filter.
+    """
+    accumulator = 0
+    pc = 0
+    while True:
+        code, jt, jf, k = instructions[pc]
+        pc += 1
+        if code == BPF_LD_W_ABS:
+            accumulator = int.from_bytes(frame[k:k + 4], "big")
+        elif code == BPF_LD_H_ABS:
+            accumulator = int.from_bytes(frame[k:k + 2], "big")
+        elif code == BPF_JEQ_K:
+            pc += jt if accumulator == k else jf
+        elif code == BPF_RET_K:
+            return k
+        else:
+            raise ValueError("Unknown instruction")
+
+
+class TestBPFFilter(unittest.TestCase):
+
+    def test_build_geonetworking_filter(self):
+        instructions = build_geonetworking_filter(MAC_ADDRESS)
+        geonetworking = b"\x89\x47" + b"payload"
+        self.assertTrue(run_filter(instructions, BROADCAST + OTHER_MAC_ADDRESS + geonetworking))
+        self.assertTrue(run_filter(instructions, MAC_ADDRESS + OTHER_MAC_ADDRESS + geonetworking))
+        # Own broadcast frame
+        self.assertFalse(run_filter(instructions, BROADCAST + MAC_ADDRESS + geonetworking))
+        # Unicast to another station
+        self.assertFalse(run_filter(instructions, OTHER_MAC_ADDRESS + MAC_ADDRESS + geonetworking))
+        self.assertFalse(run_filter(instructions, b"\x02\x00\x00\x00\x00\x03" + OTHER_MAC_ADDRESS + geonetworking))
+        # Other ethertype
+        self.assertFalse(run_filter(instructions, BROADCAST + OTHER_MAC_ADDRESS + b"\x08\x00" + b"payload"))
+
+    def test_attach_filter(self):
+        sock = MagicMock()
+        instructions = build_geonetworking_filter(MAC_ADDRESS)
+        attach_filter(sock, instructions)
+        level, option, value = sock.setsockopt.call_args[0]
+        self.assertEqual((level, option), (socket.SOL_SOCKET, SO_ATTACH_FILTER))
+        self.assertEqual(SOCK_FPROG_STRUCT.unpack(value)[0], len(instructions))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import threading
+import time
+import unittest
+
+from flexstack.linklayer.cv2x_link_layer import PythonCV2XLinkLayer
+
+
+class FakeCV2XLinkLayer:
+    """
+    Stand-in of the CV2XLinkLayer of the Telematics SDK.
+    """
+
+    def __init__(self, frames):
+        self.frames = list(frames)
+        self.sent = []
+
+    def receive(self) -> bytes:
+        if self.frames:
+            return self.frames.pop(0)
+        time.sleep(0.01)
+        return b""
+
+    def send(self, data: bytes) -> None:
+        self.sent.append(data)
+
+
+class TestPythonCV2XLinkLayer(unittest.TestCase):
+
+    def test_receive(self):
+        received = []
+        all_received = threading.Event()
+
+        def receive_callback(packet, sender_address):
+            received.append((bytes(packet), sender_address))
+            if len(received) == 3:
+                all_received.set()
+
+        fake_link_layer = FakeCV2XLinkLayer([b"\x03packet1", b"\x03packet2", b"\x03packet3"])
+        link_layer = PythonCV2XLinkLayer(receive_callback, link_layer=fake_link_layer)
+        self.assertTrue(all_received.wait(5))
+        link_layer.stop()
+        # The Telematics SDK does not give the L2 source of the frames
+        self.assertEqual(received, [(b"packet1", None), (b"packet2", None), (b"packet3", None)])
+        self.assertEqual(link_layer.statistics.get_counter("rx_packets"), 3)
+
+    def test_send(self):
+        fake_link_layer = FakeCV2XLinkLayer([])
+        link_layer = PythonCV2XLinkLayer(None, link_layer=fake_link_layer)
+        link_layer.send(b"packet")
+        link_layer.stop()
+        self.assertEqual(fake_link_layer.sent, [b"\x03packet"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import socket
+import unittest
+
+from flexstack.linklayer.mmsg import HAS_RECVMMSG, HAS_SENDMMSG, MMsgReceiver, MMsgSender
+
+
+@unittest.skipUnless(HAS_SENDMMSG, "sendmmsg is not available")
+class TestMMsgSender(unittest.TestCase):
+
+    def test_send(self):
+        sender_socket, receiver_socket = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.addCleanup(sender_socket.close)
+        self.addCleanup(receiver_socket.close)
+        sender = MMsgSender(b"header", 2)
+        packets = [b"packet1", bytearray(b"packet2"), b"packet3"]
+        sent = sender.send(sender_socket.fileno(), packets)
+        self.assertEqual(sent, 2)
+        self.assertEqual(receiver_socket.recv(100), b"headerpacket1")
+        self.assertEqual(receiver_socket.recv(100), b"headerpacket2")
+
+
+@unittest.skipUnless(HAS_RECVMMSG, "recvmmsg is not available")
+class TestMMsgReceiver(unittest.TestCase):
+
+    def test_receive(self):
+        sender_socket, receiver_socket = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.addCleanup(sender_socket.close)
+        self.addCleanup(receiver_socket.close)
+        receiver = MMsgReceiver(2, 16)
+        for packet in [b"packet1", b"packet2", b"packet3"]:
+            sender_socket.send(packet)
+        packets = receiver.receive(receiver_socket.fileno())
+        self.assertEqual([bytes(packet) for packet in packets], [b"packet1", b"packet2"])
+        packets = receiver.receive(receiver_socket.fileno())
+        self.assertEqual([bytes(packet) for packet in packets], [b"packet3"])
+
+    def test_receive_truncated(self):
+        sender_socket, receiver_socket = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.addCleanup(sender_socket.close)
+        self.addCleanup(receiver_socket.close)
+        receiver = MMsgReceiver(2, 4)
+        sender_socket.send(b"too long")
+        sender_socket.send(b"ok")
+        packets = receiver.receive(receiver_socket.fileno())
+        self.assertEqual([bytes(packet) for packet in packets], [b"ok"])
+
+
+if __name__ == '__main__':
+    unittest.main()
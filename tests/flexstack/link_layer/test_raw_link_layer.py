@@ -3,19 +3,11 @@ import unittest
 
 from unittest.mock import MagicMock, patch
 
+from flexstack.geonet.exceptions import DecodeError
 from flexstack.linklayer.raw_link_layer import RawLinkLayer
 
 
-def skip_if_windows(func):
-    def wrapper(*args, **kwargs):
-        if platform.system() == "Windows":
-            print("Skipping test on Windows.")
-            return
-        return func(*args, **kwargs)
-    return wrapper
-
-
-@skip_if_windows
+@unittest.skipIf(platform.system() == "Windows", "RawLinkLayer is not supported on Windows")
 class TestRawLinkLayer(unittest.TestCase):
     @patch("threading.Thread")
     @patch("socket.socket")
@@ -60,6 +52,39 @@ class TestRawLinkLayer(unittest.TestCase):
         ethertype = b'\x89\x47'
         packet = dest + b"\x00\x00\x00\x00\x00\x00" + ethertype + b"packet"
         socket_instance.send.assert_called_once_with(packet)
+        # A packet with a next hop is sent to its MAC address
+        socket_instance.send.reset_mock()
+        raw_link_layer.send(b"packet", b"\x02\x00\x00\x00\x00\x02")
+        packet = b"\x02\x00\x00\x00\x00\x02" + b"\x00\x00\x00\x00\x00\x00" + ethertype + b"packet"
+        socket_instance.send.assert_called_once_with(packet)
+
+    @patch("flexstack.linklayer.raw_link_layer.TransmitQueue")
+    @patch("threading.Thread")
+    @patch("socket.socket")
+    def test_send_tx_queue(self, mock_socket, mock_thread, mock_transmit_queue):
+        socket_instance = mock_socket.return_value
+        raw_link_layer = RawLinkLayer(
+            iface="lo", mac_address=b"\x00\x00\x00\x00\x00\x01", receive_callback=MagicMock(), tx_queue=True)
+        tx_queue = mock_transmit_queue.return_value
+        mock_transmit_queue.assert_called_once_with(raw_link_layer.send_batch)
+        # GN packet with TC ID 1 (AC_VI)
+        packet = b"\x11\x00\x00\x00" + b"\x20\x50\x01\x00"
+        raw_link_layer.send(packet)
+        tx_queue.put.assert_called_once_with(packet, 1)
+        socket_instance.send.assert_not_called()
+        # A single packet is sent with send
+        raw_link_layer.send_batch([packet])
+        socket_instance.send.assert_called_once_with(raw_link_layer.header + packet)
+        self.assertEqual(raw_link_layer.statistics.get_counter("tx_packets"), 1)
+        # A packet with a next hop is queued with its MAC address and sent to it
+        next_hop = b"\x02\x00\x00\x00\x00\x02"
+        tx_queue.put.reset_mock()
+        raw_link_layer.send(packet, next_hop)
+        tx_queue.put.assert_called_once_with((packet, next_hop), 1)
+        socket_instance.send.reset_mock()
+        raw_link_layer.send_batch([(packet, next_hop)])
+        socket_instance.send.assert_called_once_with(next_hop + b"\x00\x00\x00\x00\x00\x01\x89\x47" + packet)
+        self.assertEqual(raw_link_layer.statistics.get_counter("tx_packets"), 2)
 
     @patch("threading.Thread")
     @patch("socket.socket")
@@ -74,7 +99,7 @@ class TestRawLinkLayer(unittest.TestCase):
         thread_instance.start = MagicMock()
         # Arrange
 
-        def mock_receive_callback(packet):
+        def mock_receive_callback(packet, sender_address):
             raise OSError
         mock_receive_callback = MagicMock(side_effect=mock_receive_callback)
         # Act
@@ -83,4 +108,80 @@ class TestRawLinkLayer(unittest.TestCase):
         raw_link_layer.receive()
         # Assert
         socket_instance.recv.assert_called_once()
-        mock_receive_callback.assert_called_once_with(b"packet")
+        mock_receive_callback.assert_called_once_with(b"packet", b'\xaa\xbb\xcc\xaa\xbb\xcc')
+
+    @patch("flexstack.linklayer.raw_link_layer.TPacketV3Ring")
+    @patch("threading.Thread")
+    @patch("socket.socket")
+    def test_receive_ring(self, mock_socket, mock_thread, mock_ring):
+        ring = MagicMock()
+        mock_ring.open.return_value = ring
+        mock_socket.return_value.fileno.return_value = 0
+        mac_address = b"\x00\x00\x00\x00\x00\x01"
+        frames = [
+            memoryview(b'\xff\xff\xff\xff\xff\xff' + b'\xaa\xbb\xcc\xaa\xbb\xcc' + b'\x89\x47' + b"packet1"),
+            memoryview(b'\xff\xff\xff\xff\xff\xff' + mac_address + b'\x89\x47' + b"own"),
+            memoryview(mac_address + b'\xaa\xbb\xcc\xaa\xbb\xcc' + b'\x89\x47' + b"packet2"),
+        ]
+        ring.read_block.side_effect = [frames, ValueError]
+        receive_batch_callback = MagicMock()
+        raw_link_layer = RawLinkLayer(
+            iface="lo", mac_address=mac_address, receive_callback=MagicMock(), rx_ring=True,
+            receive_batch_callback=receive_batch_callback, kernel_filter=False)
+        mock_ring.open.assert_called_once_with(mock_socket.return_value)
+        self.assertEqual(mock_thread.call_args[1]["target"], raw_link_layer.receive_ring)
+        raw_link_layer.receive_ring()
+        receive_batch_callback.assert_called_once()
+        self.assertEqual(receive_batch_callback.call_args[0][0], [b"packet1", b"packet2"])
+        self.assertEqual(receive_batch_callback.call_args[0][1], [b'\xaa\xbb\xcc\xaa\xbb\xcc'] * 2)
+        ring.release_block.assert_called_once()
+        self.assertEqual(raw_link_layer.statistics.get_counter("rx_filtered"), 1)
+
+    @patch("flexstack.linklayer.raw_link_layer.TPacketV3Ring")
+    @patch("threading.Thread")
+    @patch("socket.socket")
+    def test_receive_ring_errors(self, mock_socket, mock_thread, mock_ring):
+        ring = MagicMock()
+        mock_ring.open.return_value = ring
+        mock_socket.return_value.fileno.return_value = 0
+        sender_address = b'\xaa\xbb\xcc\xaa\xbb\xcc'
+        buffers = [
+            bytearray(b'\xff\xff\xff\xff\xff\xff' + sender_address + b'\x89\x47' + payload)
+            for payload in (b"packet1", b"malformed", b"packet2", b"packet3")
+        ]
+        ring.read_block.side_effect = [
+            [memoryview(buffer) for buffer in buffers[0:3]], [memoryview(buffers[3])], ValueError
+        ]
+        received = []
+
+        def receive_callback(packet, address):
+            if packet == b"malformed":
+                raise DecodeError("Basic Header must be 4 bytes long")
+            received.append((packet, address))
+
+        raw_link_layer = RawLinkLayer(
+            iface="lo", mac_address=b"\x00\x00\x00\x00\x00\x01", receive_callback=receive_callback,
+            rx_ring=True)
+        raw_link_layer.receive_ring()
+        # A malformed packet only drops itself, the rest of the block and the next blocks are received
+        self.assertEqual(received, [(b"packet1", sender_address), (b"packet2", sender_address),
+                                    (b"packet3", sender_address)])
+        self.assertEqual(raw_link_layer.statistics.get_counter("rx_errors"), 2)
+        self.assertEqual(ring.release_block.call_count, 2)
+        # The packets are copied out of the ring, so they outlive the block
+        for buffer in buffers:
+            buffer[14:] = bytes(len(buffer) - 14)
+        self.assertIsInstance(received[0][0], bytes)
+        self.assertEqual(received[0][0], b"packet1")
+
+    @patch("flexstack.linklayer.raw_link_layer.TPacketV3Ring")
+    @patch("threading.Thread")
+    @patch("socket.socket")
+    def test_handle_ring_frames_batch_error(self, mock_socket, mock_thread, mock_ring):
+        receive_batch_callback = MagicMock(side_effect=ValueError("15 is not a valid CommonNH"))
+        raw_link_layer = RawLinkLayer(
+            iface="lo", mac_address=b"\x00\x00\x00\x00\x00\x01", receive_callback=MagicMock(),
+            rx_ring=True, receive_batch_callback=receive_batch_callback)
+        raw_link_layer.handle_ring_frames([memoryview(b'\xff' * 6 + b'\xaa' * 6 + b'\x89\x47' + b"packet")])
+        receive_batch_callback.assert_called_once_with([b"packet"], [b'\xaa' * 6])
+        self.assertEqual(raw_link_layer.statistics.get_counter("rx_errors"), 1)
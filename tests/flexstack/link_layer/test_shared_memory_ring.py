@@ -0,0 +1,37 @@
+import unittest
+
+from flexstack.linklayer.shared_memory_ring import SharedMemoryRing
+
+
+class TestSharedMemoryRing(unittest.TestCase):
+
+    def setUp(self):
+        self.ring = SharedMemoryRing(slot_count=2, slot_size=16, wait_timeout=0)
+        self.addCleanup(self.ring.close)
+
+    def test_put_consume(self):
+        self.assertTrue(self.ring.put(b"frame1"))
+        self.assertTrue(self.ring.put(memoryview(b"xframe2")[1:]))
+        # Full ring
+        self.assertFalse(self.ring.put(b"frame3"))
+        self.assertEqual(self.ring.dropped_frames, 1)
+        self.assertEqual(len(self.ring), 2)
+        frames = []
+        self.assertEqual(self.ring.consume(lambda frame: frames.append(bytes(frame))), 2)
+        self.assertEqual(frames, [b"frame1", b"frame2"])
+        self.assertEqual(len(self.ring), 0)
+        # The slots are reused
+        self.assertTrue(self.ring.put(b"frame4"))
+        self.ring.wait()
+        self.ring.consume(lambda frame: frames.append(bytes(frame)))
+        self.assertEqual(frames[-1], b"frame4")
+
+    def test_put_too_long(self):
+        self.assertRaises(ValueError, self.ring.put, bytes(17))
+
+    def test_invalid_slot_count(self):
+        self.assertRaises(ValueError, SharedMemoryRing, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+
+from flexstack.linklayer.tpacket_v3 import (
+    BLOCK_PACKETS_STRUCT,
+    BLOCK_STATUS_STRUCT,
+    PACKET_HEADER_STRUCT,
+    TP_STATUS_KERNEL,
+    TP_STATUS_USER,
+    TPacketV3Ring,
+)
+
+
+def write_block(buffer: bytearray, offset: int, frames: list) -> None:
+    BLOCK_STATUS_STRUCT.pack_into(buffer, offset + 8, TP_STATUS_USER)
+    BLOCK_PACKETS_STRUCT.pack_into(buffer, offset + 12, len(frames), 48)
+    packet_offset = offset + 48
+    for frame in frames:
+        next_offset = 0x50 + len(frame) + (-len(frame) % 16)
+        PACKET_HEADER_STRUCT.pack_into(buffer, packet_offset, next_offset, len(frame), 0x50)
+        buffer[packet_offset + 0x50:packet_offset + 0x50 + len(frame)] = frame
+        packet_offset += next_offset
+
+
+class TestTPacketV3Ring(unittest.TestCase):
+
+    def test_read_block(self):
+        buffer = bytearray(2 * 4096)
+        ring = TPacketV3Ring(buffer, 4096, 2)
+        # Block owned by the kernel
+        self.assertIsNone(ring.read_block())
+        write_block(buffer, 0, [b"frame1", b"second frame"])
+        frames = ring.read_block()
+        self.assertEqual([bytes(frame) for frame in frames], [b"frame1", b"second frame"])
+        ring.release_block()
+        self.assertEqual(BLOCK_STATUS_STRUCT.unpack_from(buffer, 8)[0], TP_STATUS_KERNEL)
+        self.assertEqual(ring.block_index, 1)
+        write_block(buffer, 4096, [b"frame3"])
+        self.assertEqual([bytes(frame) for frame in ring.read_block()], [b"frame3"])
+        ring.release_block()
+        self.assertEqual(ring.block_index, 0)
+        self.assertIsNone(ring.read_block())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from flexstack.linklayer.transmit_queue import AC_BE, AC_BK, AC_VI, AC_VO, TransmitQueue, access_category
+
+
+class TestTransmitQueue(unittest.TestCase):
+
+    def test_access_category(self):
+        # Basic Header (NH = Common Header) + Common Header with TC ID 1
+        self.assertEqual(access_category(b"\x11\x00\x00\x00" + b"\x20\x50\x01\x00"), AC_VI)
+        self.assertEqual(access_category(b"\x11\x00\x00\x00" + b"\x20\x50\x80\x00"), AC_VO)
+        self.assertEqual(access_category(b"\x11\x00\x00\x00" + b"\x20\x50\x0a\x00"), AC_BK)
+        # Secured packet
+        self.assertEqual(access_category(b"\x12\x00\x00\x00" + b"\x20\x50\x00\x00"), AC_BE)
+
+    @patch("threading.Thread")
+    def test_take_batch(self, mock_thread):
+        queue = TransmitQueue(MagicMock(), max_queue_length=2, max_batch=3)
+        mock_thread.return_value.start.assert_called_once()
+        self.assertTrue(queue.put(b"be1", AC_BE))
+        self.assertTrue(queue.put(b"bk1", AC_BK))
+        self.assertTrue(queue.put(b"vo1", AC_VO))
+        self.assertTrue(queue.put(b"be2", AC_BE))
+        self.assertFalse(queue.put(b"be3", AC_BE))
+        self.assertEqual(queue.dropped_packets, 1)
+        self.assertEqual(len(queue), 4)
+        self.assertEqual(queue.take_batch(), [b"vo1", b"be1", b"be2"])
+        self.assertEqual(queue.take_batch(), [b"bk1"])
+        self.assertEqual(len(queue), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from flexstack.geonet.exceptions import DecodeError
+from flexstack.linklayer.exceptions import InvalidMACAddressException, PacketTooLongException
+from flexstack.linklayer.udp_link_layer import BROADCAST_MAC_ADDRESS, MAX_PACKET_LENGTH, UDPLinkLayer
+
+MAC_ADDRESS = b"\x02\x00\x00\x00\x00\x01"
+OTHER_MAC_ADDRESS = b"\x02\x00\x00\x00\x00\x02"
+
+
+class TestUDPLinkLayer(unittest.TestCase):
+
+    @patch("socket.socket")
+    @patch("threading.Thread")
+    def test__init__(self, thread_mock, socket_mock):
+        receive_callback = MagicMock()
+        link_layer = UDPLinkLayer(MAC_ADDRESS, receive_callback, group="239.255.89.71", port=8947)
+        self.assertEqual(link_layer.destination, ("239.255.89.71", 8947))
+        socket_mock.return_value.bind.assert_called_once_with(("239.255.89.71", 8947))
+        thread_mock.return_value.start.assert_called_once()
+        with self.assertRaises(InvalidMACAddressException):
+            UDPLinkLayer(b"\x00", receive_callback)
+
+    @patch("socket.socket")
+    @patch("threading.Thread")
+    def test_send(self, thread_mock, socket_mock):
+        link_layer = UDPLinkLayer(MAC_ADDRESS, MagicMock())
+        link_layer.send(b"packet")
+        socket_mock.return_value.sendto.assert_called_once_with(
+            BROADCAST_MAC_ADDRESS + MAC_ADDRESS + b"packet", link_layer.destination)
+        # A packet with a next hop carries its MAC address
+        socket_mock.return_value.sendto.reset_mock()
+        link_layer.send(b"packet", OTHER_MAC_ADDRESS)
+        socket_mock.return_value.sendto.assert_called_once_with(
+            OTHER_MAC_ADDRESS + MAC_ADDRESS + b"packet", link_layer.destination)
+        with self.assertRaises(PacketTooLongException):
+            link_layer.send(bytes(MAX_PACKET_LENGTH + 1))
+        self.assertEqual(link_layer.statistics.get_counter("tx_packets"), 2)
+        self.assertEqual(link_layer.statistics.get_counter("drop_packet_too_long"), 1)
+
+    @patch("socket.socket")
+    @patch("threading.Thread")
+    def test_handle_packet_error(self, thread_mock, socket_mock):
+        receive_callback = MagicMock(side_effect=DecodeError("Basic Header must be 4 bytes long"))
+        link_layer = UDPLinkLayer(MAC_ADDRESS, receive_callback)
+        link_layer.handle_packet(b"\x11\x00\x00\x00", OTHER_MAC_ADDRESS)
+        self.assertEqual(link_layer.statistics.get_counter("rx_errors"), 1)
+
+    @patch("socket.socket")
+    @patch("threading.Thread")
+    def test_handle_batch(self, thread_mock, socket_mock):
+        receive_batch_callback = MagicMock(side_effect=ValueError("15 is not a valid CommonNH"))
+        link_layer = UDPLinkLayer(MAC_ADDRESS, MagicMock(), receive_batch_callback=receive_batch_callback)
+        datagrams = [
+            memoryview(BROADCAST_MAC_ADDRESS + OTHER_MAC_ADDRESS + b"packet"),
+            memoryview(BROADCAST_MAC_ADDRESS + OTHER_MAC_ADDRESS + b"\x11\x00"),
+            memoryview(BROADCAST_MAC_ADDRESS + MAC_ADDRESS + b"packet"),
+            memoryview(MAC_ADDRESS + OTHER_MAC_ADDRESS + b"unicast packet"),
+            memoryview(b"\x02\x00\x00\x00\x00\x09" + OTHER_MAC_ADDRESS + b"packet"),
+        ]
+        link_layer.handle_batch(datagrams)
+        receive_batch_callback.assert_called_once_with(
+            [b"packet", b"unicast packet"], [OTHER_MAC_ADDRESS, OTHER_MAC_ADDRESS])
+        self.assertEqual(link_layer.statistics.get_counter("drop_packet_too_short"), 1)
+        self.assertEqual(link_layer.statistics.get_counter("rx_filtered"), 2)
+        self.assertEqual(link_layer.statistics.get_counter("rx_errors"), 1)
+
+    def test__del__without_socket(self):
+        # The constructor failed before creating the socket
+        link_layer = UDPLinkLayer.__new__(UDPLinkLayer)
+        link_layer.__del__()
+
+    def test_multicast(self):
+        received = []
+        event = threading.Event()
+
+        def receive_callback(packet, sender_address):
+            received.append((bytes(packet), sender_address))
+            event.set()
+
+        try:
+            receiver = UDPLinkLayer(MAC_ADDRESS, receive_callback, port=18947, batch_receive=True)
+            sender = UDPLinkLayer(OTHER_MAC_ADDRESS, MagicMock(), port=18947)
+        except OSError as e:
+            self.skipTest(f"Multicast is not available: {e}")
+        self.addCleanup(receiver.sock.close)
+        self.addCleanup(sender.sock.close)
+        # The own datagrams of the receiver are discarded, and the too short ones too
+        receiver.send(b"own packet")
+        sender.sock.sendto(BROADCAST_MAC_ADDRESS + b"\x02\0\0\0\0\x09\x11\x00", sender.destination)
+        sender.send(b"packet")
+        if not event.wait(2):
+            self.skipTest("Multicast loopback is not available")
+        self.assertEqual(received, [(b"packet", OTHER_MAC_ADDRESS)])
+        self.assertTrue(receiver.receiving_thread.is_alive())
+
+
+if __name__ == '__main__':
+    unittest.main()
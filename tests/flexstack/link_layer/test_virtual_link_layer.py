@@ -0,0 +1,83 @@
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from flexstack.linklayer.exceptions import PacketTooLongException
+from flexstack.linklayer.virtual_link_layer import VirtualChannel, VirtualLinkLayer
+
+
+def position(latitude: int, longitude: int) -> MagicMock:
+    return MagicMock(latitude=latitude, longitude=longitude)
+
+
+class TestVirtualLinkLayer(unittest.TestCase):
+
+    def test_send(self):
+        channel = VirtualChannel()
+        callbacks = [MagicMock() for _ in range(3)]
+        stations = [
+            VirtualLinkLayer(channel, callback, mac_address=bytes([2, 0, 0, 0, 0, i]))
+            for i, callback in enumerate(callbacks)
+        ]
+        stations[0].send(b"packet")
+        self.assertTrue(channel.wait_idle(5))
+        callbacks[0].assert_not_called()
+        callbacks[1].assert_called_once_with(b"packet", stations[0].mac_address)
+        callbacks[2].assert_called_once_with(b"packet", stations[0].mac_address)
+        self.assertEqual(channel.statistics.get_counter("delivered_frames"), 2)
+        self.assertRaises(PacketTooLongException, stations[0].send, bytes(1501))
+        # A packet with a next hop is only delivered to it
+        stations[0].send(b"unicast packet", stations[2].mac_address)
+        self.assertTrue(channel.wait_idle(5))
+        self.assertEqual(callbacks[1].call_count, 1)
+        callbacks[2].assert_called_with(b"unicast packet", stations[0].mac_address)
+
+    def test_range(self):
+        channel = VirtualChannel(range=500)
+        callbacks = [MagicMock() for _ in range(3)]
+        # 0.003 degrees of latitude is about 334 m
+        positions = [position(414000000, 21000000), position(414030000, 21000000), position(414060000, 21000000)]
+        stations = [
+            VirtualLinkLayer(channel, callback, lambda p=p: p) for callback, p in zip(callbacks, positions)
+        ]
+        stations[0].send(b"packet")
+        self.assertTrue(channel.wait_idle(5))
+        callbacks[1].assert_called_once_with(b"packet", None)
+        callbacks[2].assert_not_called()
+        self.assertEqual(channel.statistics.get_counter("out_of_range_frames"), 1)
+
+    def test_loss(self):
+        channel = VirtualChannel(loss=1.0)
+        callback = MagicMock()
+        sender = VirtualLinkLayer(channel, MagicMock())
+        VirtualLinkLayer(channel, callback)
+        sender.send(b"packet")
+        self.assertTrue(channel.wait_idle(5))
+        callback.assert_not_called()
+        self.assertEqual(channel.statistics.get_counter("lost_frames"), 1)
+
+    def test_latency_and_bandwidth(self):
+        # 1000 bytes take 80 ms on a 100 kbit/s medium
+        channel = VirtualChannel(latency=0.01, bandwidth=100000)
+        receive_times = []
+        sender = VirtualLinkLayer(channel, MagicMock())
+        VirtualLinkLayer(channel, lambda packet, sender_address: receive_times.append(time.monotonic()))
+        start = time.monotonic()
+        sender.send(bytes(1000))
+        sender.send(bytes(1000))
+        self.assertTrue(channel.wait_idle(5))
+        self.assertGreaterEqual(receive_times[0] - start, 0.09)
+        self.assertGreaterEqual(receive_times[1] - start, 0.17)
+
+    def test_receive_error(self):
+        channel = VirtualChannel()
+        sender = VirtualLinkLayer(channel, MagicMock())
+        receiver = VirtualLinkLayer(channel, MagicMock(side_effect=NotImplementedError))
+        sender.send(b"packet")
+        sender.send(b"packet")
+        self.assertTrue(channel.wait_idle(5))
+        self.assertEqual(receiver.statistics.get_counter("rx_errors"), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
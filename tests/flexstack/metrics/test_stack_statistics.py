@@ -0,0 +1,53 @@
+import unittest
+
+from prometheus_client import CollectorRegistry
+
+from flexstack.metrics.prometheus_adaptation import StackStatisticsCollector
+from flexstack.metrics.stack_statistics import LatencyHistogram, StackStatistics
+
+
+class TestLatencyHistogram(unittest.TestCase):
+
+    def test_observe(self):
+        histogram = LatencyHistogram((0.001, 0.01))
+        histogram.observe(0.0005)
+        histogram.observe(0.001)
+        histogram.observe(0.005)
+        histogram.observe(1)
+        self.assertEqual(histogram.counts, [2, 1, 1])
+        self.assertEqual(histogram.count, 4)
+        self.assertAlmostEqual(histogram.sum, 1.0065)
+        self.assertEqual(histogram.cumulative_counts(), [(0.001, 2), (0.01, 3), (float("inf"), 4)])
+
+
+class TestStackStatistics(unittest.TestCase):
+
+    def test_count_and_observe(self):
+        statistics = StackStatistics("geonet", (0.001,))
+        statistics.count("rx_packets")
+        statistics.count("rx_bytes", 100)
+        statistics.count("rx_packets")
+        statistics.observe("decode", 0.0001)
+        self.assertEqual(statistics.get_counter("rx_packets"), 2)
+        self.assertEqual(statistics.get_counter("drop_decode_error"), 0)
+        self.assertEqual(statistics.to_dict(), {
+            "counters": {"rx_packets": 2, "rx_bytes": 100},
+            "latencies": {"decode": {"count": 1, "sum": 0.0001, "buckets": [(0.001, 1), (float("inf"), 1)]}},
+        })
+
+    def test_collector(self):
+        statistics = StackStatistics("geonet", (0.001,))
+        statistics.count("drop_duplicated_packet", 3)
+        statistics.observe("decode", 0.002)
+        registry = CollectorRegistry()
+        registry.register(StackStatisticsCollector(statistics))
+        self.assertEqual(registry.get_sample_value("geonet_drop_duplicated_packet_total"), 3)
+        self.assertEqual(
+            registry.get_sample_value("geonet_decode_latency_seconds_bucket", {"le": "0.001"}), 0)
+        self.assertEqual(
+            registry.get_sample_value("geonet_decode_latency_seconds_bucket", {"le": "+Inf"}), 1)
+        self.assertEqual(registry.get_sample_value("geonet_decode_latency_seconds_sum"), 0.002)
+
+
+if __name__ == '__main__':
+    unittest.main()
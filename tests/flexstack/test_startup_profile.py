@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+import unittest
+from unittest.mock import patch
+
+from flexstack import startup_profile
+
+
+class TestStartupProfile(unittest.TestCase):
+
+    def test_lazy_asn1_loading(self):
+        # Importing the services must not load the ASN.1 descriptions nor asn1tools
+        code = (
+            "import sys\n"
+            "import flexstack.facilities.ca_basic_service.ca_basic_service\n"
+            "import flexstack.facilities.vru_awareness_service.vru_awareness_service\n"
+            "import flexstack.facilities.decentralized_environmental_notification_service.den_service\n"
+            "print(sorted(m for m in sys.modules if m == 'asn1tools' or m.endswith('_asn1') or 'utils.asn1.' in m))\n"
+        )
+        environment = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(startup_profile.__file__)))
+        output = subprocess.run(
+            [sys.executable, "-c", code], check=True, capture_output=True, env=environment, text=True
+        ).stdout
+        self.assertEqual(output.strip(), "[]")
+
+    def test_profile(self):
+        result = startup_profile.profile("btp")
+        self.assertEqual(result["subsystem"], "btp")
+        self.assertGreater(result["import"], 0)
+        self.assertGreater(result["modules"], 0)
+
+    @patch("flexstack.startup_profile.profile")
+    def test_main_budget(self, profile_mock):
+        profile_mock.side_effect = lambda name, cache_directory: {
+            "subsystem": name, "import": 0.2 if name == "cam" else 0.01, "initialisation": 0.0, "modules": 1
+        }
+        with patch("builtins.print"):
+            self.assertEqual(startup_profile.main(["--subsystem", "btp", "--budget", "100"]), 0)
+            self.assertEqual(startup_profile.main(["--subsystem", "btp", "--subsystem", "cam", "--budget", "100"]), 1)
+        self.assertEqual(profile_mock.call_count, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
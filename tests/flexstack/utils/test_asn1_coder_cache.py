@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from flexstack.utils import asn1_coder_cache
+
+ASN1_DESCRIPTIONS = """
+Test DEFINITIONS AUTOMATIC TAGS ::= BEGIN
+Message ::= SEQUENCE {
+    id INTEGER (0..255),
+    flag BOOLEAN
+}
+END
+"""
+
+
+class TestASN1CoderCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        asn1_coder_cache.set_cache_directory(self.directory.name)
+        self.addCleanup(asn1_coder_cache.set_cache_directory, asn1_coder_cache._cache_directory)
+        asn1_coder_cache.clear()
+        self.addCleanup(asn1_coder_cache.clear)
+
+    def test_get_coder(self):
+        coder = asn1_coder_cache.get_coder(ASN1_DESCRIPTIONS, "uper")
+        self.assertEqual(coder.decode("Message", coder.encode("Message", {"id": 7, "flag": True})),
+                         {"id": 7, "flag": True})
+        # Compiled once per process
+        self.assertIs(asn1_coder_cache.get_coder(ASN1_DESCRIPTIONS, "uper"), coder)
+        self.assertIsNot(asn1_coder_cache.get_coder(ASN1_DESCRIPTIONS, "oer"), coder)
+
+    def test_get_coder_on_disk(self):
+        coder = asn1_coder_cache.get_coder(ASN1_DESCRIPTIONS, "uper")
+        key = asn1_coder_cache.cache_key(ASN1_DESCRIPTIONS, "uper")
+        self.assertTrue(os.path.exists(os.path.join(self.directory.name, key + ".pickle")))
+        asn1_coder_cache.clear()
+        with patch("asn1tools.compile_string") as compile_string_mock:
+            cached_coder = asn1_coder_cache.get_coder(ASN1_DESCRIPTIONS, "uper")
+            compile_string_mock.assert_not_called()
+        self.assertIsNot(cached_coder, coder)
+        self.assertEqual(cached_coder.encode("Message", {"id": 7, "flag": True}),
+                         coder.encode("Message", {"id": 7, "flag": True}))
+
+    def test_get_coder_corrupted_file(self):
+        key = asn1_coder_cache.cache_key(ASN1_DESCRIPTIONS, "uper")
+        with open(os.path.join(self.directory.name, key + ".pickle"), "wb") as file:
+            file.write(b"corrupted")
+        coder = asn1_coder_cache.get_coder(ASN1_DESCRIPTIONS, "uper")
+        self.assertEqual(coder.encode("Message", {"id": 7, "flag": True}), b"\x07\x80")
+        asn1_coder_cache.clear()
+        with patch("asn1tools.compile_string") as compile_string_mock:
+            asn1_coder_cache.get_coder(ASN1_DESCRIPTIONS, "uper")
+            compile_string_mock.assert_not_called()
+
+    def test_cache_key(self):
+        key = asn1_coder_cache.cache_key(ASN1_DESCRIPTIONS, "uper")
+        self.assertEqual(key, asn1_coder_cache.cache_key(ASN1_DESCRIPTIONS, "uper"))
+        self.assertNotEqual(key, asn1_coder_cache.cache_key(ASN1_DESCRIPTIONS, "oer"))
+        self.assertNotEqual(key, asn1_coder_cache.cache_key(ASN1_DESCRIPTIONS + "\n", "uper"))
+
+
+if __name__ == '__main__':
+    unittest.main()
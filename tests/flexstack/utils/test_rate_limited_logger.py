@@ -0,0 +1,38 @@
+import logging
+import unittest
+from unittest.mock import MagicMock, patch
+
+from flexstack.utils.rate_limited_logger import RateLimitedLogger
+
+
+class TestRateLimitedLogger(unittest.TestCase):
+
+    @patch("flexstack.utils.rate_limited_logger.time.monotonic")
+    def test_log(self, monotonic):
+        logger = MagicMock()
+        logger.isEnabledFor.return_value = True
+        rate_limited_logger = RateLimitedLogger(logger, interval=1.0)
+        monotonic.return_value = 10.0
+        rate_limited_logger.warning("duplicated_packet", "Packet is duplicated")
+        rate_limited_logger.warning("duplicated_packet", "Packet is duplicated")
+        rate_limited_logger.warning("decode_error", "Error decoding packet: %s", "error")
+        monotonic.return_value = 10.5
+        rate_limited_logger.warning("duplicated_packet", "Packet is duplicated")
+        monotonic.return_value = 11.0
+        rate_limited_logger.warning("duplicated_packet", "Packet is duplicated")
+        self.assertEqual(logger.log.call_count, 3)
+        logger.log.assert_any_call(logging.WARNING, "Error decoding packet: %s", "error")
+        logger.log.assert_called_with(
+            logging.WARNING, "Packet is duplicated (%d similar messages suppressed)", 2)
+
+    def test_log_disabled_level(self):
+        logger = MagicMock()
+        logger.isEnabledFor.return_value = False
+        rate_limited_logger = RateLimitedLogger(logger)
+        rate_limited_logger.debug("key", "message")
+        logger.log.assert_not_called()
+        self.assertEqual(rate_limited_logger.suppressed, {})
+
+
+if __name__ == '__main__':
+    unittest.main()